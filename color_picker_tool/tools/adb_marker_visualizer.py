@@ -6,27 +6,76 @@
 - 화면 해상도/가로세로 전환도 로그에서 자동 인식합니다.
 
 필수: Python 3.9+ (tkinter 포함)
+- `--analyze` (헤드리스 집계)는 tkinter 없이도 동작합니다.
 """
 
 from __future__ import annotations
 
 import argparse
+import atexit
+import collections
+import csv
+import functools
+import glob
+import io
+import json
+import math
+import os
 import queue
 import re
+import shutil
+import signal
 import subprocess
 import sys
+import tempfile
 import threading
 import time
+import weakref
 import bisect
+import mmap
+import struct
+from array import array
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Tuple, List, Dict
+from typing import Callable, Optional, Tuple, List, Dict, Sequence
 
 try:
     import tkinter as tk
-    from tkinter import filedialog
+    from tkinter import filedialog, ttk
 except Exception as e:
-    raise SystemExit(f"tkinter를 불러올 수 없습니다. Python 기본 설치를 확인하세요. err={e}")
+    # (변경) --analyze 같은 헤드리스 모드는 tkinter 없이도 동작. UI를 띄울 때만 에러로 종료.
+    tk = None  # type: ignore[assignment]
+    filedialog = None  # type: ignore[assignment]
+    ttk = None  # type: ignore[assignment]
+    _TK_IMPORT_ERROR: Optional[Exception] = e
+else:
+    _TK_IMPORT_ERROR = None
+
+
+try:
+    import zstandard  # (선택) .zst 로그 재생/저장
+except Exception:
+    zstandard = None  # type: ignore[assignment]
+
+try:
+    import sqlite3  # (선택) 세션 카탈로그(--ingest/--query/--db-live). 일부 임베디드 파이썬에는 없음
+except Exception:
+    sqlite3 = None  # type: ignore[assignment]
+
+try:
+    import numpy as np  # (선택) 히트맵
+except Exception:
+    np = None  # type: ignore[assignment]
+
+try:
+    from PIL import Image  # (선택) PNG 저장
+except Exception:
+    Image = None  # type: ignore[assignment]
+
+
+def _require_tk():
+    if tk is None:
+        raise SystemExit(f"tkinter를 불러올 수 없습니다. Python 기본 설치를 확인하세요. err={_TK_IMPORT_ERROR}")
 
 
 @dataclass
@@ -53,6 +102,8 @@ class Event:
     color: str = "#ef4444"
     label: str = ""
     cat: int = 1  # 1..7 (오토클릭짱 로그 카테고리)
+    idx: int = 0  # 마커 idx(없으면 0, 필터용)
+    meta: str = ""  # 라인의 k=v 메타데이터 부분(meta_items 로 풀어 봄)
 
 
 RE_START_PROJ = re.compile(r"startProjection\s+screen=(\d+)x(\d+)")
@@ -139,195 +190,4212 @@ def cat_color(cat: int) -> str:
     }.get(int(cat), "#ef4444")
 
 
-def cat_name(cat: int) -> str:
-    # 요청: "1.순번 ... 7.이미지모듈"
-    return {
-        1: "1.순번",
-        2: "2.독립",
-        3: "3.스와이프",
-        4: "4.단독",
-        5: "5.방향모듈",
-        6: "6.색상모듈",
-        7: "7.이미지모듈",
-    }.get(int(cat), str(cat))
+def cat_name(cat: int) -> str:
+    # 요청: "1.순번 ... 7.이미지모듈"
+    return {
+        1: "1.순번",
+        2: "2.독립",
+        3: "3.스와이프",
+        4: "4.단독",
+        5: "5.방향모듈",
+        6: "6.색상모듈",
+        7: "7.이미지모듈",
+    }.get(int(cat), str(cat))
+
+
+def parse_size_from_line(line: str) -> Optional[ScreenSize]:
+    for rx in (RE_START_PROJ, RE_SIZE_CHANGED, RE_RESIZED):
+        m = rx.search(line)
+        if m:
+            w = int(m.group(1))
+            h = int(m.group(2))
+            return ScreenSize(w=w, h=h).clamp()
+    return None
+
+
+def parse_point_token(tok: str) -> Optional[Tuple[int, int]]:
+    tok = tok.strip()
+    if tok.startswith("(") and tok.endswith(")"):
+        inner = tok[1:-1]
+        parts = inner.split(",")
+        if len(parts) == 2:
+            try:
+                return int(parts[0].strip()), int(parts[1].strip())
+            except Exception:
+                return None
+    m = RE_POINT.search(tok)
+    if m:
+        return int(m.group(1)), int(m.group(2))
+    return None
+
+
+def parse_event_from_line(line: str, now: Optional[float] = None) -> Optional[Event]:
+    # now: 이벤트 시각(기본 벽시계). 재생/헤드리스에서는 로그 기준 시각을 넘긴다.
+    ts = time.time() if now is None else float(now)
+    cat = classify_cat(line)
+    col = cat_color(cat)
+    # swipe(from,to)
+    m = RE_SWIPE_FROM_TO.search(line)
+    if m:
+        fx, fy, tx, ty = map(int, m.groups())
+        return Event(ts=ts, kind="swipe", p0=(fx, fy), p1=(tx, ty), color=col, label="swipe", cat=cat)
+
+    m = RE_SWIPE_CALL.search(line)
+    if m:
+        fx, fy, tx, ty = map(int, m.groups())
+        return Event(ts=ts, kind="swipe", p0=(fx, fy), p1=(tx, ty), color=col, label="swipe", cat=cat)
+
+    # swipe(chain) from=Point(...) to=Point(...)
+    m = RE_FROM_POINT_TO_POINT.search(line)
+    if m:
+        p0 = parse_point_token(m.group(1))
+        p1 = parse_point_token(m.group(2))
+        if p0 and p1:
+            return Event(ts=ts, kind="swipe", p0=p0, p1=p1, color=col, label="swipe", cat=cat)
+
+    # tap/click
+    m = RE_TAP1.search(line) or RE_CLICK1.search(line)
+    if m:
+        x, y = int(m.group(1)), int(m.group(2))
+        return Event(ts=ts, kind="tap", p0=(x, y), p1=None, color=col, label="tap", cat=cat)
+
+    return None
+
+
+# (추가) 단일 패스 분류기용 보조 정규식(미리 컴파일)
+RE_CAT = re.compile(r"\bcat=(\d)\b")
+RE_IDX = re.compile(r"\bidx=(\d+)")
+RE_MODULE_WORD = re.compile(r"\bmodule\b")
+
+
+@dataclass
+class ParsedLine:
+    """
+    classify_line 결과(라인 1개 = 레코드 1개).
+    - kind: tap|swipe|marker|size
+    - marker 레코드는 p0=(xPx,yPx), mkind=마커 kind
+    - size: 화면 크기 변경이 같이 찍힌 경우(없으면 None)
+    - meta: 탭/스와이프/마커 라인의 메타데이터 부분(문자열 1개, meta_items 로 필요할 때만 푼다)
+    """
+
+    kind: str
+    cat: int = 1
+    idx: int = 0
+    p0: Optional[Tuple[int, int]] = None
+    p1: Optional[Tuple[int, int]] = None
+    size: Optional[ScreenSize] = None
+    mkind: str = ""
+    meta: str = ""
+
+
+def _classify_cat_fast(line: str) -> int:
+    # classify_cat 과 같은 결과. 정규식은 리터럴이 있을 때만 돌린다.
+    s = line
+    if "cat=" in s:
+        m = RE_CAT.search(s)
+        if m:
+            v = int(m.group(1))
+            if 1 <= v <= 7:
+                return v
+    if "image_module" in s:
+        return 7
+    if "color_module" in s:
+        return 6
+    if "module" in s and RE_MODULE_WORD.search(s):
+        return 5
+    if "solo" in s and ("soloVerify" in s or "solo_verify" in s or "solo_main" in s or "solo_item" in s):
+        return 4
+    if "swipe" in s:
+        return 3
+    if "independent" in s or "독립" in s:
+        return 2
+    return 1
+
+
+def _meta_tail(line: str) -> str:
+    """
+    라인의 메타데이터 부분. `ATX_STREAM MARKER phase=try ... delayMs=393` → `MARKER phase=try ... delayMs=393`.
+    ATX_STREAM 이 없으면 logcat 머리(시간/태그) 뒤 전체. 원본 라인 대신 이 조각만 들고 있는다.
+    """
+    i = line.find("ATX_STREAM ")
+    if i >= 0:
+        return line[i + 11 :]
+    i = line.find("): ")
+    return line[i + 3 :] if i >= 0 else line
+
+
+@functools.lru_cache(maxsize=4096)
+def meta_items(meta: str) -> Tuple[Tuple[str, str], ...]:
+    """meta 문자열의 k=v 목록(순서 유지). 호버 툴팁처럼 항목 1개를 볼 때만 푼다."""
+    return tuple(RE_ATX_KV.findall(meta))
+
+
+def _parse_marker_record(line: str) -> Optional[ParsedLine]:
+    try:
+        kv = dict(RE_ATX_KV.findall(line))
+        idx = int(kv.get("idx", "0"))
+        x = int(kv.get("xPx", "-1"))
+        y = int(kv.get("yPx", "-1"))
+        cat = int(kv.get("cat", "0"))
+    except Exception:
+        return None
+    if idx == 0 or x < 0 or y < 0:
+        return None
+    if cat <= 0:
+        cat = _classify_cat_fast(line)
+    return ParsedLine(kind="marker", cat=cat, idx=idx, p0=(x, y), mkind=kv.get("kind", ""), meta=_meta_tail(line))
+
+
+def classify_line(line: str) -> Optional[ParsedLine]:
+    """
+    로그 라인 1개를 한 번에 분류한다(parse_event_from_line/classify_cat/parse_size_from_line 대체).
+    - 싼 리터럴 검사(ATX_STREAM, MARKER, tap(, swipe, from=, startProjection ...)를 먼저 하고
+      해당되는 정규식만 실행한다. 아무 것도 해당 없으면 None.
+    - ATX_STREAM MARKER 라인은 마커 레코드만 만든다(서비스 포맷상 좌표 이벤트가 같이 찍히지 않음).
+    """
+    if "ATX_STREAM" in line and "MARKER" in line and RE_ATX_STREAM_MARKER.search(line):
+        return _parse_marker_record(line)
+
+    size: Optional[ScreenSize] = None
+    if "startProjection" in line:
+        m = RE_START_PROJ.search(line)
+        if m:
+            size = ScreenSize(w=int(m.group(1)), h=int(m.group(2))).clamp()
+    if size is None and "size changed" in line:
+        m = RE_SIZE_CHANGED.search(line)
+        if m:
+            size = ScreenSize(w=int(m.group(1)), h=int(m.group(2))).clamp()
+    if size is None and "resized to" in line:
+        m = RE_RESIZED.search(line)
+        if m:
+            size = ScreenSize(w=int(m.group(1)), h=int(m.group(2))).clamp()
+
+    # 좌표 이벤트(우선순위는 parse_event_from_line 과 동일)
+    kind = ""
+    p0: Optional[Tuple[int, int]] = None
+    p1: Optional[Tuple[int, int]] = None
+    has_from = "from=" in line
+    if has_from and "swipe" in line:
+        m = RE_SWIPE_FROM_TO.search(line)
+        if m:
+            fx, fy, tx, ty = map(int, m.groups())
+            kind, p0, p1 = "swipe", (fx, fy), (tx, ty)
+    if not kind and "swipe(" in line:
+        m = RE_SWIPE_CALL.search(line)
+        if m:
+            fx, fy, tx, ty = map(int, m.groups())
+            kind, p0, p1 = "swipe", (fx, fy), (tx, ty)
+    if not kind and has_from:
+        m = RE_FROM_POINT_TO_POINT.search(line)
+        if m:
+            a = parse_point_token(m.group(1))
+            b = parse_point_token(m.group(2))
+            if a and b:
+                kind, p0, p1 = "swipe", a, b
+    if not kind:
+        m = None
+        if "tap(" in line:
+            m = RE_TAP1.search(line)
+        if m is None and "click(" in line:
+            m = RE_CLICK1.search(line)
+        if m:
+            kind, p0 = "tap", (int(m.group(1)), int(m.group(2)))
+
+    if not kind:
+        if size is None:
+            return None
+        return ParsedLine(kind="size", size=size)
+
+    idx = 0
+    if "idx=" in line:
+        m = RE_IDX.search(line)
+        if m:
+            idx = int(m.group(1))
+    return ParsedLine(
+        kind=kind, cat=_classify_cat_fast(line), idx=idx, p0=p0, p1=p1, size=size, meta=_meta_tail(line)
+    )
+
+
+def try_get_device_size(serial: Optional[str]) -> Optional[ScreenSize]:
+    # `adb shell wm size` 예: "Physical size: 1080x2400"
+    cmd = ["adb"]
+    if serial:
+        cmd += ["-s", serial]
+    cmd += ["shell", "wm", "size"]
+    try:
+        out = subprocess.check_output(cmd, stderr=subprocess.STDOUT, text=True, encoding="utf-8", errors="ignore")
+    except Exception:
+        return None
+    m = re.search(r"Physical size:\s*(\d+)\s*x\s*(\d+)", out)
+    if not m:
+        m = re.search(r"Override size:\s*(\d+)\s*x\s*(\d+)", out)
+    if m:
+        return ScreenSize(w=int(m.group(1)), h=int(m.group(2))).clamp()
+    return None
+
+
+def _parse_logcat_time_seconds(line: str) -> Optional[float]:
+    """
+    adb logcat -v time 포맷의 시간을 '하루 내 초'로 변환(연/월 경계는 고려하지 않음).
+    재생용 상대시간 계산에만 사용.
+    """
+    m = RE_LOGCAT_TIME.search(line)
+    if not m:
+        return None
+    # month/day는 무시하고, HH:MM:SS.mmm만 사용(동일 로그 파일 내 상대시간에는 충분)
+    hh = int(m.group(3))
+    mm = int(m.group(4))
+    ss = int(m.group(5))
+    ms = int(m.group(6))
+    return hh * 3600.0 + mm * 60.0 + ss + (ms / 1000.0)
+
+
+REPLAY_MAX_GAP_SEC = 0.25  # (중요) 타임스탬프가 있어도 긴 공백은 압축해서 "재생이 안 되는 느낌" 방지
+REPLAY_FALLBACK_STEP_SEC = 0.030  # 30ms (시간 없는 라인용)
+# 시간이 하나도 없는 로그는 이 줄 수 이후부터 간격을 줄여 너무 길게 늘어지지 않게 한다
+REPLAY_FALLBACK_FAST_AFTER = 8000
+REPLAY_FALLBACK_FAST_STEP_SEC = 0.010
+# (추가) 재생 속도 메뉴: "Nx" = N배 느리게(기존 의미), "ffNx" = N배 빠르게, "max" = 처리 가능한 만큼 빠르게
+REPLAY_SPEEDS = (
+    "1x", "2x", "3x", "4x", "5x", "6x", "7x", "8x", "9x", "10x",
+    "ff2x", "ff5x", "ff10x", "ff20x", "ff50x", "ff100x", "max",
+)  # fmt: skip
+REPLAY_COALESCE_CELL_PX = 32  # 빨리감기 중 이벤트를 묶는 격자 크기(기기 좌표 px)
+
+
+def parse_replay_speed(text: str) -> float:
+    """
+    재생 속도 문자열 → 배율(실제 1초에 진행할 로그 초).
+    - "Nx": N배 느리게(1~10) → 1/N
+    - "ffNx": N배 빠르게(1~100) → N
+    - "max": 최대 속도(inf, tick 시간 예산만큼 처리)
+    해석 못 하면 1.0.
+    """
+    t = (text or "").strip().lower()
+    if t == "max":
+        return math.inf
+    m = re.match(r"^(ff)?\s*([0-9]+(?:\.[0-9]+)?)\s*x?$", t)
+    if not m:
+        return 1.0
+    try:
+        v = float(m.group(2))
+    except ValueError:
+        return 1.0
+    if m.group(1):
+        return max(1.0, min(100.0, v))
+    return 1.0 / max(1.0, min(10.0, v))
+
+
+class _RelTimeBuilder:
+    """
+    라인별 logcat 절대초를 순서대로 받아 재생용 상대초를 만든다(스트리밍 인덱싱용).
+    - logcat 시간 파싱 실패 라인(NaN)은 고정 간격(30ms)으로 증가시켜 "재생"이 보이게 한다.
+      아직 시간이 한 번도 없었는데 8천 줄을 넘으면 그 뒤로는 10ms 씩(이미 돌려준 값은 바꾸지 않음).
+    - 긴 공백은 max_gap 으로 압축.
+    """
+
+    def __init__(self, max_gap: float = REPLAY_MAX_GAP_SEC):
+        self.max_gap = float(max_gap)
+        self.t0_abs: Optional[float] = None
+        self.last_rel = 0.0
+        self.had_any_ts = False
+        self.n_fallback = 0
+
+    def add(self, t_abs: float) -> float:
+        if t_abs != t_abs:  # NaN
+            # 시간 없는 라인은 조금씩 증가(안 보이는 "즉시 끝" 방지).
+            # 스트리밍 중 재생/체크포인트가 앞 값을 이미 쓰므로 간격은 지금까지 본 것만으로 정한다.
+            self.n_fallback += 1
+            if not self.had_any_ts and self.n_fallback > REPLAY_FALLBACK_FAST_AFTER:
+                step = REPLAY_FALLBACK_FAST_STEP_SEC
+            else:
+                step = REPLAY_FALLBACK_STEP_SEC
+            self.last_rel = self.last_rel + step
+            return self.last_rel
+        self.had_any_ts = True
+        if self.t0_abs is None:
+            self.t0_abs = t_abs
+        rel_raw = max(0.0, t_abs - self.t0_abs)
+        # (압축) 이전 rel 대비 너무 큰 점프는 제한
+        if rel_raw > self.last_rel + self.max_gap:
+            rel = self.last_rel + self.max_gap
+        else:
+            rel = rel_raw
+        self.last_rel = rel
+        return rel
+
+
+def relative_replay_times(raw_abs: Sequence[float], max_gap: float = REPLAY_MAX_GAP_SEC) -> "array":
+    """라인별 logcat 절대초(시간 없는 라인은 NaN) → 재생용 상대초 배열(_RelTimeBuilder 규칙)."""
+    b = _RelTimeBuilder(max_gap)
+    return array("d", (b.add(t) for t in raw_abs))
+
+
+def load_replay_lines(path: str, max_gap: float = REPLAY_MAX_GAP_SEC) -> List[Tuple[float, str]]:
+    """
+    저장된 로그 파일을 읽어서 (상대초, 라인) 리스트로 만든다.
+    - '# ...' 헤더 라인은 무시
+    - 상대초 계산 규칙은 relative_replay_times 참고(max_gap 보다 긴 공백은 max_gap 으로 압축)
+    """
+    p = Path(path)
+    if not p.exists():
+        return []
+    raw_lines = p.read_text(encoding="utf-8", errors="ignore").splitlines()
+    lines = [ln for ln in raw_lines if ln and not ln.startswith("#")]
+    nan = float("nan")
+    raw_abs = []
+    for ln in lines:
+        t_abs = _parse_logcat_time_seconds(ln)
+        raw_abs.append(nan if t_abs is None else t_abs)
+    rel = relative_replay_times(raw_abs, max_gap)
+    return list(zip(rel, lines))
+
+
+def _logcat_time_bytes(s: bytes) -> float:
+    """bytes 라인의 logcat 시간(하루 내 초). 없으면 NaN. `MM-DD HH:MM:SS.mmm` 으로 시작하면 정규식 없이 처리."""
+    if (
+        len(s) >= 18
+        and s[2] == 45  # -
+        and s[5] == 32  # ' '
+        and s[8] == 58  # :
+        and s[11] == 58
+        and s[14] == 46  # .
+        and (len(s) == 18 or not (s[18:19].isalnum() or s[18] == 95))
+    ):
+        try:
+            return int(s[6:8]) * 3600.0 + int(s[9:11]) * 60.0 + int(s[12:14]) + int(s[15:18]) / 1000.0
+        except ValueError:
+            pass
+    t = _parse_logcat_time_seconds(s.decode("utf-8", errors="ignore"))
+    return float("nan") if t is None else t
+
+
+class LazyLogReplay:
+    """
+    텍스트 로그(.txt / .gz / .zst)를 지연 로딩하는 재생 소스.
+    - 일반 파일은 mmap, 압축 파일은 임시 파일로 스트리밍 해제하면서
+      백그라운드 스레드가 라인 위치/상대초 인덱스(array)를 만든다.
+    - 라인 문자열은 재생이 그 위치에 도달했을 때만 디코드한다.
+    - 인덱싱 중에도 이미 인덱싱된 앞부분은 재생 가능(len 이 점점 늘어남, done=True 면 완료).
+    """
+
+    BLOCK = 4 << 20
+
+    def __init__(self, path: str, max_gap: float = REPLAY_MAX_GAP_SEC):
+        self.path = path
+        low = path.lower()
+        self.codec = "gz" if low.endswith(".gz") else ("zst" if low.endswith(".zst") else "")
+        self.times = array("d")
+        self.starts = array("Q")
+        self.lens = array("I")
+        self._n = 0
+        self.done = False
+        self.error: Optional[str] = None
+        self._rel = _RelTimeBuilder(max_gap)
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stop = False
+        self._mm: Optional[mmap.mmap] = None
+        if self.codec:
+            if self.codec == "zst" and zstandard is None:
+                raise RuntimeError(".zst 재생에는 zstandard 패키지가 필요합니다(pip install zstandard)")
+            self._fp = tempfile.TemporaryFile()
+        else:
+            self._fp = open(path, "rb")
+            if os.path.getsize(path) > 0:
+                self._mm = mmap.mmap(self._fp.fileno(), 0, access=mmap.ACCESS_READ)
+        self._thread = threading.Thread(target=self._index, name="atx-replay-load", daemon=True)
+        self._thread.start()
+
+    def wait_ready(self, timeout: float) -> bool:
+        """첫 블록 인덱싱(또는 완료)까지 최대 timeout 초 대기."""
+        return self._ready.wait(timeout)
+
+    def wait_done(self, timeout: Optional[float] = None) -> bool:
+        """인덱싱 완료까지 최대 timeout 초(None 이면 끝까지) 대기. 끝났으면 True."""
+        self._thread.join(timeout)
+        return self.done
+
+    def copy_to(self, path: str):
+        """로그 본문(압축 로그는 지금까지 해제된 내용)을 path 에 그대로 복사한다."""
+        if not self.codec:
+            shutil.copyfile(self.path, path)
+            return
+        with self._lock, open(path, "wb") as f:
+            self._fp.seek(0)
+            shutil.copyfileobj(self._fp, f)
+
+    def _blocks(self):
+        if not self.codec:
+            mm = self._mm
+            if mm is None:
+                return
+            for a in range(0, len(mm), self.BLOCK):
+                yield mm[a : a + self.BLOCK]
+            return
+        if self.codec == "gz":
+            import gzip
+
+            raw = gzip.open(self.path, "rb")
+        else:
+            raw = zstandard.ZstdDecompressor().stream_reader(open(self.path, "rb"), closefd=True)
+        with raw:
+            while True:
+                chunk = raw.read(self.BLOCK)
+                if not chunk:
+                    break
+                # 해제된 바이트는 임시 파일에 쌓아 두고 라인 조회 시 읽는다
+                with self._lock:
+                    self._fp.seek(0, os.SEEK_END)
+                    self._fp.write(chunk)
+                yield chunk
+
+    def _index(self):
+        base = 0
+        carry = b""
+        try:
+            for chunk in self._blocks():
+                if self._stop:
+                    return
+                data = carry + chunk if carry else chunk
+                cut = data.rfind(b"\n")
+                if cut < 0:
+                    carry = data
+                    continue
+                self._index_block(data[: cut + 1], base)
+                base += cut + 1
+                carry = data[cut + 1 :]
+            if carry:
+                self._index_block(carry, base)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            if self.codec:
+                with self._lock:
+                    self._fp.flush()
+            self.done = True
+            self._ready.set()
+
+    def _index_block(self, body: bytes, base: int):
+        times = self.times
+        starts = self.starts
+        lens = self.lens
+        add = self._rel.add
+        pos = base
+        for ln in body.split(b"\n"):
+            start = pos
+            pos += len(ln) + 1
+            if ln.endswith(b"\r"):
+                ln = ln[:-1]
+            if not ln or ln[0] == 35:  # '#'
+                continue
+            times.append(add(_logcat_time_bytes(ln)))
+            starts.append(start)
+            lens.append(len(ln))
+            self._n += 1
+        self._ready.set()
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, i: int) -> Tuple[float, str]:
+        if i < 0:
+            i += self._n
+        if not (0 <= i < self._n):
+            raise IndexError(i)
+        st = self.starts[i]
+        ln = self.lens[i]
+        if self._mm is not None:
+            b = self._mm[st : st + ln]
+        else:
+            with self._lock:
+                self._fp.seek(st)
+                b = self._fp.read(ln)
+        return self.times[i], b.decode("utf-8", errors="ignore")
+
+    def close(self):
+        self._stop = True
+        try:
+            self._thread.join(timeout=1.0)
+        except Exception:
+            pass
+        try:
+            if self._mm is not None:
+                self._mm.close()
+        except Exception:
+            pass
+        try:
+            self._fp.close()
+        except Exception:
+            pass
+
+
+# ---------------------------------------------------------------------------
+# 헤드리스 분석(--analyze): tkinter 없이 저장 로그를 집계
+# ---------------------------------------------------------------------------
+
+def _minute_key(line: str) -> str:
+    # logcat -v time 의 "MM-DD HH:MM" (시간 없는 라인은 빈 문자열)
+    if len(line) >= 11 and line[2] == "-" and line[5] == " " and line[8] == ":":
+        return line[:11]
+    m = RE_LOGCAT_TIME.search(line)
+    if not m:
+        return ""
+    return f"{m.group(1)}-{m.group(2)} {m.group(3)}:{m.group(4)}"
+
+
+def _iter_range_lines(path: str, start: int, end: int, block: int = 4 << 20):
+    """파일의 [start, end) 구간(줄 경계 정렬됨)을 블록 단위로 읽어 라인을 돌려준다."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        pos = start
+        while pos < end:
+            data = f.read(min(block, end - pos))
+            if not data:
+                break
+            pos += len(data)
+            if pos < end and not data.endswith(b"\n"):
+                tail = f.readline()
+                pos += len(tail)
+                data += tail
+            for line in data.decode("utf-8", errors="ignore").splitlines():
+                yield line
+
+
+def _split_line_chunks(path: str, n_chunks: int, min_chunk_bytes: int = 8 << 20) -> List[Tuple[int, int]]:
+    """
+    파일을 줄 경계에 맞춘 (start, end) 바이트 구간으로 나눈다.
+    너무 잘게 쪼개지 않도록 chunk 최소 크기(min_chunk_bytes)를 둔다.
+    """
+    size = os.path.getsize(path)
+    if size <= 0:
+        return []
+    n = max(1, min(int(n_chunks), size // max(1, min_chunk_bytes) or 1))
+    step = size // n
+    bounds = [0]
+    with open(path, "rb") as f:
+        for i in range(1, n):
+            f.seek(max(bounds[-1], i * step))
+            f.readline()  # 다음 줄 시작으로 정렬
+            pos = f.tell()
+            if pos >= size:
+                break
+            if pos > bounds[-1]:
+                bounds.append(pos)
+    bounds.append(size)
+    return [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1)]
+
+
+def _new_counts() -> Dict[str, Dict[str, Dict[str, int]]]:
+    return {"cat": {}, "idx": {}, "minute": {}}
+
+
+def _bump(table: Dict[str, Dict[str, int]], key: str, kind: str, n: int = 1):
+    row = table.get(key)
+    if row is None:
+        row = table[key] = {}
+    row[kind] = row.get(kind, 0) + n
+
+
+def _analyze_chunk(job: Tuple[str, int, int]) -> dict:
+    # (프로세스 풀 워커) 파일의 [start, end) 구간만 읽어서 집계
+    path, start, end = job
+    counts = _new_counts()
+    kinds: Dict[str, int] = {}
+    n_lines = 0
+    n_matched = 0
+    for line in _iter_range_lines(path, start, end):
+        if not line or line.startswith("#"):
+            continue
+        n_lines += 1
+        rec = classify_line(line)
+        if rec is None:
+            continue
+        n_matched += 1
+        kinds[rec.kind] = kinds.get(rec.kind, 0) + 1
+        if rec.kind == "size":
+            continue
+        _bump(counts["cat"], str(rec.cat), rec.kind)
+        if rec.idx:
+            _bump(counts["idx"], str(rec.idx), rec.kind)
+        mk = _minute_key(line)
+        if mk:
+            _bump(counts["minute"], mk, rec.kind)
+    return {"lines": n_lines, "matched": n_matched, "kinds": kinds, "counts": counts}
+
+
+def _merge_analysis(dst: dict, src: dict):
+    dst["lines"] += src["lines"]
+    dst["matched"] += src["matched"]
+    for k, v in src["kinds"].items():
+        dst["kinds"][k] = dst["kinds"].get(k, 0) + v
+    for sec, table in src["counts"].items():
+        for key, row in table.items():
+            for kind, n in row.items():
+                _bump(dst["counts"][sec], key, kind, n)
+
+
+def analyze_logs(paths: List[str], workers: int = 0) -> dict:
+    """
+    저장된 로그 파일들을 줄 단위 chunk 로 나눠 프로세스 풀에서 집계한다.
+    결과: 카테고리별 / 마커 idx별 / 분(minute)별 tap·swipe·marker 개수.
+    """
+    workers = int(workers) if workers and int(workers) > 0 else (os.cpu_count() or 1)
+    # PowerShell 은 와일드카드를 펼쳐주지 않으므로 직접 확장
+    expanded: List[str] = []
+    for p in paths:
+        if any(ch in p for ch in "*?["):
+            expanded.extend(sorted(glob.glob(p)))
+        else:
+            expanded.append(p)
+    paths = expanded
+    jobs: List[Tuple[str, int, int]] = []
+    for p in paths:
+        if not Path(p).is_file():
+            print(f"[WARN] 파일 없음: {p}", file=sys.stderr)
+            continue
+        for a, b in _split_line_chunks(p, workers * 4):
+            jobs.append((p, a, b))
+
+    total = {"files": [str(p) for p in paths], "lines": 0, "matched": 0, "kinds": {}, "counts": _new_counts()}
+    t0 = time.perf_counter()
+    if workers <= 1 or len(jobs) <= 1:
+        for j in jobs:
+            _merge_analysis(total, _analyze_chunk(j))
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            for part in ex.map(_analyze_chunk, jobs):
+                _merge_analysis(total, part)
+    total["elapsed_sec"] = round(time.perf_counter() - t0, 3)
+    total["chunks"] = len(jobs)
+    # 보기 좋게 정렬(숫자 키는 숫자순)
+    for sec in ("cat", "idx"):
+        total["counts"][sec] = dict(sorted(total["counts"][sec].items(), key=lambda kv: int(kv[0])))
+    total["counts"]["minute"] = dict(sorted(total["counts"]["minute"].items()))
+    return total
+
+
+def write_analysis(result: dict, out_path: str = "", fmt: str = ""):
+    """
+    집계 결과를 JSON/CSV로 쓴다. out_path 가 비면 stdout.
+    fmt 가 비면 확장자(.csv)로 판단, 기본 json.
+    """
+    fmt = (fmt or ("csv" if out_path.lower().endswith(".csv") else "json")).lower()
+    if fmt == "csv":
+        buf = io.StringIO()
+        w = csv.writer(buf)
+        w.writerow(["section", "key", "tap", "swipe", "marker", "total"])
+        for sec in ("cat", "idx", "minute"):
+            for key, row in result["counts"][sec].items():
+                tap = row.get("tap", 0)
+                swipe = row.get("swipe", 0)
+                marker = row.get("marker", 0)
+                w.writerow([sec, key, tap, swipe, marker, tap + swipe + marker])
+        text = buf.getvalue()
+    else:
+        text = json.dumps(result, ensure_ascii=False, indent=2) + "\n"
+    if out_path:
+        p = Path(out_path)
+        if p.parent:
+            p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(text, encoding="utf-8", newline="")
+    else:
+        sys.stdout.write(text)
+
+
+# ---------------------------------------------------------------------------
+# 마커 실행 타이밍 분석(MARKER delayMs/jitterPct/pressMs/phase, ACT/OK press=/hold=/dur=)
+# ---------------------------------------------------------------------------
+
+RE_TIMING_MS = re.compile(r"\b(press|hold|dur)=(\d+)ms\b")
+
+TIMING_COLUMNS = [
+    "serial",
+    "idx",
+    "cat",
+    "kind",
+    "n",
+    "delay_ms",
+    "jitter_pct",
+    "press_cfg_ms",
+    "interval_p50",
+    "interval_p95",
+    "interval_p99",
+    "drift_p50",
+    "drift_p95",
+    "drift_p99",
+    "late_pct",
+    "acts",
+    "press_p50",
+    "press_p95",
+    "hold_p50",
+    "hold_p95",
+    "dur_p50",
+    "dur_p95",
+]
+
+
+def _percentile(sorted_vals: Sequence[float], p: float) -> Optional[float]:
+    n = len(sorted_vals)
+    if n == 0:
+        return None
+    return sorted_vals[min(n - 1, max(0, int(round(p / 100.0 * (n - 1)))))]
+
+
+def _meta_int(kv: Dict[str, str], key: str) -> Optional[int]:
+    v = kv.get(key)
+    if v is None:
+        return None
+    try:
+        return int(float(v))
+    except ValueError:
+        return None
+
+
+class _TimingSeries:
+    """마커 idx 1개(기기별)의 최근 실행 간격/설정값/ACT 시간 기록."""
+
+    __slots__ = ("cat", "kind", "delay_ms", "jitter_pct", "press_cfg_ms", "last_t", "n", "acts", "interval", "drift", "late", "press", "hold", "dur")
+
+    def __init__(self, keep: int):
+        self.cat = 0
+        self.kind = ""
+        self.delay_ms: Optional[int] = None
+        self.jitter_pct: Optional[int] = None
+        self.press_cfg_ms: Optional[int] = None
+        self.last_t: Optional[float] = None
+        self.n = 0
+        self.acts = 0
+        self.interval: "collections.deque" = collections.deque(maxlen=keep)
+        self.drift: "collections.deque" = collections.deque(maxlen=keep)
+        self.late: "collections.deque" = collections.deque(maxlen=keep)
+        self.press: "collections.deque" = collections.deque(maxlen=keep)
+        self.hold: "collections.deque" = collections.deque(maxlen=keep)
+        self.dur: "collections.deque" = collections.deque(maxlen=keep)
+
+
+class MarkerTiming:
+    """
+    마커 idx별 실행 타이밍 집계.
+    - MARKER 라인(phase 가 없거나 try 인 것)을 "실행 1회"로 보고, 직전 실행과의 간격(ms)을 설정 delayMs 와 비교(drift).
+    - late: 간격이 delayMs*(1+jitterPct/100) 를 넘은 비율(기기 클릭 루프가 설정 주기보다 밀린 정도)
+    - ACT/OK 라인의 press=/hold=/dur= 값 분포
+    - 시간은 logcat 시각을 쓴다(표시 시계/재생 속도와 무관). series 마다 최근 keep 회만 유지.
+    """
+
+    COUNT_PHASES = ("", "try")
+
+    def __init__(self, keep: int = 20_000):
+        self.keep = int(keep)
+        self.series: Dict[Tuple[str, int], _TimingSeries] = {}
+        self.version = 0
+
+    def reset(self):
+        self.series.clear()
+        self.version += 1
+
+    def _get(self, serial: str, idx: int) -> _TimingSeries:
+        key = (serial, idx)
+        ts = self.series.get(key)
+        if ts is None:
+            ts = _TimingSeries(self.keep)
+            self.series[key] = ts
+        return ts
+
+    def feed(self, line: str, rec: Optional[ParsedLine], serial: str = "") -> bool:
+        """라인 1개 반영(마커/idx 있는 탭·스와이프만). 반영했으면 True."""
+        if rec is None or rec.idx == 0 or rec.kind not in ("marker", "tap", "swipe"):
+            return False
+        t = _parse_logcat_time_seconds(line)
+        st = self._get(serial, rec.idx)
+        st.cat = rec.cat
+        if rec.kind != "marker":
+            st.acts += 1
+            for k, v in RE_TIMING_MS.findall(line):
+                getattr(st, k).append(int(v))
+            self.version += 1
+            return True
+        kv = dict(RE_ATX_KV.findall(line))
+        if kv.get("phase", "") not in self.COUNT_PHASES:
+            return False
+        st.kind = rec.mkind
+        delay = _meta_int(kv, "delayMs")
+        jitter = _meta_int(kv, "jitterPct")
+        press = _meta_int(kv, "pressMs")
+        if delay is not None:
+            st.delay_ms = delay
+        if jitter is not None:
+            st.jitter_pct = jitter
+        if press is not None:
+            st.press_cfg_ms = press
+        st.n += 1
+        if t is not None:
+            if st.last_t is not None:
+                dt = t - st.last_t
+                if dt < 0:
+                    dt += 86400.0  # 자정 넘김
+                ms = dt * 1000.0
+                st.interval.append(ms)
+                if st.delay_ms is not None:
+                    st.drift.append(ms - st.delay_ms)
+                    limit = st.delay_ms * (1.0 + (st.jitter_pct or 0) / 100.0)
+                    st.late.append(1 if ms > limit else 0)
+            st.last_t = t
+        self.version += 1
+        return True
+
+    def rows(self) -> List[dict]:
+        out: List[dict] = []
+        for (serial, idx), st in sorted(self.series.items(), key=lambda kv: (kv[0][0], kv[0][1])):
+            iv = sorted(st.interval)
+            dr = sorted(st.drift)
+            pr = sorted(st.press)
+            ho = sorted(st.hold)
+            du = sorted(st.dur)
+
+            def r1(v: Optional[float]) -> Optional[float]:
+                return None if v is None else round(float(v), 1)
+
+            out.append(
+                {
+                    "serial": serial,
+                    "idx": idx,
+                    "cat": st.cat,
+                    "kind": st.kind,
+                    "n": st.n,
+                    "delay_ms": st.delay_ms,
+                    "jitter_pct": st.jitter_pct,
+                    "press_cfg_ms": st.press_cfg_ms,
+                    "interval_p50": r1(_percentile(iv, 50)),
+                    "interval_p95": r1(_percentile(iv, 95)),
+                    "interval_p99": r1(_percentile(iv, 99)),
+                    "drift_p50": r1(_percentile(dr, 50)),
+                    "drift_p95": r1(_percentile(dr, 95)),
+                    "drift_p99": r1(_percentile(dr, 99)),
+                    "late_pct": r1(100.0 * sum(st.late) / len(st.late)) if st.late else None,
+                    "acts": st.acts,
+                    "press_p50": _percentile(pr, 50),
+                    "press_p95": _percentile(pr, 95),
+                    "hold_p50": _percentile(ho, 50),
+                    "hold_p95": _percentile(ho, 95),
+                    "dur_p50": _percentile(du, 50),
+                    "dur_p95": _percentile(du, 95),
+                }
+            )
+        return out
+
+
+def write_timing_csv(rows: List[dict], out_path: str = ""):
+    """MarkerTiming.rows() → CSV(out_path 비우면 stdout)."""
+    fp = open(out_path, "w", encoding="utf-8", newline="") if out_path else sys.stdout
+    try:
+        w = csv.DictWriter(fp, fieldnames=TIMING_COLUMNS)
+        w.writeheader()
+        for r in rows:
+            w.writerow({k: ("" if r.get(k) is None else r.get(k)) for k in TIMING_COLUMNS})
+    finally:
+        if out_path:
+            fp.close()
+
+
+def analyze_timing(paths: List[str]) -> MarkerTiming:
+    """(헤드리스) 저장 로그들의 마커 타이밍 집계. 여러 기기 스냅샷의 `[serial] ` 접두어는 기기로 구분."""
+    timing = MarkerTiming()
+    for p in paths:
+        for path in sorted(glob.glob(p)) if any(ch in p for ch in "*?[") else [p]:
+            if path.lower().endswith(".atxrec"):
+                src = AtxRecReplay(path)
+                try:
+                    for i in range(len(src)):
+                        rec = src.record(i)
+                        if rec is not None and rec.idx:
+                            timing.feed(src[i][1], rec)
+                finally:
+                    src.close()
+                continue
+            with _open_log_text(path) as f:
+                for ln in f:
+                    serial = ""
+                    if ln.startswith("["):
+                        j = ln.find("] ")
+                        if j > 0:
+                            serial, ln = ln[1:j], ln[j + 2 :]
+                    if "idx=" not in ln:
+                        continue
+                    timing.feed(ln, classify_line(ln), serial)
+    return timing
+
+
+# ---------------------------------------------------------------------------
+# 런 비교(--compare A B): 두 저장 로그의 마커 실행을 idx 순서(사이클)로 맞춰 비교
+# ---------------------------------------------------------------------------
+
+# 로그 전체 bytes 에 한 번 돌려 MARKER/ACT/OK 라인만 뽑는다(키 순서와 무관하게 idx/cat/phase 캡처).
+RE_RUN_ROW = re.compile(
+    rb"^(?:\[([^\]\n]*)\] )?(\d\d-\d\d \d\d:\d\d:\d\d\.\d\d\d) [^\n]*?\bATX_STREAM (MARKER|ACT|OK)\b"
+    rb"(?=[^\n]*?\bidx=(-?\d+))(?=(?:[^\n]*?\bcat=(\d+))?)(?=(?:[^\n]*?\bphase=(\w*))?)",
+    re.M,
+)
+
+RE_RUN_STAMP = re.compile(rb"^(?:\[([^\]\n]*)\] )?(\d\d-\d\d \d\d:\d\d:\d\d\.\d\d\d) ", re.M)
+RUN_SPAN_PROBE = 1 << 16  # 로그 처음/마지막 시각을 찾을 때 앞뒤로 보는 바이트 수
+
+COMPARE_COLUMNS = [
+    "idx",
+    "cat",
+    "n_a",
+    "n_b",
+    "matched",
+    "missing",
+    "extra",
+    "first_diff_cycle",
+    "interval_a",
+    "interval_b",
+    "interval_delta",
+    "offset_delta_p50",
+    "offset_delta_p95",
+    "latency_a",
+    "latency_b",
+    "latency_delta",
+]
+
+
+@dataclass
+class MarkerRun:
+    """
+    저장 로그 1개의 마커 실행 시퀀스(시간순 NumPy 배열).
+    - t: 첫 실행 기준 초, idx/cat: 마커, lat: MARKER → 바로 다음 같은 idx ACT/OK 까지 초(없으면 NaN)
+    - MARKER 가 없는 로그(ACT/OK 만)는 ACT/OK 를 실행으로 본다.
+    - start/end: 로그(그 기기 라인)의 처음/마지막 시각(t 와 같은 기준). 런이 어디까지 기록됐는지 판단용
+    """
+
+    path: str
+    serial: str
+    t: "np.ndarray"
+    idx: "np.ndarray"
+    cat: "np.ndarray"
+    lat: "np.ndarray"
+    start: float = 0.0
+    end: float = 0.0
+
+    def __len__(self) -> int:
+        return int(self.t.size)
+
+
+def _read_log_bytes(path: str) -> bytes:
+    """저장 로그 전체를 bytes 로(.gz/.zst 는 풀어서, .atxrec 는 ATX 레코드의 원본 라인만 이어 붙여서)."""
+    low = path.lower()
+    if low.endswith(".atxrec"):
+        src = AtxRecReplay(path)
+        try:
+            lines: List[bytes] = []
+            for buf, offs in src.record_chunks():
+                u8 = np.frombuffer(buf, dtype=np.uint8)
+                off = np.frombuffer(offs, dtype=np.uint64).astype(np.int64)
+                head = off + REC_LEN.size
+                n = u8[off].astype(np.int64) | (u8[off + 1].astype(np.int64) << 8) | (u8[off + 2].astype(np.int64) << 16)
+                n |= u8[off + 3].astype(np.int64) << 24
+                raw = (n & REC_RAW) != 0
+                n &= ~REC_RAW
+                # 헤더 있는 레코드: 헤더 + mkind 뒤가 라인. 헤더 없는 레코드(REC_RAW): 바로 라인
+                ml = u8[np.where(raw, off, head + REC_HEAD.size - 1)]
+                starts = np.where(raw, head, head + REC_HEAD.size + ml)
+                ends = head + n
+                del u8
+                lines.extend(buf[a:b] for a, b in zip(starts.tolist(), ends.tolist()))
+            return b"\n".join(lines)
+        finally:
+            src.close()
+    if low.endswith(".gz"):
+        import gzip
+
+        with gzip.open(path, "rb") as f:
+            return f.read()
+    if low.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(".zst 로그에는 zstandard 패키지가 필요합니다(pip install zstandard)")
+        with open(path, "rb") as f, zstandard.ZstdDecompressor().stream_reader(f) as r:
+            return r.read()
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _logcat_seconds_array(stamps: List[bytes]) -> "np.ndarray":
+    """`MM-DD HH:MM:SS.mmm` bytes 목록 → 하루 내 초(float64). 자정을 넘기면 +86400 해서 단조 증가로."""
+    if not stamps:
+        return np.zeros(0, dtype=np.float64)
+    d = np.array(stamps, dtype="S18").view(np.uint8).reshape(-1, 18).astype(np.int64) - 48
+    sec = (d[:, 6] * 10 + d[:, 7]) * 3600 + (d[:, 9] * 10 + d[:, 10]) * 60 + d[:, 12] * 10 + d[:, 13]
+    t = sec + (d[:, 15] * 100 + d[:, 16] * 10 + d[:, 17]) / 1000.0
+    if t.size > 1:
+        t += np.concatenate(([0], np.cumsum(np.diff(t) < -43200.0))) * 86400.0
+    return t
+
+
+def load_marker_run(path: str, serial: str = "") -> MarkerRun:
+    """
+    (벡터화) 저장 로그 1개 → MarkerRun. 라인별 파싱 없이 정규식 1회(findall) + NumPy 로 처리한다.
+    여러 기기 스냅샷(`[serial] ` 접두어)은 serial 만, 비우면 처음 나온 기기만 쓴다.
+    """
+    data = _read_log_bytes(path)
+    rows = RE_RUN_ROW.findall(data)
+    stamps = RE_RUN_STAMP.findall(data[:RUN_SPAN_PROBE]), RE_RUN_STAMP.findall(data[-RUN_SPAN_PROBE:])
+    del data
+    serials = {r[0] for r in rows}
+    if serials - {b""}:
+        want = serial.encode() if serial else next(r[0] for r in rows if r[0])
+        if not serial and len(serials) > 1:
+            print(f"[WARN] {path}: 여러 기기 로그입니다. 첫 기기({want.decode(errors='ignore')})만 비교합니다(--serial 로 지정)", file=sys.stderr)
+        rows = [r for r in rows if r[0] == want]
+        stamps = tuple([s for s in st if s[0] == want] for st in stamps)
+    # 로그 첫/마지막 시각을 앞뒤에 붙여 같이 변환(자정 넘김 보정이 행들과 같게)
+    head, tail = stamps[0][:1], stamps[1][-1:]
+    t = _logcat_seconds_array([r[1] for r in head + rows + tail])
+    span = (float(t.min()), float(t.max())) if t.size else (0.0, 0.0)
+    t = t[len(head) : t.size - len(tail)]
+    typ = np.array([r[2] == b"MARKER" for r in rows], dtype=bool)
+    idx = np.array([int(r[3]) for r in rows], dtype=np.int64)
+    cat = np.array([int(r[4]) if r[4] else 0 for r in rows], dtype=np.int64)
+    counted = {p.encode() for p in MarkerTiming.COUNT_PHASES}
+    exe = typ & np.array([r[5] in counted for r in rows], dtype=bool)
+    act = ~typ
+    # 실행 MARKER 와 ACT/OK 만 남기고(그 외 phase 버림) idx → 시간 → MARKER 먼저 순으로 정렬
+    keep = exe | act
+    t, idx, cat, exe = t[keep], idx[keep], cat[keep], exe[keep]
+    lat = np.full(t.size, np.nan)
+    if exe.any():
+        order = np.lexsort((~exe, t, idx))
+        so_t, so_idx, so_exe = t[order], idx[order], exe[order]
+        # ACT/OK 바로 앞 행이 같은 idx 의 실행 MARKER 면 그 MARKER 의 지연
+        hit = np.nonzero(~so_exe[1:] & so_exe[:-1] & (so_idx[1:] == so_idx[:-1]))[0]
+        lat[order[hit]] = so_t[hit + 1] - so_t[hit]
+        sel = exe
+    else:
+        sel = np.ones(t.size, dtype=bool)
+    t, idx, cat, lat = t[sel], idx[sel], cat[sel], lat[sel]
+    order = np.argsort(t, kind="stable")
+    t = t[order]
+    t0 = float(t[0]) if t.size else span[0]
+    return MarkerRun(
+        path=path, serial=serial, t=t - t0, idx=idx[order], cat=cat[order], lat=lat[order], start=span[0] - t0, end=span[1] - t0
+    )
+
+
+def _group_pct(groups: "np.ndarray", vals: "np.ndarray", n: int, p: float) -> "np.ndarray":
+    """groups(0..n-1)별 vals 의 p 백분위(_percentile 과 같은 위치 규칙). 값이 없는 그룹은 NaN."""
+    ok = ~np.isnan(vals)
+    g, v = groups[ok], vals[ok]
+    order = np.lexsort((v, g))
+    g, v = g[order], v[order]
+    cnt = np.bincount(g, minlength=n)
+    start = np.concatenate(([0], np.cumsum(cnt)[:-1]))
+    pos = start + np.rint(p / 100.0 * np.maximum(cnt - 1, 0)).astype(np.int64)
+    out = np.full(n, np.nan)
+    has = cnt > 0
+    out[has] = v[pos[has]]
+    return out
+
+
+def _run_cycles(run: MarkerRun, head: int) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """실행별 사이클 번호(0=첫 head 이전, 1..) / 사이클 시작 기준 초, head 실행 시각들."""
+    is_head = run.idx == head
+    cyc = np.cumsum(is_head)
+    head_t = run.t[is_head]
+    start = np.zeros(run.t.size)
+    if head_t.size:
+        start = np.where(cyc > 0, head_t[np.maximum(cyc - 1, 0)], 0.0)
+    return cyc, run.t - start, head_t
+
+
+COMPARE_BASE_CELLS = 1 << 25  # A 길이 x B 길이가 이 이하면 행 비트를 전부 저장해 역추적(그 위는 Hirschberg 로 반씩 나눔)
+COMPARE_SPAN_TOL = 0.05  # 짝 범위 밖 실행이 상대 로그 범위(처음~마지막 라인 시각)를 이 초 넘게 벗어나야 범위밖(tail)으로 본다
+
+
+def _lcs_masks(seq: "np.ndarray") -> Dict[int, int]:
+    """심볼별 위치 비트마스크(bit j = seq[j] 가 그 심볼)."""
+    return {
+        int(c): int.from_bytes(np.packbits(seq == c, bitorder="little").tobytes(), "little")
+        for c in np.unique(seq)
+    }
+
+
+def _lcs_rows(a: "np.ndarray", b: "np.ndarray", keep: bool = False):
+    """
+    (비트 병렬, Hyyrö) a 를 한 칸씩 넣으며 b 전체 열을 정수 1개(V)로 갱신하는 LCS DP.
+    V 의 bit j 가 1 이면 L[j+1] == L[j](b 앞 j+1 개와의 LCS 길이가 늘지 않음). 마지막 V, keep 이면 모든 행의 V 목록.
+    """
+    masks = _lcs_masks(b)
+    full = (1 << b.size) - 1
+    v = full
+    rows = [v] if keep else None
+    for c in a.tolist():
+        m = masks.get(c)
+        if m:
+            u = v & m
+            v = ((v + u) | (v - u)) & full
+        if keep:
+            rows.append(v)
+    return rows if keep else v
+
+
+def _lcs_lengths(v: int, n: int) -> "np.ndarray":
+    """V → L[0..n]."""
+    bits = np.unpackbits(np.frombuffer(v.to_bytes((n + 7) // 8, "little"), dtype=np.uint8), bitorder="little")[:n]
+    return np.concatenate(([0], np.cumsum(1 - bits.astype(np.int64))))
+
+
+def _lcs_base(a: "np.ndarray", b: "np.ndarray") -> Tuple[List[int], List[int]]:
+    """작은 구간: 행 V 를 전부 두고 끝에서부터 역추적 → (a 위치 목록, b 위치 목록)."""
+    rows = _lcs_rows(a, b, keep=True)
+    i, j = a.size, b.size
+    pa: List[int] = []
+    pb: List[int] = []
+    while i and j:
+        v = rows[i]
+        if (v >> (j - 1)) & 1:
+            j -= 1  # L[i][j] == L[i][j-1]
+            continue
+        low = (1 << j) - 1
+        i -= 1
+        if (rows[i] & low).bit_count() != (v & low).bit_count():
+            # 왼쪽·위 모두 1 작음 → 대각선(a[i] == b[j-1])
+            j -= 1
+            pa.append(i)
+            pb.append(j)
+    return pa, pb
+
+
+def _lcs_pairs(a: "np.ndarray", b: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    두 심볼 시퀀스의 LCS 짝(위치 오름차순). 공통 앞/뒤는 NumPy 비교로 바로 짝짓고,
+    남은 구간은 비트 병렬 DP + Hirschberg 분할(메모리 O(n))로 푼다.
+    """
+    pa: List["np.ndarray"] = []
+    pb: List["np.ndarray"] = []
+    todo = [(0, a.size, 0, b.size)]
+    while todo:
+        alo, ahi, blo, bhi = todo.pop()
+        n = min(ahi - alo, bhi - blo)
+        diff = np.nonzero(a[alo : alo + n] != b[blo : blo + n])[0]
+        k = int(diff[0]) if diff.size else n
+        if k:
+            pa.append(np.arange(alo, alo + k))
+            pb.append(np.arange(blo, blo + k))
+            alo, blo = alo + k, blo + k
+        n = min(ahi - alo, bhi - blo)
+        diff = np.nonzero(a[ahi - n : ahi][::-1] != b[bhi - n : bhi][::-1])[0]
+        k = int(diff[0]) if diff.size else n
+        if k:
+            pa.append(np.arange(ahi - k, ahi))
+            pb.append(np.arange(bhi - k, bhi))
+            ahi, bhi = ahi - k, bhi - k
+        na, nb = ahi - alo, bhi - blo
+        if not na or not nb:
+            continue
+        if na * nb <= COMPARE_BASE_CELLS or na == 1:
+            ia, ib = _lcs_base(a[alo:ahi], b[blo:bhi])
+            pa.append(np.array(ia, dtype=np.int64) + alo)
+            pb.append(np.array(ib, dtype=np.int64) + blo)
+            continue
+        # A 가운데 행에서 앞쪽 DP + 뒤집은 뒤쪽 DP 의 합이 최대인 B 위치로 나눈다
+        mid = (alo + ahi) // 2
+        fwd = _lcs_lengths(_lcs_rows(a[alo:mid], b[blo:bhi]), nb)
+        bwd = _lcs_lengths(_lcs_rows(a[mid:ahi][::-1], b[blo:bhi][::-1]), nb)
+        k = blo + int(np.argmax(fwd + bwd[::-1]))
+        todo.append((alo, mid, blo, k))
+        todo.append((mid, ahi, k, bhi))
+    if not pa:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    ia, ib = np.concatenate(pa).astype(np.int64), np.concatenate(pb).astype(np.int64)
+    order = np.argsort(ia, kind="stable")
+    return ia[order], ib[order]
+
+
+def _align_runs(
+    a: MarkerRun, b: MarkerRun, ga: "np.ndarray", gb: "np.ndarray"
+) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray"]:
+    """
+    두 런의 실행 순서(idx 시퀀스)를 LCS 로 맞춘다(시각은 짝짓기에 쓰지 않음).
+    → (짝 A 위치, 짝 B 위치, A 누락 mask, B 추가 mask, A 범위밖 mask, B 범위밖 mask)
+    - 짝지어지지 않은 실행은 누락/추가. 한쪽 런에서 실행을 지우면 지운 실행이 그대로 누락으로 잡힌다.
+    - 첫 짝 앞/마지막 짝 뒤의 실행만, 가장 가까운 짝에서 두 런 시각 비율(짝 시각 직선 맞춤의 기울기)로 상대 런에 옮겼을 때
+      상대 로그 범위(start~end)를 벗어나면 범위밖(상대가 늦게 시작/먼저 끝남)으로 본다. 여유 = max(COMPARE_SPAN_TOL, 맞춤 잔차 p95)
+    """
+    ia, ib = _lcs_pairs(ga, gb)
+    miss = np.ones(len(a), dtype=bool)
+    extra = np.ones(len(b), dtype=bool)
+    miss[ia] = False
+    extra[ib] = False
+    tail_a = np.zeros(len(a), dtype=bool)
+    tail_b = np.zeros(len(b), dtype=bool)
+    if ia.size:
+        ta, tb = a.t[ia], b.t[ib]
+        rate, res = 1.0, np.abs(tb - ta - float(np.median(tb - ta)))
+        if ia.size > 1 and ta[-1] > ta[0]:
+            beta, alpha = np.polyfit(ta, tb, 1)
+            if beta > 0:
+                rate, res = float(beta), np.abs(tb - (alpha + beta * ta))
+        tol = max(COMPARE_SPAN_TOL, float(np.percentile(res, 95)))
+        for run, other, mask, p0, p1, q0, q1, r, tl in (
+            (a, b, tail_a, ia[0], ia[-1], tb[0], tb[-1], rate, tol),
+            (b, a, tail_b, ib[0], ib[-1], ta[0], ta[-1], 1.0 / rate, tol / rate),
+        ):
+            mask[:p0] = q0 - (run.t[p0] - run.t[:p0]) * r < other.start - tl
+            mask[p1 + 1 :] = q1 + (run.t[p1 + 1 :] - run.t[p1]) * r > other.end + tl
+        miss &= ~tail_a
+        extra &= ~tail_b
+    return ia, ib, miss, extra, tail_a, tail_b
+
+
+def _ms(v) -> Optional[float]:
+    return None if v is None or v != v else round(float(v) * 1000.0, 1)
+
+
+def compare_runs(a: MarkerRun, b: MarkerRun, head: int = 0) -> dict:
+    """
+    두 런의 마커 실행을 벽시계가 아니라 실행 순서(idx 시퀀스의 LCS)로 맞추고 idx 별로 센다(_align_runs).
+    - A 에만 있는 실행은 missing, B 에만 있는 실행은 extra. 상대 로그 범위 밖이라 비교할 수 없는 실행은 tail_a/tail_b
+    - head idx 가 실행될 때마다 사이클 1개(사이클 길이/사이클 안 오프셋 통계용, 짝짓기에는 쓰지 않음).
+      기본 head = A 에서 처음 실행된 순번(cat 1) 마커(없으면 첫 실행 마커)
+    결과: {"summary": {...}, "rows": [COMPARE_COLUMNS dict...], "cycles_a"/"cycles_b": 사이클 길이(ms) 목록}
+    """
+    if not head:
+        seq = a.idx[a.cat == 1] if (a.cat == 1).any() else a.idx
+        head = int(seq[0]) if seq.size else (int(b.idx[0]) if len(b) else 0)
+    uidx = np.union1d(a.idx, b.idx)
+    n_idx = int(uidx.size)
+    ga = np.searchsorted(uidx, a.idx)
+    gb = np.searchsorted(uidx, b.idx)
+    cyc_a, off_a, head_a = _run_cycles(a, head)
+    cyc_b, off_b, head_b = _run_cycles(b, head)
+    ia, ib, miss_a, extra_b, tail_a, tail_b = _align_runs(a, b, ga, gb)
+
+    def counts(g, mask=None):
+        return np.bincount(g if mask is None else g[mask], minlength=n_idx)
+
+    def intervals(run, g):
+        order = np.lexsort((run.t, g))
+        gs, ts = g[order], run.t[order]
+        same = gs[1:] == gs[:-1]
+        return _group_pct(gs[1:][same], np.diff(ts)[same], n_idx, 50)
+
+    big = np.iinfo(np.int64).max
+    first_diff = np.full(n_idx, big)
+    np.minimum.at(first_diff, ga[miss_a], cyc_a[miss_a])
+    np.minimum.at(first_diff, gb[extra_b], cyc_b[extra_b])
+    cats = np.zeros(n_idx, dtype=np.int64)
+    cats[gb] = b.cat
+    cats[ga] = a.cat
+    d_off = off_b[ib] - off_a[ia]
+    cols = {
+        "n_a": counts(ga),
+        "n_b": counts(gb),
+        "matched": counts(ga[ia]),
+        "missing": counts(ga, miss_a),
+        "extra": counts(gb, extra_b),
+        "interval_a": intervals(a, ga),
+        "interval_b": intervals(b, gb),
+        "offset_delta_p50": _group_pct(ga[ia], d_off, n_idx, 50),
+        "offset_delta_p95": _group_pct(ga[ia], d_off, n_idx, 95),
+        "latency_a": _group_pct(ga, a.lat, n_idx, 50),
+        "latency_b": _group_pct(gb, b.lat, n_idx, 50),
+    }
+    rows: List[dict] = []
+    for i in range(n_idx):
+        r = {"idx": int(uidx[i]), "cat": int(cats[i]), "first_diff_cycle": None if first_diff[i] == big else int(first_diff[i])}
+        for c in ("n_a", "n_b", "matched", "missing", "extra"):
+            r[c] = int(cols[c][i])
+        for c in ("interval_a", "interval_b", "offset_delta_p50", "offset_delta_p95", "latency_a", "latency_b"):
+            r[c] = _ms(cols[c][i])
+        r["interval_delta"] = _ms(cols["interval_b"][i] - cols["interval_a"][i])
+        r["latency_delta"] = _ms(cols["latency_b"][i] - cols["latency_a"][i])
+        rows.append(r)
+
+    cyc_len_a, cyc_len_b = np.diff(head_a), np.diff(head_b)
+    p50_a = float(np.median(cyc_len_a)) if cyc_len_a.size else float("nan")
+    p50_b = float(np.median(cyc_len_b)) if cyc_len_b.size else float("nan")
+    summary = {
+        "a": a.path,
+        "b": b.path,
+        "head_idx": head,
+        "executions_a": len(a),
+        "executions_b": len(b),
+        "matched": int(ia.size),
+        "missing": int(miss_a.sum()),
+        "extra": int(extra_b.sum()),
+        "tail_a": int(tail_a.sum()),
+        "tail_b": int(tail_b.sum()),
+        "duration_a_sec": round(float(a.t[-1]), 3) if len(a) else 0.0,
+        "duration_b_sec": round(float(b.t[-1]), 3) if len(b) else 0.0,
+        "cycles_a": int(head_a.size),
+        "cycles_b": int(head_b.size),
+        "cycle_p50_a": _ms(p50_a),
+        "cycle_p50_b": _ms(p50_b),
+        "cycle_delta": _ms(p50_b - p50_a),
+        "cycle_delta_pct": None if not p50_a > 0 or p50_b != p50_b else round((p50_b / p50_a - 1.0) * 100.0, 2),
+    }
+    return {
+        "summary": summary,
+        "rows": rows,
+        "cycles_a": np.round(cyc_len_a * 1000.0, 1).tolist(),
+        "cycles_b": np.round(cyc_len_b * 1000.0, 1).tolist(),
+    }
+
+
+def compare_logs(path_a: str, path_b: str, head: int = 0, serial: str = "", workers: int = 0) -> dict:
+    """(헤드리스) 저장 로그 2개를 읽어 compare_runs. 코어가 2개 이상이면 두 파일을 프로세스 2개로 동시에 읽는다."""
+    if np is None:
+        raise RuntimeError("런 비교에는 numpy 가 필요합니다(pip install numpy)")
+    for p in (path_a, path_b):
+        if not Path(p).is_file():
+            raise FileNotFoundError(p)
+    workers = int(workers) if workers and int(workers) > 0 else (os.cpu_count() or 1)
+    t0 = time.perf_counter()
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=2) as ex:
+            a, b = ex.map(load_marker_run, (path_a, path_b), (serial, serial))
+    else:
+        a, b = load_marker_run(path_a, serial), load_marker_run(path_b, serial)
+    t1 = time.perf_counter()
+    res = compare_runs(a, b, head)
+    res["summary"]["load_sec"] = round(t1 - t0, 3)
+    res["summary"]["elapsed_sec"] = round(time.perf_counter() - t0, 3)
+    return res
+
+
+def compare_summary_text(s: dict) -> str:
+    """비교 요약 한 줄(콘솔/창 제목용)."""
+
+    def v(x, unit="ms"):
+        return "-" if x is None else f"{x:g}{unit}"
+
+    pct = "" if s.get("cycle_delta_pct") is None else f" ({s['cycle_delta_pct']:+.1f}%)"
+    tail = f" 범위밖 A={s['tail_a']} B={s['tail_b']}" if s.get("tail_a") or s.get("tail_b") else ""
+    return (
+        f"head idx={s['head_idx']}  사이클 A={s['cycles_a']}회 p50 {v(s['cycle_p50_a'])}  "
+        f"B={s['cycles_b']}회 p50 {v(s['cycle_p50_b'])}  변화 {v(s['cycle_delta'])}{pct}  |  "
+        f"실행 A={s['executions_a']} B={s['executions_b']} 짝={s['matched']} 누락={s['missing']} 추가={s['extra']}{tail}"
+    )
+
+
+def write_compare_result(res: dict, out_path: str = ""):
+    """비교 결과 출력: .json 은 요약+행+사이클 길이 전체, .csv/stdout 은 idx별 표(요약은 stderr)."""
+    if out_path.lower().endswith(".json"):
+        p = Path(out_path)
+        if p.parent:
+            p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(json.dumps(res, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        return
+    write_query_result(COMPARE_COLUMNS, [tuple(r[c] for c in COMPARE_COLUMNS) for r in res["rows"]], out_path)
+
+
+# ---------------------------------------------------------------------------
+# 세션 카탈로그(SQLite): 저장 로그/라이브 수신을 이벤트 테이블로 모아 세션 단위로 검색
+# ---------------------------------------------------------------------------
+
+CATALOG_DEFAULT = str(Path(__file__).resolve().parent / "logs" / "atx_catalog.sqlite")
+# events.kind: 0=tap 1=swipe 2=marker(실행: phase 없음/try) 3=marker(그 외 phase)
+CATALOG_KINDS = ("tap", "swipe", "marker", "marker_phase")
+RE_CATALOG_META = re.compile(r"\b(phase|delayMs|jitterPct|pressMs)=(\S+)")
+CATALOG_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions(
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    serial TEXT NOT NULL DEFAULT '',
+    started_at TEXT,
+    mode TEXT,
+    t0 REAL,
+    t1 REAL,
+    lines INTEGER DEFAULT 0,
+    events INTEGER DEFAULT 0,
+    sizes INTEGER DEFAULT 0,
+    bytes INTEGER,
+    mtime REAL,
+    ingested_at TEXT,
+    UNIQUE(path, serial)
+);
+CREATE TABLE IF NOT EXISTS events(
+    session INTEGER NOT NULL,
+    ts REAL,
+    kind INTEGER NOT NULL,
+    cat INTEGER NOT NULL,
+    idx INTEGER NOT NULL,
+    x INTEGER, y INTEGER, x2 INTEGER, y2 INTEGER,
+    mkind TEXT, phase TEXT,
+    delay_ms INTEGER, jitter_pct INTEGER, press_ms INTEGER, hold_ms INTEGER, dur_ms INTEGER
+);
+CREATE TABLE IF NOT EXISTS sizes(session INTEGER NOT NULL, ts REAL, w INTEGER, h INTEGER);
+CREATE TABLE IF NOT EXISTS session_counts(
+    session INTEGER NOT NULL,
+    kind INTEGER NOT NULL,
+    cat INTEGER NOT NULL,
+    idx INTEGER NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY(session, kind, cat, idx)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_events_session_ts ON events(session, ts);
+CREATE INDEX IF NOT EXISTS ix_events_idx ON events(idx, ts, session);
+CREATE INDEX IF NOT EXISTS ix_events_cat ON events(cat, ts, session);
+CREATE INDEX IF NOT EXISTS ix_sizes_session_ts ON sizes(session, ts);
+CREATE INDEX IF NOT EXISTS ix_counts_idx ON session_counts(idx, kind);
+"""
+
+
+class _LogClock:
+    """
+    logcat `MM-DD HH:MM:SS.mmm` → epoch 초(logcat 에는 연도가 없음).
+    - 첫 라인의 연도는 세션 시작 시각(ref, 헤더 started_at)에 가장 가까운 해로 고른다(연말/연초 경계 대비)
+    - 이후 월이 줄어들면 다음 해로 넘어간 것으로 본다
+    """
+
+    def __init__(self, ref: float):
+        self.ref = float(ref)
+        self.year = 0
+        self._last_mon = 0
+        self._days: Dict[Tuple[int, int, int], float] = {}
+
+    def _day(self, year: int, mon: int, day: int) -> Optional[float]:
+        key = (year, mon, day)
+        base = self._days.get(key)
+        if base is None:
+            try:
+                base = time.mktime((year, mon, day, 0, 0, 0, 0, 0, -1))
+            except (OverflowError, ValueError):
+                return None
+            self._days[key] = base
+        return base
+
+    def epoch(self, line: str) -> Optional[float]:
+        m = RE_LOGCAT_TIME.search(line, 0, 40)
+        if not m:
+            return None
+        mon, day = int(m.group(1)), int(m.group(2))
+        if not self.year:
+            y = time.localtime(self.ref).tm_year
+            near = [(abs(b - self.ref), yy) for yy in (y - 1, y, y + 1) for b in (self._day(yy, mon, day),) if b is not None]
+            if not near:
+                return None
+            self.year = min(near)[1]
+        elif mon < self._last_mon:
+            self.year += 1
+        self._last_mon = mon
+        base = self._day(self.year, mon, day)
+        if base is None:
+            return None
+        return base + int(m.group(3)) * 3600 + int(m.group(4)) * 60 + int(m.group(5)) + int(m.group(6)) / 1000.0
+
+
+class _CatalogSession:
+    """세션 1개 적재 중 상태(삽입 대기 행 + idx별 개수 + 시간 범위)."""
+
+    __slots__ = ("sid", "clock", "rows", "size_rows", "counts", "t0", "t1", "lines", "events", "sizes", "last_ts")
+
+    def __init__(self, sid: int, ref: float):
+        self.sid = sid
+        self.clock = _LogClock(ref)
+        self.rows: List[tuple] = []
+        self.size_rows: List[tuple] = []
+        self.counts: Dict[Tuple[int, int, int], int] = {}
+        self.t0: Optional[float] = None
+        self.t1: Optional[float] = None
+        self.lines = 0
+        self.events = 0
+        self.sizes = 0
+        self.last_ts: Optional[float] = None
+
+
+class EventCatalog:
+    """
+    SQLite(WAL) 세션 카탈로그.
+    - sessions: 로그 파일(또는 라이브 수신) × 기기 시리얼 1행
+    - events: 탭/스와이프/MARKER(메타 delayMs/jitterPct/pressMs/phase, ACT press/hold/dur) 1행씩
+    - sizes: 화면 크기 변경, session_counts: 세션×kind×cat×idx 개수(시간 조건 없는 집계는 이것만 읽음)
+    - 인덱스: events(session, ts) / events(idx, ts, session) / events(cat, ts, session)
+      (idx/cat + 시간 범위 조건이 인덱스 범위 검색으로 끝나고 session 까지 인덱스에서 읽는다)
+    연결은 만든 스레드에서만 쓴다(라이브 기록은 CatalogWriter 스레드가 따로 연다).
+    """
+
+    BATCH = 20_000
+
+    def __init__(self, path: str):
+        if sqlite3 is None:
+            raise RuntimeError("이 Python 에는 sqlite3 모듈이 없습니다")
+        p = Path(path)
+        if p.parent:
+            p.parent.mkdir(parents=True, exist_ok=True)
+        self.path = str(p)
+        self.con = sqlite3.connect(self.path, timeout=30.0)
+        self.con.execute("PRAGMA journal_mode=WAL")
+        self.con.execute("PRAGMA synchronous=NORMAL")
+        self.con.executescript(CATALOG_SCHEMA)
+        self.con.commit()
+
+    def close(self):
+        try:
+            self.con.close()
+        except Exception:
+            pass
+
+    def optimize(self):
+        # 적재 후 통계 갱신(표본만): 시간 조건만 있는 조회가 (session, ts) 인덱스 skip-scan 을 쓰게 된다
+        self.con.execute("PRAGMA analysis_limit=1000")
+        self.con.execute("ANALYZE")
+        self.con.commit()
+
+    # -- 적재 ---------------------------------------------------------------
+
+    def begin_session(
+        self,
+        path: str,
+        serial: str = "",
+        started_at: str = "",
+        mode: str = "",
+        size_bytes: Optional[int] = None,
+        mtime: Optional[float] = None,
+    ) -> _CatalogSession:
+        """같은 (path, serial) 세션이 있으면 지우고 새로 만든다."""
+        cur = self.con.cursor()
+        old = cur.execute("SELECT id FROM sessions WHERE path=? AND serial=?", (path, serial)).fetchone()
+        if old is not None:
+            self._delete_sessions([old[0]])
+        cur.execute(
+            "INSERT INTO sessions(path, serial, started_at, mode, bytes, mtime, ingested_at) VALUES(?,?,?,?,?,?,?)",
+            (path, serial, started_at or None, mode or None, size_bytes, mtime, time.strftime("%Y-%m-%d %H:%M:%S")),
+        )
+        try:
+            ref = _parse_when(started_at or "")
+        except ValueError:
+            ref = None
+        return _CatalogSession(int(cur.lastrowid), ref if ref is not None else (mtime or time.time()))
+
+    def _delete_sessions(self, ids: List[int]):
+        for sid in ids:
+            for table, col in (("events", "session"), ("sizes", "session"), ("session_counts", "session"), ("sessions", "id")):
+                self.con.execute(f"DELETE FROM {table} WHERE {col}=?", (sid,))
+
+    def add_line(self, sess: _CatalogSession, line: str, rec: Optional[ParsedLine]):
+        sess.lines += 1
+        if rec is None:
+            return
+        ts = sess.clock.epoch(line)
+        if ts is None:
+            ts = sess.last_ts
+        else:
+            sess.last_ts = ts
+            if sess.t0 is None:
+                sess.t0 = ts
+            sess.t1 = ts
+        if rec.size is not None:
+            sess.size_rows.append((sess.sid, ts, rec.size.w, rec.size.h))
+            sess.sizes += 1
+            if rec.kind == "size":
+                return
+        x = y = x2 = y2 = None
+        if rec.p0 is not None:
+            x, y = rec.p0
+        if rec.p1 is not None:
+            x2, y2 = rec.p1
+        mkind = phase = None
+        delay = jitter = press = hold = dur = None
+        if rec.kind == "marker":
+            kv = dict(RE_CATALOG_META.findall(line))
+            phase = kv.get("phase", "")
+            kind = 2 if phase in MarkerTiming.COUNT_PHASES else 3
+            mkind = rec.mkind or None
+            delay = _meta_int(kv, "delayMs")
+            jitter = _meta_int(kv, "jitterPct")
+            press = _meta_int(kv, "pressMs")
+            phase = phase or None
+        else:
+            kind = 0 if rec.kind == "tap" else 1
+            if "ms" in line:
+                for k, v in RE_TIMING_MS.findall(line):
+                    if k == "press":
+                        press = int(v)
+                    elif k == "hold":
+                        hold = int(v)
+                    else:
+                        dur = int(v)
+        sess.rows.append((sess.sid, ts, kind, rec.cat, rec.idx, x, y, x2, y2, mkind, phase, delay, jitter, press, hold, dur))
+        key = (kind, rec.cat, rec.idx)
+        sess.counts[key] = sess.counts.get(key, 0) + 1
+        sess.events += 1
+        if len(sess.rows) >= self.BATCH:
+            self.flush_rows(sess)
+
+    def flush_rows(self, sess: _CatalogSession):
+        if sess.rows:
+            self.con.executemany("INSERT INTO events VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)", sess.rows)
+            sess.rows = []
+        if sess.size_rows:
+            self.con.executemany("INSERT INTO sizes VALUES(?,?,?,?)", sess.size_rows)
+            sess.size_rows = []
+
+    def flush_session(self, sess: _CatalogSession, commit: bool = True):
+        """대기 행 기록 + 개수/시간 범위 갱신(라이브는 주기적으로, 파일 적재는 끝에 한 번)."""
+        self.flush_rows(sess)
+        if sess.counts:
+            self.con.executemany(
+                "INSERT INTO session_counts VALUES(?,?,?,?,?) "
+                "ON CONFLICT(session, kind, cat, idx) DO UPDATE SET n = n + excluded.n",
+                [(sess.sid, k, c, i, n) for (k, c, i), n in sess.counts.items()],
+            )
+            sess.counts = {}
+        self.con.execute(
+            "UPDATE sessions SET t0=?, t1=?, lines=?, events=?, sizes=? WHERE id=?",
+            (sess.t0, sess.t1, sess.lines, sess.events, sess.sizes, sess.sid),
+        )
+        if commit:
+            self.con.commit()
+
+    def ingest_file(self, path: str, force: bool = False) -> List[Tuple[str, int]]:
+        """
+        저장 로그(텍스트/.gz/.zst/.atxrec) 1개 적재. `[serial] ` 접두어(여러 기기 스냅샷)는 기기별 세션으로 나눈다.
+        크기/수정 시각이 같은 파일은 건너뛴다(force 면 다시). 반환: [(serial, 이벤트 수)]
+        """
+        st = os.stat(path)
+        path = str(Path(path).resolve())
+        if not force:
+            row = self.con.execute("SELECT COUNT(*) FROM sessions WHERE path=? AND bytes=? AND mtime=?", (path, st.st_size, st.st_mtime)).fetchone()
+            if row and row[0]:
+                return []
+            self._delete_sessions([r[0] for r in self.con.execute("SELECT id FROM sessions WHERE path=?", (path,))])
+        header: Dict[str, str] = {}
+        sessions: Dict[str, _CatalogSession] = {}
+
+        def sess_for(serial: str) -> _CatalogSession:
+            sess = sessions.get(serial)
+            if sess is None:
+                sess = self.begin_session(
+                    path,
+                    serial,
+                    header.get("started_at") or header.get("snapshot_saved_at", ""),
+                    header.get("mode", ""),
+                    st.st_size,
+                    st.st_mtime,
+                )
+                sessions[serial] = sess
+            return sess
+
+        try:
+            if path.lower().endswith(".atxrec"):
+                src = AtxRecReplay(path)
+                try:
+                    sess = sess_for("")
+                    for i in range(len(src)):
+                        self.add_line(sess, src[i][1], src.record(i))
+                finally:
+                    src.close()
+            else:
+                with _open_log_text(path) as f:
+                    for ln in f:
+                        ln = ln.rstrip("\r\n")
+                        if not ln:
+                            continue
+                        if ln.startswith("#"):
+                            k, sep, v = ln[1:].strip().partition("=")
+                            if sep and k not in header:
+                                header[k] = v
+                            continue
+                        serial = header.get("serial", "")
+                        if ln.startswith("["):
+                            j = ln.find("] ")
+                            if j > 0:
+                                serial, ln = ln[1:j], ln[j + 2 :]
+                        self.add_line(sess_for(serial), ln, classify_line(ln))
+            for sess in sessions.values():
+                self.flush_session(sess, commit=False)
+            self.con.commit()
+        except BaseException:
+            self.con.rollback()
+            raise
+        return [(serial, sess.events) for serial, sess in sessions.items()]
+
+    # -- 조회 ---------------------------------------------------------------
+
+    def query(
+        self,
+        serial: Optional[List[str]] = None,
+        t_from: Optional[float] = None,
+        t_to: Optional[float] = None,
+        cats: Optional[List[int]] = None,
+        idxs: Optional[List[int]] = None,
+        kinds: Optional[List[int]] = None,
+        min_count: int = 0,
+        events: bool = False,
+        limit: int = 1000,
+    ) -> Tuple[List[str], List[tuple]]:
+        """
+        세션별 조건 일치 개수(기본) 또는 일치 이벤트 목록(events=True). 반환: (열 이름, 행들)
+        - 시간 조건이 없으면 세션별 개수는 session_counts 만 읽는다(세션 수백 개도 수 ms)
+        - min_count: 일치 개수가 이 값 이상인 세션만
+        """
+        where: List[str] = []
+        args: list = []
+
+        def add_in(col: str, vals):
+            if vals:
+                where.append(f"{col} IN ({','.join('?' * len(vals))})")
+                args.extend(vals)
+
+        add_in("s.serial", serial)
+        if t_from is not None:
+            where.append("s.t1 >= ?")
+            args.append(t_from)
+        if t_to is not None:
+            where.append("s.t0 <= ?")
+            args.append(t_to)
+        ev_where: List[str] = []
+        ev_args: list = []
+        for col, vals in (("cat", cats), ("idx", idxs), ("kind", kinds)):
+            if vals:
+                ev_where.append(f"{{t}}.{col} IN ({','.join('?' * len(vals))})")
+                ev_args.extend(vals)
+        timed = t_from is not None or t_to is not None
+        if timed or events:
+            if t_from is not None:
+                ev_where.append("{t}.ts >= ?")
+                ev_args.append(t_from)
+            if t_to is not None:
+                ev_where.append("{t}.ts <= ?")
+                ev_args.append(t_to)
+        s_sql = " AND ".join(where) or "1"
+        if events:
+            e_sql = " AND ".join(w.format(t="e") for w in ev_where) or "1"
+            cols = ["session", "serial", "time", "kind", "cat", "idx", "x", "y", "x2", "y2", "mkind", "phase", "delay_ms", "jitter_pct", "press_ms", "hold_ms", "dur_ms"]
+            sql = (
+                "SELECT e.session, s.serial, e.ts, e.kind, e.cat, e.idx, e.x, e.y, e.x2, e.y2, e.mkind, e.phase,"
+                " e.delay_ms, e.jitter_pct, e.press_ms, e.hold_ms, e.dur_ms"
+                f" FROM events e JOIN sessions s ON s.id = e.session WHERE {s_sql} AND {e_sql}"
+                " ORDER BY e.session, e.ts LIMIT ?"
+            )
+            rows = [
+                (r[0], r[1], _fmt_epoch(r[2]), CATALOG_KINDS[r[3]]) + tuple(r[4:])
+                for r in self.con.execute(sql, args + ev_args + [int(limit)])
+            ]
+            return cols, rows
+        src = "events" if timed else "session_counts"
+        cnt = "COUNT(*)" if timed else "SUM(c.n)"
+        e_sql = " AND ".join(w.format(t="c") for w in ev_where) or "1"
+        floor = max(int(min_count), 1 if (ev_where or timed) else 0)
+        sql = (
+            "SELECT s.id, s.serial, s.started_at, s.t0, s.t1, s.events, COALESCE(m.n, 0) AS n, s.path FROM sessions s"
+            f" LEFT JOIN (SELECT c.session AS session, {cnt} AS n FROM {src} c WHERE {e_sql} GROUP BY c.session) m"
+            f" ON m.session = s.id WHERE {s_sql} AND COALESCE(m.n, 0) >= ? ORDER BY s.id"
+        )
+        cols = ["session", "serial", "started_at", "first", "last", "events", "matched", "path"]
+        rows = [
+            (r[0], r[1], r[2], _fmt_epoch(r[3]), _fmt_epoch(r[4]), r[5], r[6], r[7])
+            for r in self.con.execute(sql, ev_args + args + [floor])
+        ]
+        return cols, rows
+
+
+def _fmt_epoch(t: Optional[float]) -> str:
+    if t is None:
+        return ""
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t)) + f".{int(round((t % 1) * 1000)) % 1000:03d}"
+
+
+def _parse_when(v: str) -> Optional[float]:
+    """'YYYY-MM-DD', 'YYYY-MM-DD HH:MM', 'YYYY-MM-DD HH:MM:SS' (또는 T 구분) → epoch 초."""
+    v = (v or "").strip().replace("T", " ")
+    if not v:
+        return None
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return time.mktime(time.strptime(v, fmt))
+        except ValueError:
+            continue
+    raise ValueError(f"시간 형식이 잘못되었습니다(예: 2026-02-16 12:30): {v}")
+
+
+def _int_list(v: str) -> Optional[List[int]]:
+    # "3,5,10-12" → [3, 5, 10, 11, 12]
+    out: List[int] = []
+    for part in (v or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        a, sep, b = part.partition("-")
+        if sep and a and b:
+            out.extend(range(int(a), int(b) + 1))
+        else:
+            out.append(int(part))
+    return out or None
+
+
+def write_query_result(cols: List[str], rows: List[tuple], out_path: str = ""):
+    """조회 결과 출력: out_path 가 .json/.csv 면 파일, 비우면 stdout 에 탭 구분 표."""
+    low = out_path.lower()
+    if low.endswith(".json"):
+        text = json.dumps([dict(zip(cols, r)) for r in rows], ensure_ascii=False, indent=2) + "\n"
+    else:
+        buf = io.StringIO()
+        w = csv.writer(buf, delimiter="," if low.endswith(".csv") else "\t", lineterminator="\n")
+        w.writerow(cols)
+        for r in rows:
+            w.writerow(["" if v is None else v for v in r])
+        text = buf.getvalue()
+    if out_path:
+        p = Path(out_path)
+        if p.parent:
+            p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(text, encoding="utf-8", newline="")
+    else:
+        sys.stdout.write(text)
+
+
+class CatalogWriter:
+    """
+    (--db-live) 라이브 수신 라인을 카탈로그에 적재하는 스레드.
+    - add() 는 deque 에 넣기만 한다(LogWriter 와 같은 방식). 스레드가 1초마다 모아서 기록/커밋
+    - 기기(시리얼)마다 세션 1개. path 는 저장 로그 경로(없으면 live:<시각>:<serial>)
+    """
+
+    def __init__(self, db_path: str, paths: Optional[Dict[str, str]] = None, mode: str = "adb", flush_sec: float = 1.0):
+        self.db_path = db_path
+        self.paths = dict(paths or {})
+        self.mode = mode
+        self.flush_sec = float(flush_sec)
+        self.started_at = time.strftime("%Y-%m-%d %H:%M:%S")
+        self.lines = 0
+        self.error: Optional[str] = None
+        self._dq: "collections.deque[Tuple[str, str, Optional[ParsedLine]]]" = collections.deque()
+        self._wake = threading.Event()
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name="atx-catalog", daemon=True)
+        self._thread.start()
+
+    def add(self, serial: str, line: str, rec: Optional[ParsedLine] = None):
+        self._dq.append((serial, line, rec))
+        self.lines += 1
+
+    def _run(self):
+        try:
+            cat = EventCatalog(self.db_path)
+        except Exception as e:
+            self.error = str(e)
+            print(f"[WARN] 카탈로그 DB 를 열 수 없습니다: path={self.db_path} err={e}", file=sys.stderr)
+            self._dq.clear()
+            return
+        sessions: Dict[str, _CatalogSession] = {}
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        try:
+            while True:
+                self._wake.wait(self.flush_sec)
+                stop = self._stop
+                dq = self._dq
+                touched = set()
+                while dq:
+                    serial, line, rec = dq.popleft()
+                    sess = sessions.get(serial)
+                    if sess is None:
+                        path = self.paths.get(serial) or f"live:{stamp}:{serial or 'device'}"
+                        sess = sessions[serial] = cat.begin_session(path, serial, self.started_at, self.mode)
+                    cat.add_line(sess, line, rec if rec is not None else classify_line(line))
+                    touched.add(serial)
+                for serial in touched:
+                    cat.flush_session(sessions[serial], commit=False)
+                if touched:
+                    cat.con.commit()
+                if stop:
+                    break
+            cat.optimize()
+        except Exception as e:
+            self.error = str(e)
+            print(f"[WARN] 카탈로그 기록 실패: err={e}", file=sys.stderr)
+        finally:
+            cat.close()
+
+    def close(self, timeout: float = 5.0):
+        self._stop = True
+        self._wake.set()
+        self._thread.join(timeout)
+
+
+def ingest_logs(paths: List[str], db_path: str, force: bool = False) -> dict:
+    """(--ingest) 저장 로그들을 카탈로그에 적재. 와일드카드는 직접 펼친다."""
+    cat = EventCatalog(db_path)
+    done = skipped = events = 0
+    t0 = time.perf_counter()
+    try:
+        for p in paths:
+            for path in sorted(glob.glob(p)) if any(ch in p for ch in "*?[") else [p]:
+                if not Path(path).is_file():
+                    print(f"[WARN] 파일 없음: {path}", file=sys.stderr)
+                    continue
+                t1 = time.perf_counter()
+                res = cat.ingest_file(path, force=force)
+                if not res:
+                    skipped += 1
+                    continue
+                done += 1
+                n = sum(v for _s, v in res)
+                events += n
+                print(f"{path}: sessions={len(res)} events={n} ({time.perf_counter() - t1:.2f}s)", file=sys.stderr)
+        if done:
+            cat.optimize()
+    finally:
+        cat.close()
+    return {"db": db_path, "files": done, "skipped": skipped, "events": events, "elapsed_sec": round(time.perf_counter() - t0, 3)}
+
+
+# ---------------------------------------------------------------------------
+# .atxrec 기록 포맷(파싱 결과 포함 바이너리 로그, 블록 단위 zlib 압축)
+#
+#   [헤더] b"ATXREC3\n"
+#   [블록]* <I 압축 길이> <I 레코드 수> + zlib(레코드*)   ← 레코드를 REC_BLOCK 바이트쯤 모아 한 번에 압축
+#     레코드 = <I 길이> + REC_HEAD(t_abs, kind, cat, idx, x0, y0, x1, y1, w, h, mkind_len) + mkind + line(utf-8)
+#            또는 <I 길이|REC_RAW> + line(utf-8)  ← 분류 안 된 라인(헤더 없음, 시간은 인덱스 t_abs)
+#   [인덱스] b"ATXIDX2\n" + <Q n> <Q 블록 수> <Q 압축 길이> + zlib(t_abs[n](d) + rel[n](d) + 블록 위치(Q) + 블록 첫 라인(Q))
+#            + cat_counts[8](Q)
+#   [트레일러] <Q 인덱스 위치> + b"ATXEND1\n"
+#
+# - t_abs: logcat 시간(하루 내 초, 없으면 NaN), rel: 재생용 상대초(relative_replay_times)
+# - 라인 i 는 "첫 라인 <= i" 인 마지막 블록을 풀어(스레드별 1블록 캐시) 그 안에서 찾는다.
+#   원본 라인을 그대로 담지만 압축 덕분에 같은 텍스트 로그보다 작다(합성 로그 기준 약 1/5).
+# - 트레일러가 없으면(기록 중 비정상 종료) 블록을 순차로 풀어 인덱스를 다시 만든다(마지막 flush 이후 라인은 잃음).
+# - REC_HEAD 범위를 벗어나는 파싱 결과(cat=300, idx=9999999999 등)는 분류 안 된 라인으로 저장한다.
+# - 예전 파일(ATXREC1/ATXREC2: 압축 없이 레코드를 나열, 인덱스 ATXIDX1 = t_abs + rel + 레코드 위치)도 읽는다.
+# ---------------------------------------------------------------------------
+
+ATXREC_MAGIC = b"ATXREC3\n"
+ATXREC_FLAT_MAGICS = (b"ATXREC2\n", b"ATXREC1\n")  # 블록 압축 없는 예전 포맷(읽기만)
+ATXREC_MAGICS = (ATXREC_MAGIC,) + ATXREC_FLAT_MAGICS
+ATXREC_INDEX_MAGIC = b"ATXIDX2\n"
+ATXREC_FLAT_INDEX_MAGIC = b"ATXIDX1\n"
+ATXREC_END_MAGIC = b"ATXEND1\n"
+REC_HEAD = struct.Struct("<dBBiiiiiHHB")
+REC_LEN = struct.Struct("<I")
+REC_BLOCK_HEAD = struct.Struct("<II")
+REC_BLOCK = 64 << 10  # 블록 1개에 모을 레코드 바이트(압축 전)
+REC_RAW = 0x80000000  # 길이 최상위 비트 = 헤더 없는 라인 레코드
+REC_I32 = (-(1 << 31), (1 << 31) - 1)
+REC_KIND_CODE = {"": 0, "tap": 1, "swipe": 2, "marker": 3, "size": 4}
+REC_KIND_NAME = {v: k for (k, v) in REC_KIND_CODE.items()}
+
+
+def _rec_fits(rec: ParsedLine, x0: int, y0: int, x1: int, y1: int) -> bool:
+    lo, hi = REC_I32
+    return 0 <= rec.cat <= 255 and all(lo <= v <= hi for v in (rec.idx, x0, y0, x1, y1))
+
+
+def pack_record(t_abs: Optional[float], line: str, rec: Optional[ParsedLine]) -> bytes:
+    """
+    라인 1개(+파싱 결과)를 길이 접두 레코드 바이트로 만든다.
+    분류 안 된 라인과 REC_HEAD 범위를 벗어나는 파싱 결과는 헤더 없는 라인 레코드(REC_RAW)로 저장한다.
+    """
+    lb = line.encode("utf-8", errors="ignore")[: REC_RAW - 1]
+    if rec is not None:
+        x0, y0 = rec.p0 if rec.p0 else (-1, -1)
+        x1, y1 = rec.p1 if rec.p1 else (-1, -1)
+        if _rec_fits(rec, x0, y0, x1, y1):
+            t = float("nan") if t_abs is None else float(t_abs)
+            mb = rec.mkind.encode("utf-8", errors="ignore")[:255] if rec.mkind else b""
+            w, h = (max(0, min(rec.size.w, 65535)), max(0, min(rec.size.h, 65535))) if rec.size else (0, 0)
+            head = REC_HEAD.pack(t, REC_KIND_CODE.get(rec.kind, 0), rec.cat, rec.idx, x0, y0, x1, y1, w, h, len(mb))
+            return REC_LEN.pack(len(head) + len(mb) + len(lb)) + head + mb + lb
+    return REC_LEN.pack(REC_RAW | len(lb)) + lb
+
+
+def unpack_record(buf, off: int) -> Tuple[float, str, Optional[ParsedLine], int]:
+    """off 위치 레코드를 (t_abs, line, ParsedLine|None, 다음 레코드 위치)로 푼다."""
+    (n,) = REC_LEN.unpack_from(buf, off)
+    p = off + REC_LEN.size
+    if n & REC_RAW:
+        end = p + (n & ~REC_RAW)
+        lb = bytes(buf[p:end])
+        return _logcat_time_bytes(lb), lb.decode("utf-8", errors="ignore"), None, end
+    t, kc, cat, idx, x0, y0, x1, y1, w, h, ml = REC_HEAD.unpack_from(buf, p)
+    p += REC_HEAD.size
+    mkind = bytes(buf[p : p + ml]).decode("utf-8", errors="ignore") if ml else ""
+    p += ml
+    end = off + REC_LEN.size + n
+    line = bytes(buf[p:end]).decode("utf-8", errors="ignore")
+    rec: Optional[ParsedLine] = None
+    if kc:
+        rec = ParsedLine(
+            kind=REC_KIND_NAME.get(kc, ""),
+            cat=cat,
+            idx=idx,
+            p0=(x0, y0) if x0 >= 0 else None,
+            p1=(x1, y1) if x1 >= 0 else None,
+            size=ScreenSize(w, h) if w > 0 else None,
+            mkind=mkind,
+            meta=_meta_tail(line) if kc != REC_KIND_CODE["size"] else "",
+        )
+    return t, line, rec, end
+
+
+def _record_offsets(buf, start: int = 0, end: Optional[int] = None) -> "array":
+    """buf[start:end] 에 이어 붙은 레코드들의 시작 위치. 잘린 마지막 레코드는 뺀다."""
+    end = len(buf) if end is None else end
+    offs = array("Q")
+    p = start
+    while p + REC_LEN.size <= end:
+        (n,) = REC_LEN.unpack_from(buf, p)
+        size = n & ~REC_RAW
+        if p + REC_LEN.size + size > end or (not n & REC_RAW and size < REC_HEAD.size):
+            break
+        offs.append(p)
+        p += REC_LEN.size + size
+    return offs
+
+
+def _record_t_abs(buf, off: int) -> float:
+    (n,) = REC_LEN.unpack_from(buf, off)
+    p = off + REC_LEN.size
+    if n & REC_RAW:
+        return _logcat_time_bytes(bytes(buf[p : p + (n & ~REC_RAW)]))
+    return REC_HEAD.unpack_from(buf, p)[0]
+
+
+class AtxRecWriter:
+    """
+    .atxrec 기록기. write()로 라인을 쌓다가 REC_BLOCK 바이트가 차면(또는 flush() 때) 블록 1개로 압축해 쓰고,
+    close()에서 인덱스/트레일러를 붙인다. (라이브 저장 시 텍스트 로그 옆에 같은 이름 .atxrec 로 생성)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.fp = open(path, "wb")
+        self.fp.write(ATXREC_MAGIC)
+        self.pos = len(ATXREC_MAGIC)
+        self.t_abs = array("d")
+        self.block_pos = array("Q")
+        self.block_first = array("Q")
+        self._buf: List[bytes] = []
+        self._buf_len = 0
+        self.cat_counts = [0] * 8
+        self.errors = 0  # (라이브) 기록 실패 횟수. 처음 1번만 경고
+
+    def write(self, line: str, rec: Optional[ParsedLine]):
+        t_abs = _parse_logcat_time_seconds(line)
+        data = pack_record(t_abs, line, rec)
+        self._buf.append(data)
+        self._buf_len += len(data)
+        self.t_abs.append(float("nan") if t_abs is None else t_abs)
+        if rec is not None and not data[3] & 0x80 and rec.kind != "size" and 0 <= rec.cat < 8:
+            self.cat_counts[rec.cat] += 1
+        if self._buf_len >= REC_BLOCK:
+            self._write_block()
+
+    def _write_block(self):
+        import zlib
+
+        if not self._buf:
+            return
+        z = zlib.compress(b"".join(self._buf), 6)
+        self.block_pos.append(self.pos)
+        self.block_first.append(len(self.t_abs) - len(self._buf))
+        self.fp.write(REC_BLOCK_HEAD.pack(len(z), len(self._buf)) + z)
+        self.pos += REC_BLOCK_HEAD.size + len(z)
+        self._buf = []
+        self._buf_len = 0
+
+    def flush(self):
+        # 라이브: 모아 둔 레코드를 (작아도) 블록으로 내보내 비정상 종료 시에도 여기까지는 남게
+        self._write_block()
+        self.fp.flush()
+
+    def close(self):
+        import zlib
+
+        if self.fp is None:
+            return
+        try:
+            self._write_block()
+            rel = relative_replay_times(self.t_abs)
+            idx_pos = self.pos
+            z = zlib.compress(self.t_abs.tobytes() + rel.tobytes() + self.block_pos.tobytes() + self.block_first.tobytes(), 6)
+            self.fp.write(ATXREC_INDEX_MAGIC)
+            self.fp.write(struct.pack("<QQQ", len(self.t_abs), len(self.block_pos), len(z)))
+            self.fp.write(z)
+            self.fp.write(struct.pack("<8Q", *self.cat_counts))
+            self.fp.write(struct.pack("<Q", idx_pos) + ATXREC_END_MAGIC)
+        finally:
+            self.fp.close()
+            self.fp = None
+
+    def abort(self):
+        """쓰다 만 파일 삭제(인덱스/트레일러를 붙이면 앞부분만 담긴 정상 파일처럼 보이므로)."""
+        if self.fp is not None:
+            self.fp.close()
+            self.fp = None
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def convert_log_to_atxrec(src: str, dst: str = "") -> str:
+    """저장된 텍스트 로그(atx_log_*.txt)를 .atxrec 로 변환. 결과 경로를 돌려준다(실패하면 결과 파일을 지움)."""
+    dst = dst or str(Path(src).with_suffix(".atxrec"))
+    w = AtxRecWriter(dst)
+    try:
+        with open(src, "r", encoding="utf-8", errors="ignore") as f:
+            for ln in f:
+                ln = ln.rstrip("\r\n")
+                if not ln or ln.startswith("#"):
+                    continue
+                w.write(ln, classify_line(ln))
+    except BaseException:
+        w.abort()
+        raise
+    w.close()
+    return dst
+
+
+class AtxRecReplay:
+    """
+    .atxrec 를 mmap 으로 열어 (상대초, 라인) 시퀀스처럼 쓰는 재생 소스.
+    - 인덱스(상대초/블록 위치 배열)만 읽으므로 큰 파일도 즉시 열린다. 블록은 라인을 읽을 때 푼다(스레드별 1블록 캐시).
+    - record(i) 는 저장된 파싱 결과를 그대로 돌려준다(정규식 없음).
+    - max_gap 이 기본값과 다르면 저장된 상대초 대신 절대초에서 다시 계산한다.
+    """
+
+    def __init__(self, path: str, max_gap: float = REPLAY_MAX_GAP_SEC):
+        self.path = path
+        self.max_gap = float(max_gap)
+        self._fp = open(path, "rb")
+        self._mm = mmap.mmap(self._fp.fileno(), 0, access=mmap.ACCESS_READ)
+        magic = self._mm[: len(ATXREC_MAGIC)]
+        if magic not in ATXREC_MAGICS:
+            self.close()
+            raise ValueError(f"not an .atxrec file: {path}")
+        # 블록 포맷: block_pos/block_first, 예전 포맷: 레코드 위치(offsets)
+        self.flat = magic in ATXREC_FLAT_MAGICS
+        self.block_pos = array("Q")
+        self.block_first = array("Q")
+        self.offsets = array("Q")
+        self._local = threading.local()
+        self.cat_counts = [0] * 8
+        if not self._load_index():
+            self._scan_records()
+        elif self.max_gap != REPLAY_MAX_GAP_SEC:
+            self.times = relative_replay_times(self.t_abs, self.max_gap)
+
+    def _load_index(self) -> bool:
+        import zlib
+
+        mm = self._mm
+        tail = len(ATXREC_END_MAGIC) + 8
+        if len(mm) < len(ATXREC_MAGIC) + tail or mm[-len(ATXREC_END_MAGIC) :] != ATXREC_END_MAGIC:
+            return False
+        (idx_pos,) = struct.unpack_from("<Q", mm, len(mm) - tail)
+        magic = ATXREC_FLAT_INDEX_MAGIC if self.flat else ATXREC_INDEX_MAGIC
+        if mm[idx_pos : idx_pos + len(magic)] != magic:
+            return False
+        p = idx_pos + len(magic)
+        self.t_abs = array("d")
+        self.times = array("d")
+        if self.flat:
+            (n,) = struct.unpack_from("<Q", mm, p)
+            p += 8
+            body = mm[p : p + 24 * n]
+            p += 24 * n
+            nb = 0
+        else:
+            n, nb, zlen = struct.unpack_from("<QQQ", mm, p)
+            p += 24
+            body = zlib.decompress(mm[p : p + zlen])
+            p += zlen
+        self.t_abs.frombytes(body[: 8 * n])
+        self.times.frombytes(body[8 * n : 16 * n])
+        if self.flat:
+            self.offsets.frombytes(body[16 * n : 24 * n])
+        else:
+            self.block_pos.frombytes(body[16 * n : 16 * n + 8 * nb])
+            self.block_first.frombytes(body[16 * n + 8 * nb : 16 * n + 16 * nb])
+        self.cat_counts = list(struct.unpack_from("<8Q", mm, p))
+        return True
+
+    def _scan_records(self):
+        # 트레일러 없음(비정상 종료): 레코드(블록)를 순차로 읽어 인덱스 재구성
+        mm = self._mm
+        self.t_abs = array("d")
+        start = len(ATXREC_MAGIC)
+        if self.flat:
+            self.offsets = _record_offsets(mm, start)
+            chunks = [(mm, self.offsets)]
+        else:
+            chunks = self._scan_blocks(start)
+        for buf, offs in chunks:
+            for off in offs:
+                (n,) = REC_LEN.unpack_from(buf, off)
+                if not n & REC_RAW:
+                    kc, cat = REC_HEAD.unpack_from(buf, off + REC_LEN.size)[1:3]
+                    if kc and kc != REC_KIND_CODE["size"] and 0 <= cat < 8:
+                        self.cat_counts[cat] += 1
+                self.t_abs.append(_record_t_abs(buf, off))
+        self.times = relative_replay_times(self.t_abs, self.max_gap)
+
+    def _scan_blocks(self, off: int):
+        import zlib
+
+        mm = self._mm
+        end = len(mm)
+        first = 0
+        while off + REC_BLOCK_HEAD.size <= end:
+            zlen, cnt = REC_BLOCK_HEAD.unpack_from(mm, off)
+            p = off + REC_BLOCK_HEAD.size
+            if p + zlen > end:
+                break
+            try:
+                data = zlib.decompress(mm[p : p + zlen])
+            except zlib.error:
+                break
+            offs = _record_offsets(data)
+            if len(offs) != cnt:
+                break
+            self.block_pos.append(off)
+            self.block_first.append(first)
+            first += cnt
+            yield data, offs
+            off = p + zlen
+
+    def _block(self, b: int):
+        """블록 b 를 풀어 (데이터, 레코드 위치)로. 스레드마다 마지막 블록 1개를 캐시(재생/인덱스 스레드가 서로 밀어내지 않게)."""
+        import zlib
+
+        c = getattr(self._local, "block", None)
+        if c is not None and c[0] == b:
+            return c[1], c[2]
+        off = self.block_pos[b]
+        zlen, _cnt = REC_BLOCK_HEAD.unpack_from(self._mm, off)
+        p = off + REC_BLOCK_HEAD.size
+        data = zlib.decompress(self._mm[p : p + zlen])
+        offs = _record_offsets(data)
+        self._local.block = (b, data, offs)
+        return data, offs
+
+    def _locate(self, i: int):
+        if self.flat:
+            return self._mm, self.offsets[i]
+        b = bisect.bisect_right(self.block_first, i) - 1
+        data, offs = self._block(b)
+        return data, offs[i - self.block_first[b]]
+
+    def record_chunks(self):
+        """레코드 바이트 덩어리와 그 안의 레코드 시작 위치(array Q)를 차례로 돌려준다(블록 포맷은 블록마다)."""
+        if self.flat:
+            yield self._mm, self.offsets
+            return
+        for b in range(len(self.block_pos)):
+            yield self._block(b)
+
+    def __len__(self) -> int:
+        return len(self.t_abs)
+
+    def __getitem__(self, i: int) -> Tuple[float, str]:
+        if i < 0:
+            i += len(self.t_abs)
+        buf, off = self._locate(i)
+        _t, line, _rec, _nx = unpack_record(buf, off)
+        return self.times[i], line
+
+    def record(self, i: int) -> Optional[ParsedLine]:
+        buf, off = self._locate(i)
+        return unpack_record(buf, off)[2]
+
+    def close(self):
+        try:
+            self._mm.close()
+        except Exception:
+            pass
+        try:
+            self._fp.close()
+        except Exception:
+            pass
+
+
+# ---------------------------------------------------------------------------
+# 히트맵(누적 클릭/스와이프 밀도, NumPy 필요)
+# ---------------------------------------------------------------------------
+
+HEATMAP_EXTENT = 4096  # 기기 픽셀 좌표 범위(가로/세로 공통, 넘는 좌표는 버림)
+HEATMAP_CELL = 8  # 격자 1칸 = 8x8 기기 픽셀
+HEATMAP_BG = (11, 18, 32)  # 캔버스 배경(#0b1220)
+HEATMAP_LIVE_POINTS = 1_000_000  # 라이브에서 필터용 점 목록 상한(점당 약 18B, 넘으면 오래된 1/4 을 버림)
+
+
+def _hex_rgb(col: str) -> Tuple[int, int, int]:
+    col = col.lstrip("#")
+    return int(col[0:2], 16), int(col[2:4], 16), int(col[4:6], 16)
+
+
+def _heat_points(rec: Optional[ParsedLine]):
+    """히트맵에 넣을 (cat, x, y): 탭은 좌표 1개, 스와이프는 시작/끝 2개."""
+    if rec is None or rec.kind not in ("tap", "swipe") or rec.p0 is None:
+        return ()
+    if rec.kind == "swipe" and rec.p1 is not None:
+        return ((rec.cat, rec.p0[0], rec.p0[1]), (rec.cat, rec.p1[0], rec.p1[1]))
+    return ((rec.cat, rec.p0[0], rec.p0[1]),)
+
+
+def _heat_orient(w: int, h: int) -> int:
+    """히트맵 격자 방향: 0 세로, 1 가로(ScreenSize.is_landscape 와 같은 기준)."""
+    return 1 if w >= h else 0
+
+
+FILTER_KINDS = ("tap", "swipe", "marker")  # 필터/인덱스의 종류 코드 = 이 튜플의 위치
+
+
+def parse_idx_ranges(text: str) -> Optional[List[Tuple[int, int]]]:
+    """
+    "3,5,10-12" → [(3, 3), (5, 5), (10, 12)] (정렬 + 겹침 병합). 비어 있으면 None.
+    큰 구간("1-100000")도 펼치지 않는다. 형식이 틀리면 ValueError.
+    """
+    out: List[Tuple[int, int]] = []
+    for part in (text or "").replace(" ", "").split(","):
+        if not part:
+            continue
+        a, sep, b = part.partition("-")
+        lo, hi = (int(a), int(b)) if sep else (int(part), int(part))
+        out.append((min(lo, hi), max(lo, hi)))
+    if not out:
+        return None
+    out.sort()
+    merged = [out[0]]
+    for lo, hi in out[1:]:
+        plo, phi = merged[-1]
+        if lo <= phi + 1:
+            merged[-1] = (plo, max(phi, hi))
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+class EventFilter:
+    """
+    보기 필터(카테고리 / 마커 idx 구간 / 종류 / 기기 좌표 사각형).
+    - 표시만 거른다: 이벤트/마커/히트맵 저장소와 재생 상태는 그대로라 바꿔도 다시 파싱/rebuild 하지 않는다.
+    - 각 항목이 None 이면 그 조건은 없음. version 은 바뀔 때마다 증가(그리기/일치 목록 캐시 키).
+    """
+
+    def __init__(self):
+        self.cats: Optional[frozenset] = None
+        self.idx: Optional[List[Tuple[int, int]]] = None
+        self.kinds: Optional[frozenset] = None
+        self.region: Optional[Tuple[int, int, int, int]] = None
+        self.version = 0
+        self._idx_lo: List[int] = []
+
+    @property
+    def active(self) -> bool:
+        return self.cats is not None or self.idx is not None or self.kinds is not None or self.region is not None
+
+    def update(self, **kw):
+        """cats/idx/kinds/region 중 준 것만 바꾼다(None = 조건 해제)."""
+        for k, v in kw.items():
+            if k not in ("cats", "idx", "kinds", "region"):
+                raise TypeError(f"알 수 없는 필터 항목: {k}")
+            if k in ("cats", "kinds") and v is not None:
+                v = frozenset(v)
+            setattr(self, k, v)
+        self._idx_lo = [lo for lo, _hi in self.idx] if self.idx else []
+        self.version += 1
+
+    def clear(self):
+        self.update(cats=None, idx=None, kinds=None, region=None)
+
+    def toggle_cat(self, cat: int):
+        cur = set(range(1, 8)) if self.cats is None else set(self.cats)
+        cur ^= {int(cat)}
+        self.update(cats=None if cur >= set(range(1, 8)) else cur)
+
+    def idx_ok(self, idx: int) -> bool:
+        if self.idx is None:
+            return True
+        k = bisect.bisect_right(self._idx_lo, idx) - 1
+        return k >= 0 and idx <= self.idx[k][1]
+
+    def match(self, cat: int, idx: int, kind: str, x: int, y: int) -> bool:
+        if self.cats is not None and cat not in self.cats:
+            return False
+        if self.kinds is not None and kind not in self.kinds:
+            return False
+        if self.idx is not None and not self.idx_ok(idx):
+            return False
+        r = self.region
+        return r is None or (r[0] <= x <= r[2] and r[1] <= y <= r[3])
+
+    def mask(self, cat, idx, kind, x, y):
+        """match 의 NumPy 판(kind 는 FILTER_KINDS 위치 코드 배열)."""
+        m = np.ones(len(cat), dtype=bool)
+        if self.cats is not None:
+            m &= np.isin(cat, np.fromiter(self.cats, dtype=np.int64))
+        if self.kinds is not None:
+            m &= np.isin(kind, [FILTER_KINDS.index(k) for k in self.kinds if k in FILTER_KINDS])
+        if self.idx is not None:
+            mi = np.zeros(len(idx), dtype=bool)
+            for lo, hi in self.idx:
+                mi |= (idx >= lo) & (idx <= hi)
+            m &= mi
+        r = self.region
+        if r is not None:
+            m &= (x >= r[0]) & (x <= r[2]) & (y >= r[1]) & (y <= r[3])
+        return m
+
+    def describe(self) -> str:
+        parts = []
+        if self.cats is not None:
+            parts.append("cat=" + ",".join(str(c) for c in sorted(self.cats)))
+        if self.idx is not None:
+            parts.append("idx=" + ",".join(str(lo) if lo == hi else f"{lo}-{hi}" for lo, hi in self.idx))
+        if self.kinds is not None:
+            parts.append("kind=" + ",".join(sorted(self.kinds)))
+        if self.region is not None:
+            parts.append("region=%d,%d-%d,%d" % self.region)
+        return " ".join(parts)
+
+
+class HeatmapGrid:
+    """
+    카테고리별 누적 밀도 격자(기기 픽셀 공간, 고정 해상도). 화면 방향마다 따로 grids[방향][cat, gy, gx] = 횟수.
+    - 방향은 0 세로 / 1 가로(_heat_orient). 회전 전후 좌표계가 달라 한 격자에 섞으면 두 화면이 겹쳐 그려지므로,
+      점은 그때의 화면 방향 격자에 넣고 그릴 때는 지금 화면 방향의 격자만 쓴다. 격자는 그 방향 점이 처음 올 때 만든다.
+    - add() 는 O(1), add_many() 는 NumPy 로 한 번에 누적.
+    - to_rgb() 는 카테고리 색을 개수로 가중 평균하고 밝기는 log(총 개수)로 정한다.
+    - 점 목록(카테고리/idx/종류/좌표/방향)도 함께 두어, 필터를 걸면 그 점들만으로 격자를 만든다(증분).
+    - max_points 가 있으면 점 목록은 최근 점만 유지한다(격자 자체는 계속 누적, 필터 격자만 최근 기준).
+    """
+
+    def __init__(self, cell: int = HEATMAP_CELL, extent: int = HEATMAP_EXTENT, max_points: Optional[int] = None):
+        if np is None:
+            raise RuntimeError("히트맵에는 numpy 가 필요합니다(pip install numpy)")
+        self.cell = max(1, int(cell))
+        self.n = (int(extent) + self.cell - 1) // self.cell
+        self.grids: Dict[int, "np.ndarray"] = {}
+        self.total = 0
+        # 그리기 캐시 무효화용(바뀔 때마다 증가)
+        self.version = 0
+        # (추가) 필터용 점 목록(격자 안에 들어간 점만). kind 는 FILTER_KINDS 위치(0 탭, 1 스와이프)
+        self.pt_cat = array("B")
+        self.pt_idx = array("i")
+        self.pt_kind = array("B")
+        self.pt_x = array("i")
+        self.pt_y = array("i")
+        self.pt_orient = array("B")
+        self.max_points = max_points
+        # (필터 version, 반영한 점 수, {방향: 격자})
+        self._flt_cache: Optional[tuple] = None
+
+    def _points(self):
+        return (self.pt_cat, self.pt_idx, self.pt_kind, self.pt_x, self.pt_y, self.pt_orient)
+
+    def _trim_points(self):
+        # 상한을 넘으면 오래된 1/4 을 한 번에 버린다(점마다 당기지 않게). 필터 격자는 남은 점으로 다시 만든다.
+        n = len(self.pt_y)
+        if self.max_points is None or n <= self.max_points:
+            return
+        drop = n - self.max_points + self.max_points // 4
+        for a in self._points():
+            del a[:drop]
+        self._flt_cache = None
+
+    def _grid(self, grids: Dict[int, "np.ndarray"], orient: int):
+        g = grids.get(orient)
+        if g is None:
+            g = grids[orient] = np.zeros((8, self.n, self.n), dtype=np.uint32)
+        return g
+
+    def _accumulate(self, grids: Dict[int, "np.ndarray"], cat, gx, gy, orient):
+        """(cat, 격자 x, 격자 y, 방향) 배열을 방향별 격자에 더한다."""
+        for o in np.unique(orient):
+            m = orient == o
+            g = self._grid(grids, int(o))
+            flat = (cat[m] * self.n + gy[m]) * self.n + gx[m]
+            g += np.bincount(flat, minlength=g.size).reshape(g.shape).astype(np.uint32)
+
+    def grid_for(self, w: int, h: int):
+        """w x h 화면 방향의 격자(그 방향 점이 없으면 None)."""
+        return self.grids.get(_heat_orient(w, h))
+
+    def clear(self):
+        for g in self.grids.values():
+            g.fill(0)
+        self.total = 0
+        self.version += 1
+        for a in self._points():
+            del a[:]
+        self._flt_cache = None
+
+    def add(self, cat: int, x: int, y: int, idx: int = 0, kind: int = 0, orient: int = 0):
+        gx = x // self.cell
+        gy = y // self.cell
+        if 0 <= gx < self.n and 0 <= gy < self.n:
+            self._grid(self.grids, orient)[cat & 7, gy, gx] += 1
+            self.total += 1
+            self.version += 1
+            self.pt_cat.append(cat & 7)
+            self.pt_idx.append(idx)
+            self.pt_kind.append(kind)
+            self.pt_x.append(x)
+            self.pt_y.append(y)
+            self.pt_orient.append(orient)
+            if self.max_points is not None and len(self.pt_y) > self.max_points:
+                self._trim_points()
+
+    def add_rec(self, rec: Optional[ParsedLine], orient: int = 0):
+        """rec 의 탭/스와이프 좌표를 orient(그 라인을 받을 때의 화면 방향) 격자에 넣는다."""
+        if rec is None:
+            return
+        kind = 1 if rec.kind == "swipe" else 0
+        for c, x, y in _heat_points(rec):
+            self.add(c, x, y, rec.idx, kind, orient)
+
+    def add_many(self, cats, xs, ys, idxs=None, kinds=None, orients=None):
+        cats = np.asarray(cats, dtype=np.int64) & 7
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        gx = xs // self.cell
+        gy = ys // self.cell
+        ok = (gx >= 0) & (gx < self.n) & (gy >= 0) & (gy < self.n)
+        if not ok.any():
+            return
+        k = int(ok.sum())
+        ors = np.asarray(orients, dtype=np.uint8)[ok] if orients is not None else np.zeros(k, dtype=np.uint8)
+        self._accumulate(self.grids, cats[ok], gx[ok], gy[ok], ors)
+        self.total += k
+        self.version += 1
+        self.pt_cat.frombytes(cats[ok].astype(np.uint8).tobytes())
+        self.pt_idx.frombytes(
+            (np.asarray(idxs, dtype=np.int32)[ok] if idxs is not None else np.zeros(k, dtype=np.int32)).tobytes()
+        )
+        self.pt_kind.frombytes(
+            (np.asarray(kinds, dtype=np.uint8)[ok] if kinds is not None else np.zeros(k, dtype=np.uint8)).tobytes()
+        )
+        self.pt_x.frombytes(xs[ok].astype(np.int32).tobytes())
+        self.pt_y.frombytes(ys[ok].astype(np.int32).tobytes())
+        self.pt_orient.frombytes(ors.tobytes())
+        self._trim_points()
+
+    def filtered(self, flt: "EventFilter") -> Dict[int, "np.ndarray"]:
+        """필터에 맞는 점만 센 방향별 격자({방향: 격자}). 같은 필터면 새로 들어온 점만 더한다."""
+        n = len(self.pt_y)
+        c = self._flt_cache
+        if c is None or c[0] != flt.version or c[1] > n:
+            c = (flt.version, 0, {})
+        done = c[1]
+        if done < n:
+            # 슬라이스(복사본)로 읽어 이후 append 와 버퍼가 겹치지 않게
+            cat = np.frombuffer(self.pt_cat[done:n], dtype=np.uint8).astype(np.int64)
+            x = np.frombuffer(self.pt_x[done:n], dtype=np.int32)
+            y = np.frombuffer(self.pt_y[done:n], dtype=np.int32)
+            m = flt.mask(
+                cat,
+                np.frombuffer(self.pt_idx[done:n], dtype=np.int32),
+                np.frombuffer(self.pt_kind[done:n], dtype=np.uint8),
+                x,
+                y,
+            )
+            if m.any():
+                ors = np.frombuffer(self.pt_orient[done:n], dtype=np.uint8)
+                self._accumulate(c[2], cat[m], x[m] // self.cell, y[m] // self.cell, ors[m])
+            c = (c[0], n, c[2])
+        self._flt_cache = c
+        return c[2]
+
+    def cells_for(self, w: int, h: int) -> Tuple[int, int]:
+        return min(self.n, max(1, -(-int(w) // self.cell))), min(self.n, max(1, -(-int(h) // self.cell)))
+
+    def to_rgb(self, w: int, h: int, cats: Optional[Sequence[int]] = None, flt: Optional["EventFilter"] = None):
+        """기기 화면(w x h, 그 방향 격자) 범위를 격자 해상도 RGB(uint8, [gh, gw, 3])로. flt 가 있으면 맞는 점만."""
+        gw, gh = self.cells_for(w, h)
+        bg = np.array(HEATMAP_BG, dtype=np.float32)
+        grids = self.filtered(flt) if flt is not None and flt.active else self.grids
+        src = grids.get(_heat_orient(w, h))
+        if src is None:
+            return np.broadcast_to(bg.astype(np.uint8), (gh, gw, 3)).copy()
+        g = src[:, :gh, :gw].astype(np.float32)
+        if cats is not None:
+            mask = np.zeros(8, dtype=np.float32)
+            for c in cats:
+                mask[int(c) & 7] = 1.0
+            g *= mask[:, None, None]
+        tot = g.sum(axis=0)
+        mx = float(tot.max()) if tot.size else 0.0
+        if mx <= 0:
+            return np.broadcast_to(bg.astype(np.uint8), (gh, gw, 3)).copy()
+        pal = np.array([_hex_rgb(cat_color(c)) if c else (148, 163, 184) for c in range(8)], dtype=np.float32)
+        col = np.tensordot(g, pal, axes=([0], [0])) / np.maximum(tot, 1.0)[..., None]
+        inten = (np.log1p(tot) / np.log1p(mx))[..., None]
+        rgb = bg * (1.0 - inten) + col * inten
+        return np.clip(rgb, 0, 255).astype(np.uint8)
+
+    def to_rgb_scaled(
+        self,
+        w: int,
+        h: int,
+        out_w: int,
+        out_h: int,
+        cats: Optional[Sequence[int]] = None,
+        flt: Optional["EventFilter"] = None,
+    ):
+        """to_rgb 를 out_w x out_h 로 최근접 확대/축소(캔버스 표시, PNG 저장용)."""
+        rgb = self.to_rgb(w, h, cats, flt)
+        gh, gw = rgb.shape[:2]
+        out_w = max(1, int(out_w))
+        out_h = max(1, int(out_h))
+        # 출력 픽셀 → 기기 픽셀 → 격자 칸
+        xs = np.minimum((np.arange(out_w) * (w / out_w)) // self.cell, gw - 1).astype(np.intp)
+        ys = np.minimum((np.arange(out_h) * (h / out_h)) // self.cell, gh - 1).astype(np.intp)
+        return rgb[ys[:, None], xs[None, :]]
+
+
+def _png_bytes(rgb) -> bytes:
+    """RGB(uint8, [h, w, 3]) → PNG 바이트(Pillow 없을 때용 최소 인코더)."""
+    import zlib
+
+    h, w = rgb.shape[:2]
+    raw = np.concatenate([np.zeros((h, 1), dtype=np.uint8), rgb.reshape(h, w * 3)], axis=1).tobytes()
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    ihdr = struct.pack(">IIBBBBB", w, h, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", ihdr) + chunk(b"IDAT", zlib.compress(raw, 6)) + chunk(b"IEND", b"")
+
+
+def export_heatmap(heat: HeatmapGrid, out_path: str, screen: ScreenSize, cats: Optional[Sequence[int]] = None) -> str:
+    """
+    히트맵 저장(screen 방향의 격자만).
+    - .npy: 카테고리별 원본 개수 격자 uint32[8, gh, gw] (1칸 = cell x cell 기기 픽셀, 인덱스 0=미분류)
+    - 그 외(.png): 기기 해상도 크기의 색 이미지
+    """
+    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+    if out_path.lower().endswith(".npy"):
+        gw, gh = heat.cells_for(screen.w, screen.h)
+        g = heat.grid_for(screen.w, screen.h)
+        np.save(out_path, g[:, :gh, :gw] if g is not None else np.zeros((8, gh, gw), dtype=np.uint32))
+        return out_path
+    rgb = heat.to_rgb_scaled(screen.w, screen.h, screen.w, screen.h, cats)
+    if Image is not None:
+        Image.fromarray(rgb, "RGB").save(out_path)
+    else:
+        with open(out_path, "wb") as f:
+            f.write(_png_bytes(rgb))
+    return out_path
+
+
+def _open_log_text(path: str):
+    """저장 로그를 텍스트 스트림으로 연다(.gz/.zst 는 풀면서 읽음)."""
+    low = path.lower()
+    if low.endswith(".gz"):
+        import gzip
+
+        return gzip.open(path, "rt", encoding="utf-8", errors="ignore")
+    if low.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(".zst 로그에는 zstandard 패키지가 필요합니다(pip install zstandard)")
+        raw = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+        return io.TextIOWrapper(raw, encoding="utf-8", errors="ignore")
+    return open(path, "r", encoding="utf-8", errors="ignore")
+
+
+def build_heatmap(paths: List[str], cell: int = HEATMAP_CELL) -> Tuple[HeatmapGrid, Dict[int, ScreenSize]]:
+    """
+    (헤드리스) 저장 로그(.txt/.gz/.zst/.atxrec)의 모든 탭/스와이프를 히트맵으로.
+    점은 그때의 화면 방향 격자에 넣고(size 라인을 따라감, 첫 size 전은 세로), 방향별 화면 크기는 로그에서 본 최대값.
+    반환: (히트맵, {방향: 화면 크기}) — 점이 있는 방향만(없으면 세로 1080x2400 하나).
+    """
+    heat = HeatmapGrid(cell)
+    sizes: Dict[int, List[int]] = {}
+    files: List[str] = []
+    for p in paths:
+        files.extend(sorted(glob.glob(p)) if any(ch in p for ch in "*?[") else [p])
+    for path in files:
+        cats = array("i")
+        xs = array("i")
+        ys = array("i")
+        ors = array("B")
+        orient = 0
+        if path.lower().endswith(".atxrec"):
+            src = AtxRecReplay(path)
+            recs = (src.record(i) for i in range(len(src)))
+        else:
+            src = _open_log_text(path)
+            recs = (classify_line(ln) for ln in src)
+        try:
+            for rec in recs:
+                if rec is None:
+                    continue
+                if rec.size is not None:
+                    orient = _heat_orient(rec.size.w, rec.size.h)
+                    wh = sizes.setdefault(orient, [0, 0])
+                    wh[0] = max(wh[0], rec.size.w)
+                    wh[1] = max(wh[1], rec.size.h)
+                for c, x, y in _heat_points(rec):
+                    cats.append(c)
+                    xs.append(x)
+                    ys.append(y)
+                    ors.append(orient)
+        finally:
+            src.close()
+        heat.add_many(cats, xs, ys, orients=ors)
+    # 방향별로 화면 크기 로그와 실제 좌표 범위 중 큰 쪽(크기 로그가 없거나 작아도 잘리지 않게)
+    screens: Dict[int, ScreenSize] = {}
+    for o, g in sorted(heat.grids.items()):
+        ny, nx = np.nonzero(g.sum(axis=0))
+        if not nx.size:
+            continue
+        w, h = sizes.get(o, (0, 0))
+        w = max(w, int((nx.max() + 1) * heat.cell))
+        h = max(h, int((ny.max() + 1) * heat.cell))
+        screens[o] = ScreenSize(w, h)
+    return heat, screens or {0: ScreenSize(1080, 2400)}
+
+
+# ---------------------------------------------------------------------------
+# 헤드리스 영상 내보내기(--export-video): 재생 화면을 Pillow 로 그려 PNG 연속/GIF/WebP 저장
+# ---------------------------------------------------------------------------
+
+EXPORT_BG = "#0b1220"
+EXPORT_MARGIN = 18
+# 한글 범례용 글꼴 후보(Windows → macOS → Linux 순). 없으면 Pillow 기본 글꼴.
+EXPORT_FONTS = (
+    "malgun.ttf",
+    "C:/Windows/Fonts/malgun.ttf",
+    "/System/Library/Fonts/AppleSDGothicNeo.ttc",
+    "/usr/share/fonts/truetype/nanum/NanumGothic.ttf",
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+    "NanumGothic.ttf",
+    "DejaVuSans.ttf",
+)
+
+
+def open_replay_source(path: str, max_gap: float = REPLAY_MAX_GAP_SEC) -> Sequence[Tuple[float, str]]:
+    """재생 소스 열기(.atxrec 또는 텍스트/압축 로그). 텍스트는 인덱싱 완료까지 기다린다(헤드리스용)."""
+    if path.lower().endswith(".atxrec"):
+        return AtxRecReplay(path, max_gap)
+    src = LazyLogReplay(path, max_gap)
+    src.wait_done()
+    if src.error:
+        raise RuntimeError(src.error)
+    return src
+
+
+def _load_font(size: int, bold: bool = False):
+    from PIL import ImageFont
+
+    names = EXPORT_FONTS
+    if bold:
+        names = ("malgunbd.ttf", "C:/Windows/Fonts/malgunbd.ttf", "DejaVuSans-Bold.ttf") + names
+    for name in names:
+        try:
+            return ImageFont.truetype(name, size)
+        except Exception:
+            continue
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:
+        return ImageFont.load_default()
+
+
+class _FrameRenderer:
+    """VisualizerApp.redraw 와 같은 그림(폰 영역/범례/탭/스와이프 화살표/마커)을 Pillow 이미지로."""
+
+    def __init__(self, width: int, height: int):
+        from PIL import ImageDraw
+
+        self._draw_mod = ImageDraw
+        self.w = int(width)
+        self.h = int(height)
+        self.font = _load_font(13)
+        self.font_bold = _load_font(13, bold=True)
+        self.font_small = _load_font(12)
+        self.font_small_bold = _load_font(12, bold=True)
+        self._base_key: Optional[Tuple[int, int]] = None
+        self._base = None
+        # 쓰는 색이 몇 개 안 되므로 고정 팔레트(P 모드)로 그린다: PNG 저장이 RGB 보다 훨씬 빠르고
+        # 모든 프레임 팔레트가 같아 GIF/WebP 로 묶을 때 색 양자화가 필요 없다.
+        cols = [EXPORT_BG, "#334155", "#e5e7eb", "#cbd5e1"] + [cat_color(i) for i in range(1, 8)]
+        self._palette = [v for c in cols for v in _hex_rgb(c)]
+
+    def transform(self, screen: ScreenSize) -> Tuple[float, float, float]:
+        aw = max(1, self.w - EXPORT_MARGIN * 2)
+        ah = max(1, self.h - EXPORT_MARGIN * 2)
+        s = min(aw / screen.w, ah / screen.h)
+        return s, (self.w - screen.w * s) / 2.0, (self.h - screen.h * s) / 2.0
+
+    def _background(self, screen: ScreenSize):
+        # 정적 레이어(배경/폰 영역/범례)는 화면 크기가 바뀔 때만 다시 그린다
+        key = (screen.w, screen.h)
+        if self._base_key != key:
+            img = Image.new("P", (self.w, self.h), 0)
+            img.putpalette(self._palette)
+            d = self._draw_mod.Draw(img)
+            s, ox, oy = self.transform(screen)
+            d.rectangle((ox, oy, ox + screen.w * s, oy + screen.h * s), outline="#334155", width=2)
+            r = 10
+            for i in range(1, 8):
+                cy = 12 + (i - 1) * 24
+                cx = 12 + r
+                col = cat_color(i)
+                d.ellipse((cx - r, cy - r, cx + r, cy + r), outline=col, width=2)
+                d.text((cx, cy), str(i), fill=col, font=self.font_bold, anchor="mm")
+                d.text((cx + r + 6, cy), cat_name(i), fill="#e5e7eb", font=self.font, anchor="lm")
+            self._base = img
+            self._base_key = key
+        return self._base.copy()
+
+    def render(
+        self,
+        screen: ScreenSize,
+        events: Sequence[Tuple[float, ParsedLine]],
+        markers: Dict[int, Tuple[float, ParsedLine]],
+        now: float,
+        keep_seconds: float,
+        short_ttl: float,
+        short_cats: set,
+        marker_ttl: float,
+    ):
+        img = self._background(screen)
+        d = self._draw_mod.Draw(img)
+        s, ox, oy = self.transform(screen)
+        for ts, rec in markers.values():
+            if (now - ts) > marker_ttl:
+                continue
+            x, y = rec.p0 or (0, 0)
+            cx, cy = ox + x * s, oy + y * s
+            col = cat_color(rec.cat)
+            r = 8
+            d.ellipse((cx - r, cy - r, cx + r, cy + r), outline=col, width=2)
+            d.text((cx, cy), str(rec.cat), fill=col, font=self.font_small_bold, anchor="mm")
+            d.text((cx + r + 4, cy), str(rec.idx), fill="#cbd5e1", font=self.font_small, anchor="lm")
+        for ts, rec in events:
+            ttl = short_ttl if rec.cat in short_cats else keep_seconds
+            age = now - ts
+            if age > ttl:
+                continue
+            alpha = max(0.15, 1.0 - (age / max(0.05, ttl)))
+            col = cat_color(rec.cat)
+            p0 = rec.p0 or (0, 0)
+            cx, cy = ox + p0[0] * s, oy + p0[1] * s
+            if rec.kind == "tap":
+                rr = 6 + int(6 * (1.0 - alpha))
+                d.ellipse((cx - rr, cy - rr, cx + rr, cy + rr), outline=col, width=2)
+                d.ellipse((cx - 2, cy - 2, cx + 2, cy + 2), fill=col, outline=col)
+            elif rec.p1 is not None:
+                ex, ey = ox + rec.p1[0] * s, oy + rec.p1[1] * s
+                self._arrow(d, cx, cy, ex, ey, col, 3)
+                d.ellipse((cx - 3, cy - 3, cx + 3, cy + 3), fill=col, outline=col)
+        return img
+
+    @staticmethod
+    def _arrow(d, x0: float, y0: float, x1: float, y1: float, col: str, width: int):
+        # Tk 기본 화살촉(arrowshape=8,10,3)과 비슷한 삼각형
+        dx = x1 - x0
+        dy = y1 - y0
+        ln = (dx * dx + dy * dy) ** 0.5
+        if ln < 1e-6:
+            return
+        ux, uy = dx / ln, dy / ln
+        head = min(10.0, ln)
+        half = 3.0 + width / 2.0
+        bx, by = x1 - ux * head, y1 - uy * head
+        d.line((x0, y0, bx, by), fill=col, width=width)
+        d.polygon([(x1, y1), (bx - uy * half, by + ux * half), (bx + uy * half, by - ux * half)], fill=col)
+
+
+def _size_at(src: Sequence[Tuple[float, str]], pos: int) -> Optional[ScreenSize]:
+    # 화면 크기 라인만 파싱(텍스트는 싼 리터럴 검사 후)
+    rec_fn = getattr(src, "record", None)
+    if rec_fn is not None:
+        rec = rec_fn(pos)
+    else:
+        line = src[pos][1]
+        if not ("size changed" in line or "startProjection" in line or "resized to" in line):
+            return None
+        rec = classify_line(line)
+    return rec.size if rec is not None else None
+
+
+def _screen_before(src: Sequence[Tuple[float, str]], positions: List[int], initial: ScreenSize) -> List[ScreenSize]:
+    """각 위치 직전까지 반영된 화면 크기(positions 오름차순)."""
+    out: List[ScreenSize] = []
+    screen = initial
+    pos = 0
+    for target in positions:
+        while pos < target:
+            sz = _size_at(src, pos)
+            if sz is not None:
+                screen = sz
+            pos += 1
+        out.append(screen)
+    return out
+
+
+class _LineRange:
+    """
+    부모가 인덱싱해 둔 텍스트 로그의 한 구간(내보내기 워커용). 워커가 로그 전체를 다시 인덱싱하지 않도록
+    구간의 상대초/바이트 위치/길이 배열만 받아 data_path(압축 로그는 부모가 풀어 둔 파일)에서 라인을 읽는다.
+    """
+
+    def __init__(self, data_path: str, times: array, starts: array, lens: array):
+        self.times = times
+        self.starts = starts
+        self.lens = lens
+        self._fp = open(data_path, "rb")
+        self._mm = mmap.mmap(self._fp.fileno(), 0, access=mmap.ACCESS_READ) if len(starts) else None
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def __getitem__(self, i: int) -> Tuple[float, str]:
+        st = self.starts[i]
+        return self.times[i], self._mm[st : st + self.lens[i]].decode("utf-8", errors="ignore")
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+        self._fp.close()
+
+
+def _export_frames_chunk(job: tuple) -> int:
+    """
+    프레임 k0..k1-1 을 그려 frames_dir 에 PNG 로 저장(프로세스 풀 작업 단위).
+    job[0] = .atxrec 경로(인덱스만 읽으므로 바로 열림) 또는 _LineRange 인자(텍스트 로그 구간).
+    """
+    spec = job[0]
+    src = open_replay_source(spec) if isinstance(spec, str) else _LineRange(*spec)
+    try:
+        return _export_frames(src, *job[1:])
+    finally:
+        src.close()
+
+
+def _export_frames(src: Sequence[Tuple[float, str]], k0, k1, fps, speed, out_w, out_h, screen0, frames_dir, ttl) -> int:
+    """열린 재생 소스로 프레임 k0..k1-1 을 그린다."""
+    keep_seconds, short_ttl, short_cats, marker_ttl, max_events = ttl
+    times = src.times
+    n = len(src)
+    rec_fn = getattr(src, "record", None)
+    window = max(keep_seconds, short_ttl, marker_ttl)
+    pos = bisect.bisect_left(times, k0 * speed / fps - window)
+    screen = ScreenSize(*screen0)
+    events: "collections.deque" = collections.deque()
+    markers: Dict[int, Tuple[float, ParsedLine]] = {}
+    r = _FrameRenderer(out_w, out_h)
+    for k in range(k0, k1):
+        now = k * speed / fps
+        while pos < n and times[pos] <= now:
+            ts = times[pos]
+            rec = rec_fn(pos) if rec_fn is not None else classify_line(src[pos][1])
+            pos += 1
+            if rec is None:
+                continue
+            if rec.kind == "marker":
+                markers[rec.idx] = (ts, rec)
+                continue
+            if rec.size is not None:
+                screen = rec.size
+            if rec.kind != "size":
+                events.append((ts, rec))
+        while events and (now - events[0][0]) > window:
+            events.popleft()
+        while len(events) > max_events:
+            events.popleft()
+        img = r.render(screen, events, markers, now, keep_seconds, short_ttl, short_cats, marker_ttl)
+        img.save(os.path.join(frames_dir, f"frame_{k:06d}.png"), compress_level=1)
+    return k1 - k0
+
+
+def export_replay_video(
+    path: str,
+    out: str,
+    fps: float = 10.0,
+    size: Tuple[int, int] = (540, 960),
+    speed: float = 1.0,
+    workers: int = 0,
+    keep_seconds: float = 12.0,
+) -> str:
+    """
+    저장 로그 재생 화면을 파일로 내보낸다(디스플레이/Tk 불필요, Pillow 필요).
+    - out 이 .gif/.webp 면 애니메이션 1개, 그 외에는 폴더로 보고 frame_000000.png ... 저장
+    - 타임라인(프레임 번호)을 workers 개 구간으로 나눠 프로세스 풀에서 동시에 그린다.
+    - speed: 로그 시간 배속(2 = 2배 빠르게), fps: 출력 프레임 수/초
+    """
+    if Image is None:
+        raise RuntimeError("영상 내보내기에는 Pillow 가 필요합니다(pip install pillow)")
+    workers = int(workers) if workers and int(workers) > 0 else (os.cpu_count() or 1)
+    fps = max(0.1, float(fps))
+    speed = max(1e-3, float(speed))
+    # 로그는 부모에서 한 번만 인덱싱하고, 워커에는 .atxrec 경로 또는 자기 구간 배열만 넘긴다
+    src = open_replay_source(path)
+    tmps: List[tempfile.TemporaryDirectory] = []
+    try:
+        n = len(src)
+        total = float(src.times[n - 1]) if n else 0.0
+        n_frames = int(total * fps / speed) + 1
+        # 구간별 시작 위치(TTL 창만큼 앞)의 화면 크기. 시작 크기는 로그에서 처음 나온 크기.
+        window = max(float(keep_seconds), 0.300)
+        bounds = [n_frames * i // workers for i in range(workers + 1)]
+        bounds = sorted(set(bounds))
+        starts = [bisect.bisect_left(src.times, bounds[i] * speed / fps - window) for i in range(len(bounds) - 1)]
+        initial = ScreenSize(1080, 2400)
+        for i in range(n):
+            sz = _size_at(src, i)
+            if sz is not None:
+                initial = sz
+                break
+        screens = _screen_before(src, starts, initial)
+
+        anim = out.lower().endswith((".gif", ".webp"))
+        if anim:
+            tmps.append(tempfile.TemporaryDirectory(prefix="atx_frames_"))
+            frames_dir = tmps[-1].name
+        else:
+            frames_dir = out
+            Path(frames_dir).mkdir(parents=True, exist_ok=True)
+        ttl = (float(keep_seconds), 0.300, {1, 2, 3, 4, 5, 6, 7}, 0.300, 600)
+        args = [
+            (bounds[i], bounds[i + 1], fps, speed, int(size[0]), int(size[1]), (screens[i].w, screens[i].h), frames_dir, ttl)
+            for i in range(len(bounds) - 1)
+        ]
+        if workers <= 1 or len(args) <= 1:
+            for a in args:
+                _export_frames(src, *a)
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            if isinstance(src, LazyLogReplay):
+                data_path = path
+                if src.codec:
+                    # 압축 로그: 부모가 풀어 둔 내용을 이름 있는 임시 파일로 한 번 복사해 워커가 같이 읽는다
+                    tmps.append(tempfile.TemporaryDirectory(prefix="atx_export_"))
+                    data_path = os.path.join(tmps[-1].name, "log.txt")
+                    src.copy_to(data_path)
+                specs = []
+                for i, a in enumerate(args):
+                    lo = starts[i]
+                    hi = bisect.bisect_right(src.times, (a[1] - 1) * speed / fps)
+                    specs.append((data_path, src.times[lo:hi], src.starts[lo:hi], src.lens[lo:hi]))
+            else:
+                specs = [path] * len(args)
+            with ProcessPoolExecutor(max_workers=workers) as ex:
+                list(ex.map(_export_frames_chunk, [(sp,) + a for sp, a in zip(specs, args)]))
+        if anim:
+            names = [os.path.join(frames_dir, f"frame_{k:06d}.png") for k in range(n_frames)]
+            frames = (Image.open(p) for p in names[1:])
+            first_img = Image.open(names[0])
+            Path(out).parent.mkdir(parents=True, exist_ok=True)
+            # 팔레트가 이미 고정이라 GIF 팔레트 최적화(프레임마다 색 세기)는 끈다
+            first_img.save(
+                out, save_all=True, append_images=frames, duration=int(round(1000.0 / fps)), loop=0, optimize=False
+            )
+    finally:
+        src.close()
+        for t in tmps:
+            t.cleanup()
+    return out
+
+
+@dataclass
+class ReplayCheckpoint:
+    """pos 직전 라인까지 반영된 재생 상태(시간 t 기준, TTL 안에 남아 있는 것만)."""
+
+    pos: int
+    t: float
+    screen: ScreenSize
+    markers: List[Tuple[float, ParsedLine]]
+    events: List[Tuple[float, ParsedLine]]
+
+
+OVERVIEW_BINS = 720  # 타임라인 개요 구간 수(파일 길이와 무관하게 고정 → 그리기 비용 일정)
+OVERVIEW_SIZE_COLOR = (250, 204, 21)  # 화면 크기 변경
+OVERVIEW_ROT_COLOR = (232, 121, 249)  # 회전(가로/세로 전환)
+
+
+@dataclass
+class TimelineOverview:
+    """
+    재생 타임라인 개요(구간별 카테고리 이벤트 수 + 화면 크기 변경/회전 시각). ReplayIndex 가 인덱싱 끝에 한 번 만든다.
+    - counts[cat, bin]: 구간 [bin*total/bins, (bin+1)*total/bins) 의 탭/스와이프 수
+    - size_t / rot_t: 화면 크기 변경 / 회전 시각(상대초)
+    """
+
+    total: float
+    counts: "np.ndarray"
+    size_t: "np.ndarray"
+    rot_t: "np.ndarray"
+
+    @property
+    def bins(self) -> int:
+        return int(self.counts.shape[1])
+
+    def bin_start(self, b: int) -> float:
+        return self.total * max(0, min(self.bins - 1, int(b))) / self.bins
+
+    def peak_bin(self, x0: float, x1: float) -> int:
+        """[x0, x1) 비율 범위(0~1)에서 이벤트가 가장 많은 구간(클릭한 픽셀 열의 스파이크)."""
+        n = self.bins
+        b0 = max(0, min(n - 1, int(x0 * n)))
+        b1 = max(b0 + 1, min(n, int(np.ceil(x1 * n))))
+        return b0 + int(np.argmax(self.counts[:, b0:b1].sum(axis=0)))
+
+    def to_rgb(self, width: int, height: int):
+        """누적 막대(아래부터 카테고리 1..7, 높이=sqrt(개수)) + 위쪽 크기 변경/회전 표시. [height, width, 3] uint8."""
+        w = max(1, int(width))
+        h = max(2, int(height))
+        n = self.bins
+        if w >= n:
+            c = self.counts[:, (np.arange(w) * n) // w].astype(np.float64)
+        else:
+            # 열 하나에 구간 여러 개: 합친다
+            bin_col = (np.arange(n) * w) // n
+            c = np.stack([np.bincount(bin_col, weights=self.counts[k], minlength=w) for k in range(8)])
+        tot = c.sum(axis=0)
+        mx = float(tot.max()) if tot.size else 0.0
+        bg = np.array(HEATMAP_BG, dtype=np.uint8)
+        rgb = np.broadcast_to(bg, (h, w, 3)).copy()
+        mark_h = max(2, h // 6)
+        bar_h = h - mark_h
+        if mx > 0:
+            col_h = np.sqrt(tot / mx) * bar_h
+            cum = np.cumsum(c / np.maximum(tot, 1.0) * col_h, axis=0)  # [8, w]
+            pal = np.array([_hex_rgb(cat_color(k)) if k else (148, 163, 184) for k in range(8)], dtype=np.uint8)
+            r = (np.arange(bar_h) + 0.5)[:, None, None]  # 아래에서부터 픽셀 행
+            cat = (cum[None, :, :] > r).argmax(axis=1)  # [bar_h, w] 그 높이를 덮는 첫 카테고리
+            on = r[:, :, 0] < col_h[None, :]
+            px = np.where(on[..., None], pal[cat], bg)
+            rgb[mark_h:] = px[::-1]
+        for ts, color in ((self.size_t, OVERVIEW_SIZE_COLOR), (self.rot_t, OVERVIEW_ROT_COLOR)):
+            if len(ts) and self.total > 0:
+                xs = np.minimum((ts / self.total * w).astype(np.int64), w - 1)
+                rgb[:mark_h, xs] = color
+        return rgb
+
+
+def timeline_overview(
+    times: Sequence[float],
+    ev_pos,
+    ev_cat,
+    ev_kind,
+    size_pos,
+    size_rot,
+    bins: int = OVERVIEW_BINS,
+) -> TimelineOverview:
+    """인덱스 패스에서 모은 배열(라인 위치/카테고리/종류, 크기 변경 위치)만으로 개요를 만든다(라인 재파싱 없음)."""
+    n = len(times)
+    tt = np.frombuffer(times[:n], dtype=np.float64) if isinstance(times, array) else np.asarray(times, dtype=np.float64)
+    total = float(tt[-1]) if n else 0.0
+    pos = np.frombuffer(ev_pos, dtype=np.uint32).astype(np.int64)
+    keep = np.frombuffer(ev_kind, dtype=np.uint8) != FILTER_KINDS.index("marker")
+    t = tt[pos[keep]] if n else np.zeros(0)
+    cat = np.frombuffer(ev_cat, dtype=np.uint8)[keep].astype(np.int64) & 7
+    b = np.minimum((t / total * bins).astype(np.int64), bins - 1) if total > 0 else np.zeros(len(t), dtype=np.int64)
+    counts = np.bincount(cat * bins + b, minlength=8 * bins).reshape(8, bins)
+    sp = np.frombuffer(size_pos, dtype=np.uint32).astype(np.int64)
+    rot = np.frombuffer(size_rot, dtype=np.uint8).astype(bool)
+    st = tt[sp] if n else np.zeros(0)
+    return TimelineOverview(total=total, counts=counts, size_t=st[~rot], rot_t=st[rot])
+
+
+class ReplayIndex:
+    """
+    재생 소스의 상대초 배열(캐시) + 주기적 상태 체크포인트.
+    - 체크포인트는 백그라운드 스레드에서 every 라인마다 쌓인다(쌓이는 중에도 사용 가능).
+    - seek 는 가장 가까운 이전 체크포인트를 복원하고 짧은 꼬리만 다시 재생한다.
+    - 필터용 이벤트 인덱스: 탭/스와이프/마커 라인마다 한 행, by_cat / by_idx 는 카테고리별/idx별 행 번호.
+    - 끝나면 같은 배열로 타임라인 개요(overview)를 만든다(NumPy 있을 때).
+    """
+
+    def __init__(
+        self,
+        src: Sequence[Tuple[float, str]],
+        initial_screen: ScreenSize,
+        keep_seconds: float,
+        marker_ttl_sec: float,
+        max_events: int,
+        every: int = 2000,
+    ):
+        self.src = src
+        times = getattr(src, "times", None)
+        self.times: Sequence[float] = times if times is not None else array("d", (t for (t, _line) in src))
+        self.initial_screen = initial_screen
+        self.keep_seconds = float(keep_seconds)
+        self.marker_ttl_sec = float(marker_ttl_sec)
+        self.max_events = int(max_events)
+        self.every = max(100, int(every))
+        self.checkpoints: List[ReplayCheckpoint] = []
+        self._cp_pos: List[int] = []
+        # (추가) 히트맵용 탭/스와이프 좌표(라인 위치 순). seek 후 target 이전 것만 모아 누적 히트맵을 다시 만든다.
+        self.heat_pos = array("I")
+        self.heat_cat = array("B")
+        self.heat_x = array("i")
+        self.heat_y = array("i")
+        self.heat_idx = array("i")
+        self.heat_kind = array("B")
+        self.heat_orient = array("B")
+        # (추가) 필터용 이벤트 인덱스(행 = 탭/스와이프/마커 라인 1개). ev_y 를 마지막에 넣으므로 len(ev_y) 까지가 완성된 행
+        self.ev_pos = array("I")
+        self.ev_cat = array("B")
+        self.ev_idx = array("i")
+        self.ev_kind = array("B")
+        self.ev_x = array("i")
+        self.ev_y = array("i")
+        self.by_cat: Dict[int, array] = {}
+        self.by_idx: Dict[int, array] = {}
+        # (필터 version, 행 수, 일치 위치 배열)
+        self._match_cache: Optional[tuple] = None
+        # (추가) 화면 크기 변경 라인 위치(+ 회전 여부)와 타임라인 개요
+        self.size_pos = array("I")
+        self.size_rot = array("B")
+        self.overview: Optional[TimelineOverview] = None
+        self.built_pos = 0
+        self.done = False
+        self._stop = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._build, name="atx-replay-index", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop = True
+
+    def _record(self, i: int) -> Optional[ParsedLine]:
+        rec_fn = getattr(self.src, "record", None)
+        if rec_fn is not None:
+            return rec_fn(i)
+        return classify_line(self.src[i][1])
+
+    def _build(self):
+        src = self.src
+        times = self.times
+        screen = self.initial_screen
+        markers: Dict[int, Tuple[float, ParsedLine]] = {}
+        events: "collections.deque" = collections.deque()
+        keep = self.keep_seconds
+        mttl = self.marker_ttl_sec
+        i = -1
+        while True:
+            i += 1
+            if self._stop:
+                return
+            if i >= len(src):
+                # 지연 로딩 소스는 인덱싱이 끝날 때까지 따라간다
+                if getattr(src, "done", True):
+                    break
+                time.sleep(0.05)
+                i -= 1
+                continue
+            if i and i % self.every == 0:
+                t_cp = times[i - 1]
+                while events and (t_cp - events[0][0]) > keep:
+                    events.popleft()
+                while len(events) > self.max_events:
+                    events.popleft()
+                live = [(t, r) for (t, r) in markers.values() if (t_cp - t) <= mttl]
+                self.checkpoints.append(ReplayCheckpoint(pos=i, t=t_cp, screen=screen, markers=live, events=list(events)))
+                self._cp_pos.append(i)
+            self.built_pos = i
+            rec = self._record(i)
+            if rec is None:
+                continue
+            if rec.kind in FILTER_KINDS:
+                self._add_event_row(i, rec)
+            if rec.kind == "marker":
+                markers[rec.idx] = (times[i], rec)
+                continue
+            if rec.size is not None:
+                sz = rec.size
+                if sz.w != screen.w or sz.h != screen.h:
+                    self.size_pos.append(i)
+                    self.size_rot.append(int((sz.w > sz.h) != (screen.w > screen.h)))
+                screen = sz
+            if rec.kind != "size":
+                events.append((times[i], rec))
+                kind = 1 if rec.kind == "swipe" else 0
+                orient = _heat_orient(screen.w, screen.h)
+                for c, x, y in _heat_points(rec):
+                    self.heat_pos.append(i)
+                    self.heat_cat.append(c & 0xFF)
+                    self.heat_x.append(x)
+                    self.heat_y.append(y)
+                    self.heat_idx.append(rec.idx)
+                    self.heat_kind.append(kind)
+                    self.heat_orient.append(orient)
+        self.built_pos = len(src)
+        if np is not None:
+            try:
+                self.overview = timeline_overview(
+                    times, self.ev_pos, self.ev_cat, self.ev_kind, self.size_pos, self.size_rot
+                )
+            except Exception as e:
+                print(f"[WARN] 타임라인 개요 계산 실패: {e}", file=sys.stderr)
+        self.done = True
+
+    def _add_event_row(self, i: int, rec: ParsedLine):
+        row = len(self.ev_y)
+        x, y = rec.p0 or (0, 0)
+        self.ev_pos.append(i)
+        self.ev_cat.append(rec.cat & 0xFF)
+        self.ev_idx.append(rec.idx)
+        self.ev_kind.append(FILTER_KINDS.index(rec.kind))
+        self.ev_x.append(x)
+        self.ev_y.append(y)
+        b = self.by_cat.get(rec.cat)
+        if b is None:
+            b = self.by_cat[rec.cat] = array("I")
+        b.append(row)
+        # idx 0(미지정)도 넣어야 라이브 필터(EventFilter.mask)와 결과가 같다
+        b = self.by_idx.get(rec.idx)
+        if b is None:
+            b = self.by_idx[rec.idx] = array("I")
+        b.append(row)
+
+    def matches(self, flt: EventFilter):
+        """
+        필터에 맞는 라인 위치(정렬된 NumPy 배열, 지금까지 인덱싱된 범위).
+        idx 조건이 있으면 by_idx, 카테고리 조건만 있으면 by_cat 버킷에서 후보 행을 모은 뒤 나머지 조건을 벡터로 거른다.
+        """
+        rows_n = len(self.ev_y)
+        c = self._match_cache
+        if c is not None and c[0] == flt.version and c[1] == rows_n:
+            return c[2]
+        if flt.idx is not None:
+            keys = [k for k in list(self.by_idx) if flt.idx_ok(k)]
+            buckets = [self.by_idx[k] for k in keys]
+        elif flt.cats is not None:
+            buckets = [self.by_cat[k] for k in list(self.by_cat) if k in flt.cats]
+        else:
+            buckets = None
+        if buckets is None:
+            rows = np.arange(rows_n, dtype=np.int64)
+        elif buckets:
+            # 버킷 끝의 아직 완성 안 된 행(백그라운드 append 중)은 제외
+            rows = np.sort(np.concatenate([np.frombuffer(b[: len(b)], dtype=np.uint32) for b in buckets]).astype(np.int64))
+            rows = rows[rows < rows_n]
+        else:
+            rows = np.zeros(0, dtype=np.int64)
+
+        def col(a, dt):
+            return np.frombuffer(a[:rows_n], dtype=dt)[rows]
+
+        m = flt.mask(
+            col(self.ev_cat, np.uint8),
+            col(self.ev_idx, np.int32),
+            col(self.ev_kind, np.uint8),
+            col(self.ev_x, np.int32),
+            col(self.ev_y, np.int32),
+        )
+        out = col(self.ev_pos, np.uint32)[m]
+        self._match_cache = (flt.version, rows_n, out)
+        return out
+
+    def heat_until(self, heat: "HeatmapGrid", pos: int) -> bool:
+        """pos 이전 라인들의 탭/스와이프로 heat 를 다시 채운다. 아직 pos 까지 인덱싱이 안 됐으면 False."""
+        if self.built_pos < pos:
+            return False
+        k = bisect.bisect_left(self.heat_pos, int(pos))
+        heat.clear()
+        if k > 0:
+            # 슬라이스(복사본)로 넘겨 백그라운드 스레드의 append 와 버퍼가 겹치지 않게
+            heat.add_many(
+                np.frombuffer(self.heat_cat[:k], dtype=np.uint8),
+                np.frombuffer(self.heat_x[:k], dtype=np.int32),
+                np.frombuffer(self.heat_y[:k], dtype=np.int32),
+                np.frombuffer(self.heat_idx[:k], dtype=np.int32),
+                np.frombuffer(self.heat_kind[:k], dtype=np.uint8),
+                np.frombuffer(self.heat_orient[:k], dtype=np.uint8),
+            )
+        return True
+
+    def nearest(self, pos: int) -> Optional[ReplayCheckpoint]:
+        """pos 이하에서 가장 가까운 체크포인트(없으면 None)."""
+        k = bisect.bisect_right(self._cp_pos, int(pos)) - 1
+        if k < 0:
+            return None
+        return self.checkpoints[k]
+
+
+@dataclass
+class MarkerState:
+    idx: int
+    kind: str
+    cat: int
+    x: int
+    y: int
+    ts: float
+    meta: str = ""  # MARKER 라인의 k=v 메타데이터(delayMs/pressMs/tpl/region/rgb/acc ...)
+
+
+HOVER_RADIUS_PX = 14  # 호버 히트 테스트 반경(캔버스 px)
+
+
+class SpatialGrid:
+    """
+    기기 좌표 균일 격자 인덱스(호버 히트 테스트용). cells[(gx, gy)] = [(x, y, item), ...]
+    - insert 는 O(1), nearest 는 반경이 걸치는 칸만 최근 것부터 본다(전체 항목 수와 무관).
+    - 삭제는 하지 않는다: 조회 시 alive(item) 로 거르고, 죽은 항목이 쌓이면 호출 측이 다시 만든다.
+    """
+
+    def __init__(self, cell: int = 64):
+        self.cell = max(1, int(cell))
+        self.cells: Dict[Tuple[int, int], list] = {}
+        self.n = 0
+
+    def clear(self):
+        self.cells.clear()
+        self.n = 0
+
+    def insert(self, x: int, y: int, item):
+        key = (x // self.cell, y // self.cell)
+        lst = self.cells.get(key)
+        if lst is None:
+            lst = self.cells[key] = []
+        lst.append((x, y, item))
+        self.n += 1
+
+    def nearest(self, x: float, y: float, radius: float, alive: Optional[Callable[[object], bool]] = None):
+        """(x, y) 에서 radius 안의 가장 가까운 살아 있는 항목(거리가 같으면 최근 것). 없으면 None."""
+        c = self.cell
+        best = None
+        bd = radius * radius
+        for gy in range(int((y - radius) // c), int((y + radius) // c) + 1):
+            for gx in range(int((x - radius) // c), int((x + radius) // c) + 1):
+                lst = self.cells.get((gx, gy))
+                if not lst:
+                    continue
+                for ix, iy, item in reversed(lst):
+                    d2 = (ix - x) * (ix - x) + (iy - y) * (iy - y)
+                    if (d2 < bd or best is None and d2 <= bd) and (alive is None or alive(item)):
+                        bd = d2
+                        best = item
+        return best
+
+
+SAVE_COMPRESS_EXT = {"": "", "gz": ".gz", "zst": ".zst"}
+_LIVE_WRITERS: "weakref.WeakSet[LogWriter]" = weakref.WeakSet()
+_FLUSH_HANDLERS_INSTALLED = False
+
+
+class LogWriter:
+    """
+    (--save-log) 전용 기록 스레드.
+    - write() 는 deque 에 넣기만 한다(append 는 원자적이라 잠금 없음) → UI/파싱 스레드는 파일 I/O를 기다리지 않는다
+    - 기록 스레드가 flush_sec 마다 쌓인 라인을 한 번에 인코딩/기록(+gzip/zstd 스트리밍 압축)
+    - rotate_bytes(파일 크기) / rotate_sec(시간) 를 넘으면 다음 파일로: <stem>_part001.txt(.gz) ...
+    - 파트마다 header 라인을 앞에 쓴다. close() 는 남은 라인을 모두 기록하고 압축 프레임을 닫는다
+    """
+
+    def __init__(
+        self,
+        path: str,
+        header: Sequence[str] = (),
+        compress: str = "",
+        rotate_bytes: int = 0,
+        rotate_sec: float = 0.0,
+        flush_sec: float = 0.5,
+    ):
+        if compress not in SAVE_COMPRESS_EXT:
+            raise ValueError(f"알 수 없는 압축 형식: {compress}")
+        if compress == "zst" and zstandard is None:
+            raise RuntimeError(".zst 저장에는 zstandard 패키지가 필요합니다(pip install zstandard)")
+        self.base_path = path
+        self.header = list(header)
+        self.compress = compress
+        self.rotate_bytes = max(0, int(rotate_bytes))
+        self.rotate_sec = max(0.0, float(rotate_sec))
+        self.flush_sec = max(0.05, float(flush_sec))
+        self.part = 0
+        self.path = ""
+        self.paths: List[str] = []
+        # 통계(metrics): 기록 라인/바이트(압축 전), flush 횟수·누적·마지막 소요(ns), 파일 교체 횟수
+        self.lines = 0
+        self.bytes = 0
+        self.flushes = 0
+        self.flush_ns = 0
+        self.flush_last_ns = 0
+        self.rotations = 0
+        self.error: Optional[str] = None
+        self._dq: "collections.deque[str]" = collections.deque()
+        self._wake = threading.Event()
+        self._flushed = threading.Event()
+        self._stop = False
+        self._raw = None
+        self._fp = None
+        self._opened_at = 0.0
+        self._full = False
+        self._open_part()
+        self._thread = threading.Thread(target=self._run, name="atx-save-writer", daemon=True)
+        self._thread.start()
+        _LIVE_WRITERS.add(self)
+
+    @property
+    def pending(self) -> int:
+        return len(self._dq)
+
+    def _part_path(self) -> str:
+        p = self.base_path
+        ext = SAVE_COMPRESS_EXT[self.compress]
+        if ext and p.lower().endswith(ext):
+            p = p[: -len(ext)]
+        if self.rotate_bytes or self.rotate_sec:
+            stem, suffix = os.path.splitext(p)
+            p = f"{stem}_part{self.part:03d}{suffix}"
+        return p + ext
+
+    def _open_part(self):
+        self.part += 1
+        path = self._part_path()
+        raw = open(path, "ab")
+        if self.compress == "gz":
+            import gzip
+
+            fp = gzip.GzipFile(fileobj=raw, mode="ab")
+        elif self.compress == "zst":
+            fp = zstandard.ZstdCompressor(level=3).stream_writer(raw, closefd=False)
+        else:
+            fp = raw
+        self._raw, self._fp, self.path = raw, fp, path
+        self.paths.append(path)
+        self._opened_at = time.time()
+        if self.header:
+            hdr = list(self.header)
+            if self.part > 1:
+                hdr.insert(1, f"# part={self.part} prev={os.path.basename(self.paths[-2])}")
+            fp.write(("\n".join(hdr) + "\n\n").encode("utf-8", errors="ignore"))
+
+    def _close_part(self):
+        fp, raw = self._fp, self._raw
+        self._fp = self._raw = None
+        if fp is None:
+            return
+        try:
+            if fp is not raw:
+                fp.close()
+            raw.close()
+        except Exception as e:
+            self.error = str(e)
+
+    def _sync(self):
+        t0 = time.perf_counter_ns()
+        if self.compress == "gz":
+            self._fp.flush()  # Z_SYNC_FLUSH: 지금까지 쓴 라인은 풀어서 읽을 수 있게
+        elif self.compress == "zst":
+            self._fp.flush(zstandard.FLUSH_BLOCK)
+        self._raw.flush()
+        dt = time.perf_counter_ns() - t0
+        self.flushes += 1
+        self.flush_ns += dt
+        self.flush_last_ns = dt
+
+    def _write_batch(self, lines: List[str]):
+        # 교체는 다음 라인을 쓸 때 한다(끝에 헤더만 있는 빈 파트가 생기지 않도록)
+        if self._full or (self.rotate_sec and time.time() - self._opened_at >= self.rotate_sec):
+            self._rotate()
+        data = ("\n".join(lines) + "\n").encode("utf-8", errors="ignore")
+        self._fp.write(data)
+        self.bytes += len(data)
+        if self.rotate_bytes:
+            # 압축 중이면 압축기 안에 남은 양이 있으므로 내보낸 뒤 실제 파일 크기로 비교
+            if self._fp is not self._raw:
+                self._sync()
+            self._full = self._raw.tell() >= self.rotate_bytes
+
+    def _rotate(self):
+        self._full = False
+        self._close_part()
+        self.rotations += 1
+        self._open_part()
+
+    def _drain(self):
+        dq = self._dq
+        wrote = False
+        while dq:
+            # 한 번에 너무 크게 묶지 않는다(크기 기준 교체가 임계값 근처에서 일어나도록)
+            n = min(len(dq), 1024)
+            lines = [dq.popleft() for _ in range(n)]
+            if self._fp is None:
+                continue
+            try:
+                self._write_batch(lines)
+                wrote = True
+            except Exception as e:
+                self.error = str(e)
+        if wrote and self._fp is not None:
+            try:
+                self._sync()
+            except Exception as e:
+                self.error = str(e)
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_sec)
+            self._wake.clear()
+            stop = self._stop
+            self._drain()
+            self._flushed.set()
+            if stop:
+                break
+        self._drain()
+        self._close_part()
+
+    def write(self, line: str):
+        self._dq.append(line)
+        self.lines += 1
+
+    def flush(self, timeout: float = 2.0):
+        """쌓인 라인을 지금 기록하고(최대 timeout 초) 기다린다."""
+        if self._stop or not self._thread.is_alive():
+            return
+        self._flushed.clear()
+        self._wake.set()
+        self._flushed.wait(timeout)
+
+    def close(self, timeout: float = 5.0):
+        if self._stop:
+            self._thread.join(timeout)
+            return
+        self._stop = True
+        self._wake.set()
+        self._thread.join(timeout)
+        _LIVE_WRITERS.discard(self)
+
+
+def _close_all_writers():
+    for w in list(_LIVE_WRITERS):
+        try:
+            w.close()
+        except Exception:
+            pass
+
+
+def install_flush_handlers():
+    """
+    정상 종료(atexit) / 종료 시그널(SIGTERM, SIGHUP, Windows SIGBREAK, Ctrl+C)에서
+    저장 중인 LogWriter 를 모두 닫고(남은 라인 기록 + 압축 마무리) 원래 처리로 넘긴다.
+    메인 스레드에서 한 번만 호출.
+    """
+    global _FLUSH_HANDLERS_INSTALLED
+    if _FLUSH_HANDLERS_INSTALLED:
+        return
+    _FLUSH_HANDLERS_INSTALLED = True
+    atexit.register(_close_all_writers)
+    for name in ("SIGTERM", "SIGHUP", "SIGBREAK", "SIGINT"):
+        sig = getattr(signal, name, None)
+        if sig is None:
+            continue
+        try:
+            prev = signal.getsignal(sig)
+        except Exception:
+            continue
+
+        def _handler(signum, frame, _prev=prev):
+            _close_all_writers()
+            if callable(_prev):
+                _prev(signum, frame)
+                return
+            if _prev == signal.SIG_IGN:
+                return
+            signal.signal(signum, signal.SIG_DFL)
+            os.kill(os.getpid(), signum)
+
+        try:
+            signal.signal(sig, _handler)
+        except (ValueError, OSError):
+            pass
+
+
+class DeviceState:
+    """
+    기기(adb 시리얼) 1대의 표시 상태.
+    - 화면 크기 / 이벤트 / 마커 / 로그 저장 파일 / 수신 속도(lines/sec)
+    - 단일 입력(stdin, 재생)은 serial="" 인 기기 1대로 취급
+    """
+
+    def __init__(self, serial: str, screen: Optional[ScreenSize] = None, save_fp=None, save_path: Optional[str] = None):
+        self.serial = serial
+        self.screen = screen or ScreenSize(1080, 2400)
+        self.events: List[Event] = []
+        self.markers: Dict[int, MarkerState] = {}
+        # (변경) 저장 파일은 LogWriter(별도 기록 스레드). 기록 통계도 LogWriter 에 있다
+        self.save_fp: Optional[LogWriter] = save_fp
+        self.save_path = save_path
+        # (추가) .atxrec 동시 기록(--save-rec)
+        self.rec_writer: Optional[AtxRecWriter] = None
+        self.rec_last_flush = time.time()
+        # (추가) 누적 히트맵(numpy 있을 때만). 격자가 8MB 라 히트맵을 처음 켤 때 만든다(VisualizerApp._ensure_heat)
+        self.heat: Optional[HeatmapGrid] = None
+        # (추가) 빨리감기 중 한 프레임 안에 나타났다 사라질 이벤트 묶음.
+        # (cat, 0=tap/1=swipe, idx, 격자칸...) → [개수, x합, y합, x2합, y2합]. 프레임마다 새로 시작한다.
+        self.agg: Dict[tuple, List[float]] = {}
+        # (추가) 호버용 공간 인덱스(마커/이벤트 좌표)
+        self.spatial = SpatialGrid()
+        # 수신 속도 카운터(tick에서 1초마다 갱신)
+        self.lines_total = 0
+        self.rate = 0.0
+        self._rate_t0 = time.time()
+        self._rate_n0 = 0
+
+    @property
+    def title(self) -> str:
+        return self.serial or "device"
+
+    def update_rate(self, now: float):
+        dt = now - self._rate_t0
+        if dt >= 1.0:
+            self.rate = (self.lines_total - self._rate_n0) / dt
+            self._rate_t0 = now
+            self._rate_n0 = self.lines_total
+
+
+class IngestRing:
+    """
+    리더 스레드 → UI(tick) 사이의 고정 크기 링 버퍼(queue.Queue 대신 사용).
+    - 가득 차면 가장 오래된 항목을 버린다(표시용 드롭). 버린 항목은 on_drop 으로 넘겨
+      로그 저장/스냅샷은 빠짐없이 유지한다.
+    - put / get_nowait / qsize 는 queue.Queue 와 같은 모양이라 리더 코드는 그대로.
+    """
+
+    def __init__(self, maxlen: int = 20_000, on_drop=None):
+        self.maxlen = max(1, int(maxlen))
+        self.on_drop = on_drop
+        self.dropped = 0
+        self._dq: "collections.deque" = collections.deque()
+        self._lock = threading.Lock()
+        self._cv = threading.Condition(self._lock)
+
+    def put(self, item):
+        old = None
+        with self._lock:
+            if len(self._dq) >= self.maxlen:
+                old = self._dq.popleft()
+                self.dropped += 1
+            self._dq.append(item)
+            self._cv.notify()
+        if old is not None and self.on_drop is not None:
+            try:
+                self.on_drop(old)
+            except Exception:
+                pass
+
+    def get_nowait(self):
+        with self._lock:
+            if not self._dq:
+                raise queue.Empty
+            return self._dq.popleft()
+
+    def get_many(self, max_n: int, timeout: float) -> list:
+        """최대 max_n 개를 한 번에 꺼낸다. 비어 있으면 timeout 동안 기다린다(없으면 [])."""
+        with self._lock:
+            if not self._dq:
+                self._cv.wait(timeout)
+            n = min(int(max_n), len(self._dq))
+            return [self._dq.popleft() for _ in range(n)]
 
+    def qsize(self) -> int:
+        return len(self._dq)
 
-def parse_size_from_line(line: str) -> Optional[ScreenSize]:
-    for rx in (RE_START_PROJ, RE_SIZE_CHANGED, RE_RESIZED):
-        m = rx.search(line)
-        if m:
-            w = int(m.group(1))
-            h = int(m.group(2))
-            return ScreenSize(w=w, h=h).clamp()
-    return None
 
+class SnapshotHistory:
+    """
+    (스냅샷 저장용) 원본 라인 기록: 최근 tail_lines 줄만 메모리에 두고 나머지는 디스크 세그먼트로 넘긴다.
+    - 꼬리가 가득 차면 통째로 seg_NNNNNN.txt 하나로 기록(세그먼트는 이후 바뀌지 않음) → 메모리는 일정
+    - save_to 는 세그먼트 파일을 그대로 이어 붙이고 꼬리만 새로 쓴다(버리는 라인 없음)
+    - 임시 폴더를 만들 수 없거나 쓰기에 실패하면 예전처럼 앞부분을 버리고 dropped 로 센다
+    """
 
-def parse_point_token(tok: str) -> Optional[Tuple[int, int]]:
-    tok = tok.strip()
-    if tok.startswith("(") and tok.endswith(")"):
-        inner = tok[1:-1]
-        parts = inner.split(",")
-        if len(parts) == 2:
+    def __init__(self, tail_lines: int = 20_000, base_dir: Optional[str] = None):
+        self.tail_lines = max(100, int(tail_lines))
+        self.base_dir = base_dir
+        self.lines = 0
+        self.dropped = 0
+        self.disk_bytes = 0
+        self.segments: List[Tuple[str, int]] = []  # (경로, 라인수)
+        self._tail: List[str] = []
+        self._lock = threading.Lock()
+        self._tmp: Optional[tempfile.TemporaryDirectory] = None
+        self._spill_ok = True
+
+    def __len__(self) -> int:
+        return self.lines
+
+    def append(self, line: str):
+        with self._lock:
+            self._tail.append(line)
+            self.lines += 1
+            if len(self._tail) >= self.tail_lines:
+                self._spill()
+
+    def _spill(self):
+        lines = self._tail
+        if self._spill_ok:
             try:
-                return int(parts[0].strip()), int(parts[1].strip())
+                if self._tmp is None:
+                    if self.base_dir:
+                        Path(self.base_dir).mkdir(parents=True, exist_ok=True)
+                    self._tmp = tempfile.TemporaryDirectory(prefix="atx_hist_", dir=self.base_dir)
+                path = os.path.join(self._tmp.name, f"seg_{len(self.segments):06d}.txt")
+                data = ("\n".join(lines) + "\n").encode("utf-8", errors="ignore")
+                with open(path, "wb") as f:
+                    f.write(data)
+                self.segments.append((path, len(lines)))
+                self.disk_bytes += len(data)
+                self._tail = []
+                return
+            except Exception as e:
+                self._spill_ok = False
+                print(f"[WARN] 스냅샷 기록을 디스크로 넘길 수 없습니다(앞부분을 버립니다): err={e}", file=sys.stderr)
+        # 디스크를 못 쓰면 절반만 남기고 버린다(매 줄 del 하지 않도록 한 번에)
+        keep = self.tail_lines // 2
+        self.dropped += len(lines) - keep
+        self._tail = lines[-keep:]
+
+    def save_to(self, fp) -> int:
+        """(바이너리 파일) 지금까지의 전체 라인을 기록. 쓴 라인 수 반환."""
+        with self._lock:
+            segs = list(self.segments)
+            tail = list(self._tail)
+        n = 0
+        for path, cnt in segs:
+            with open(path, "rb") as src:
+                shutil.copyfileobj(src, fp, 1 << 20)
+            n += cnt
+        if tail:
+            fp.write(("\n".join(tail) + "\n").encode("utf-8", errors="ignore"))
+            n += len(tail)
+        return n
+
+    def close(self):
+        with self._lock:
+            tmp, self._tmp = self._tmp, None
+            self.segments = []
+            self._tail = []
+        if tmp is not None:
+            try:
+                tmp.cleanup()
             except Exception:
-                return None
-    m = RE_POINT.search(tok)
-    if m:
-        return int(m.group(1)), int(m.group(2))
-    return None
+                pass
 
 
-def parse_event_from_line(line: str) -> Optional[Event]:
-    cat = classify_cat(line)
-    col = cat_color(cat)
-    # swipe(from,to)
-    m = RE_SWIPE_FROM_TO.search(line)
-    if m:
-        fx, fy, tx, ty = map(int, m.groups())
-        return Event(ts=time.time(), kind="swipe", p0=(fx, fy), p1=(tx, ty), color=col, label="swipe", cat=cat)
+class ParseWorker(threading.Thread):
+    """
+    (백그라운드 파싱 단계) 입력 링의 원본 라인을 꺼내
+    저장(on_line) + classify_line 까지 끝낸 뒤 묶음(batch)으로 out 링에 넘긴다.
+    - batch = ({serial: 라인수}, [(serial, line, ParsedLine), ...])  (분류 안 된 라인은 개수만)
+    - 입력 항목이 (serial, line, ParsedLine|None) 이면 이미 파싱된 것으로 보고 classify_line 을 건너뛴다.
+    - UI(tick)는 이미 파싱된 레코드만 합치고 그린다.
+    """
 
-    m = RE_SWIPE_CALL.search(line)
-    if m:
-        fx, fy, tx, ty = map(int, m.groups())
-        return Event(ts=time.time(), kind="swipe", p0=(fx, fy), p1=(tx, ty), color=col, label="swipe", cat=cat)
+    def __init__(self, src: IngestRing, on_line=None, batch_max: int = 512, out_max_batches: int = 64):
+        super().__init__(name="atx-parse", daemon=True)
+        self.src = src
+        self.on_line = on_line
+        self.batch_max = max(1, int(batch_max))
+        self.out = IngestRing(maxlen=out_max_batches, on_drop=self._count_dropped)
+        self.dropped_lines = 0
+        self.lines = 0
+        # 누적 시간: classify_line 만(parse_ns) / 저장 콜백(persist_ns)
+        self.parse_ns = 0
+        self.persist_ns = 0
+        self._stop_ev = threading.Event()
+
+    def _count_dropped(self, batch):
+        # 표시용 드롭(저장은 이미 끝난 상태)
+        self.dropped_lines += sum(batch[0].values())
+
+    def stop(self):
+        self._stop_ev.set()
 
-    # swipe(chain) from=Point(...) to=Point(...)
-    m = RE_FROM_POINT_TO_POINT.search(line)
-    if m:
-        p0 = parse_point_token(m.group(1))
-        p1 = parse_point_token(m.group(2))
-        if p0 and p1:
-            return Event(ts=time.time(), kind="swipe", p0=p0, p1=p1, color=col, label="swipe", cat=cat)
+    def run(self):
+        on_line = self.on_line
+        while not self._stop_ev.is_set():
+            items = self.src.get_many(self.batch_max, timeout=0.05)
+            if not items:
+                continue
+            counts: Dict[str, int] = {}
+            out: List[Tuple[str, str, ParsedLine]] = []
+            t0 = time.perf_counter_ns()
+            # (serial, line, rec) 는 이미 파싱된 레코드(--connect 수집기 입력)
+            recs = [it[2] if len(it) > 2 else classify_line(it[1]) for it in items]
+            t1 = time.perf_counter_ns()
+            for (serial, line, *_rest), rec in zip(items, recs):
+                counts[serial] = counts.get(serial, 0) + 1
+                if on_line is not None:
+                    on_line(serial, line, rec)
+                if rec is not None:
+                    out.append((serial, line, rec))
+            self.parse_ns += t1 - t0
+            self.persist_ns += time.perf_counter_ns() - t1
+            self.lines += len(items)
+            self.out.put((counts, out))
+
+
+class MetricsServer:
+    """
+    (선택) --metrics-port: localhost 에서 OpenMetrics 텍스트를 내보내는 HTTP 스레드.
+    - 값은 UI(tick)가 1초마다 모아 만든 텍스트를 통째로 바꿔 끼우고, HTTP 스레드는 마지막 텍스트만 읽는다
+      (카운터 자체는 각 스레드의 int 필드라 잠금 없음).
+    """
 
-    # tap/click
-    m = RE_TAP1.search(line) or RE_CLICK1.search(line)
-    if m:
-        x, y = int(m.group(1)), int(m.group(2))
-        return Event(ts=time.time(), kind="tap", p0=(x, y), p1=None, color=col, label="tap", cat=cat)
+    CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
 
-    return None
+    def __init__(self, port: int, host: str = "127.0.0.1"):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
+        owner = self
 
-def try_get_device_size(serial: Optional[str]) -> Optional[ScreenSize]:
-    # `adb shell wm size` 예: "Physical size: 1080x2400"
-    cmd = ["adb"]
-    if serial:
-        cmd += ["-s", serial]
-    cmd += ["shell", "wm", "size"]
-    try:
-        out = subprocess.check_output(cmd, stderr=subprocess.STDOUT, text=True, encoding="utf-8", errors="ignore")
-    except Exception:
-        return None
-    m = re.search(r"Physical size:\s*(\d+)\s*x\s*(\d+)", out)
-    if not m:
-        m = re.search(r"Override size:\s*(\d+)\s*x\s*(\d+)", out)
-    if m:
-        return ScreenSize(w=int(m.group(1)), h=int(m.group(2))).clamp()
-    return None
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = owner.body
+                self.send_response(200)
+                self.send_header("Content-Type", owner.CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *_a):
+                pass
 
+        self.body = b"# EOF\n"
+        self.httpd = ThreadingHTTPServer((host, int(port)), _Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="atx-metrics", daemon=True)
 
-def _parse_logcat_time_seconds(line: str) -> Optional[float]:
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        try:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+        except Exception:
+            pass
+
+    def update(self, families: List[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]):
+        self.body = render_openmetrics(families).encode("utf-8")
+
+
+def _om_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for k, v in labels.items():
+        v = str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{k}="{v}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def render_openmetrics(families: List[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]) -> str:
+    """(이름, counter|gauge, 설명, [(라벨, 값)]) 목록 → OpenMetrics 텍스트(counter 샘플은 _total)."""
+    out: List[str] = []
+    for name, typ, help_text, samples in families:
+        out.append(f"# TYPE {name} {typ}")
+        out.append(f"# HELP {name} {help_text}")
+        suffix = "_total" if typ == "counter" else ""
+        for labels, value in samples:
+            v = float(value)
+            out.append(f"{name}{suffix}{_om_labels(labels)} {int(v) if v.is_integer() else repr(v)}")
+    out.append("# EOF")
+    return "\n".join(out) + "\n"
+
+
+class TickProfiler:
     """
-    adb logcat -v time 포맷의 시간을 '하루 내 초'로 변환(연/월 경계는 고려하지 않음).
-    재생용 상대시간 계산에만 사용.
+    (--profile) tick 단계별 소요 시간(perf_counter_ns)을 고정 크기 링 버퍼에 기록.
+    - 단계: rebuild / feed / markers / ingest / prune / stats / redraw, 합계(total), 직전 tick 시작과의 간격(gap)
+    - gap 이 total 보다 훨씬 크면 tick 밖(Tk 이벤트 처리/GC 등)에서 멈춘 것
     """
-    m = RE_LOGCAT_TIME.search(line)
-    if not m:
-        return None
-    # month/day는 무시하고, HH:MM:SS.mmm만 사용(동일 로그 파일 내 상대시간에는 충분)
-    hh = int(m.group(3))
-    mm = int(m.group(4))
-    ss = int(m.group(5))
-    ms = int(m.group(6))
-    return hh * 3600.0 + mm * 60.0 + ss + (ms / 1000.0)
 
-
-def load_replay_lines(path: str) -> List[Tuple[float, str]]:
+    PHASES = ("rebuild", "feed", "markers", "ingest", "prune", "stats", "redraw")
+
+    def __init__(self, size: int = 36_000):
+        self.size = max(16, int(size))
+        self.n = 0
+        cols = self.PHASES + ("total", "gap")
+        self.cols: Dict[str, "array"] = {c: array("q", [0]) * self.size for c in cols}
+        self.t_wall = array("d", [0.0]) * self.size
+        self.lines = array("q", [0]) * self.size
+        self._cur = [0] * len(self.PHASES)
+        self._t0 = 0
+        self._t = 0
+        self._prev_start = 0
+
+    def begin(self):
+        now = time.perf_counter_ns()
+        self._gap = now - self._prev_start if self._prev_start else 0
+        self._prev_start = now
+        self._t0 = self._t = now
+        for i in range(len(self._cur)):
+            self._cur[i] = 0
+
+    def mark(self, phase: int):
+        now = time.perf_counter_ns()
+        self._cur[phase] += now - self._t
+        self._t = now
+
+    def end(self, lines: int):
+        k = self.n % self.size
+        for i, name in enumerate(self.PHASES):
+            self.cols[name][k] = self._cur[i]
+        self.cols["total"][k] = self._t - self._t0
+        self.cols["gap"][k] = self._gap
+        self.t_wall[k] = time.time()
+        self.lines[k] = int(lines)
+        self.n += 1
+
+    def recent(self, col: str, count: int) -> List[int]:
+        """가장 최근 count 개(오래된 것부터)."""
+        count = min(count, self.n, self.size)
+        a = self.cols[col]
+        return [a[(self.n - count + i) % self.size] for i in range(count)]
+
+    def write_csv(self, path: str) -> int:
+        """링에 남은 tick 을 CSV 로(ms 단위). 기록한 행 수 반환."""
+        count = min(self.n, self.size)
+        start = self.n - count
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(["tick", "time"] + [f"{c}_ms" for c in self.PHASES] + ["total_ms", "gap_ms", "lines"])
+            for j in range(start, self.n):
+                k = j % self.size
+                w.writerow(
+                    [j, f"{self.t_wall[k]:.3f}"]
+                    + [f"{self.cols[c][k] / 1e6:.3f}" for c in self.PHASES]
+                    + [f"{self.cols['total'][k] / 1e6:.3f}", f"{self.cols['gap'][k] / 1e6:.3f}", self.lines[k]]
+                )
+        return count
+
+
+class CanvasItemPool:
     """
-    저장된 로그 파일을 읽어서 (상대초, 라인) 리스트로 만든다.
-    - '# ...' 헤더 라인은 무시
-    - logcat 시간 파싱 실패 라인은 고정 간격(기본 30ms)으로 증가시켜 "재생"이 보이게 한다.
+    캔버스 아이템 재사용 풀(retained mode).
+    그리는 대상(Event/MarkerState/빨리감기 묶음 칸)마다 key 로 아이템을 붙여 두고, begin() → oval()/line()/text() 에서
+    좌표/옵션이 지난 프레임과 다를 때만 coords/itemconfigure 한다(그대로인 아이템은 건드리지 않음).
+    end() 에서 이번 프레임에 안 나온 key(만료된 이벤트/마커)의 아이템만 숨겨 종류별 여유분으로 돌리고, 새 key 에 다시 쓴다.
+    화면 평행이동(canvas.move)은 moved() 로 알려 주면 다음 프레임에 다시 좌표를 넣지 않는다.
     """
-    p = Path(path)
-    if not p.exists():
-        return []
-    raw_lines = p.read_text(encoding="utf-8", errors="ignore").splitlines()
-    out: List[Tuple[float, str]] = []
-    t0_abs: Optional[float] = None
-    last_rel = 0.0
-    had_any_ts = False
-    fallback_step = 0.030  # 30ms (시간 없는 라인용)
-    max_gap = 0.25  # (중요) 타임스탬프가 있어도 긴 공백은 압축해서 "재생이 안 되는 느낌" 방지
-    for ln in raw_lines:
-        if not ln:
-            continue
-        if ln.startswith("#"):
-            continue
-        t_abs = _parse_logcat_time_seconds(ln)
-        if t_abs is None:
-            # 시간 없는 라인은 조금씩 증가(안 보이는 "즉시 끝" 방지)
-            last_rel = last_rel + fallback_step
-            out.append((last_rel, ln))
-            continue
-        had_any_ts = True
-        if t0_abs is None:
-            t0_abs = t_abs
-        rel_raw = max(0.0, t_abs - (t0_abs or t_abs))
-        # (압축) 이전 rel 대비 너무 큰 점프는 제한
-        if rel_raw > last_rel + max_gap:
-            rel = last_rel + max_gap
+
+    def __init__(self, canvas, tags: Tuple[str, ...] = ("world",)):
+        self.canvas = canvas
+        self.tags = tags
+        self._by_key: Dict[tuple, int] = {}
+        self._seen: Dict[tuple, int] = {}
+        self._kind: Dict[int, str] = {}
+        self._coords: Dict[int, tuple] = {}
+        self._opts: Dict[int, tuple] = {}
+        self._free: Dict[str, List[int]] = {}
+
+    def begin(self):
+        self._seen = {}
+
+    def _get(self, key: tuple, kind: str, coords: Tuple[float, ...], opts: dict) -> int:
+        okey = tuple(opts.items())
+        iid = self._by_key.get(key)
+        if iid is None or self._kind[iid] != kind:
+            free = self._free.get(kind)
+            if free:
+                iid = free.pop()
+                self.canvas.coords(iid, *coords)
+                self.canvas.itemconfigure(iid, state="normal", **opts)
+            else:
+                iid = getattr(self.canvas, "create_" + kind)(*coords, tags=self.tags, **opts)
+                self._kind[iid] = kind
+            self._coords[iid] = coords
+            self._opts[iid] = okey
         else:
-            rel = rel_raw
-        last_rel = rel
-        out.append((rel, ln))
-    # 전부 fallback만인 경우, 너무 길게 느려지지 않게 약간 압축(라인 수가 매우 많으면 step 축소)
-    if not had_any_ts and len(out) > 8000:
-        # 8천줄 이상이면 step을 줄여 적당히 진행되게
-        step2 = 0.010
-        cur = 0.0
-        out2: List[Tuple[float, str]] = []
-        for _t, line in out:
-            cur += step2
-            out2.append((cur, line))
-        out = out2
-    return out
+            old = self._coords[iid]
+            # moved() 로 옮긴 좌표는 부동소수 끝자리만 다를 수 있다
+            if old != coords and any(abs(a - b) > 0.01 for a, b in zip(old, coords)):
+                self.canvas.coords(iid, *coords)
+                self._coords[iid] = coords
+            if self._opts[iid] != okey:
+                self.canvas.itemconfigure(iid, **opts)
+                self._opts[iid] = okey
+        self._seen[key] = iid
+        return iid
+
+    def oval(self, key: tuple, x0: float, y0: float, x1: float, y1: float, **opts) -> int:
+        return self._get(key, "oval", (x0, y0, x1, y1), opts)
+
+    def line(self, key: tuple, x0: float, y0: float, x1: float, y1: float, **opts) -> int:
+        return self._get(key, "line", (x0, y0, x1, y1), opts)
+
+    def text(self, key: tuple, x: float, y: float, **opts) -> int:
+        return self._get(key, "text", (x, y), opts)
+
+    def end(self):
+        seen = self._seen
+        for key, iid in self._by_key.items():
+            if seen.get(key) != iid:
+                self.canvas.itemconfigure(iid, state="hidden")
+                self._free.setdefault(self._kind[iid], []).append(iid)
+        self._by_key = seen
+
+    def moved(self, dx: float, dy: float):
+        """canvas.move(tags, dx, dy) 로 옮긴 만큼 기억한 좌표도 옮긴다."""
+        for iid in self._by_key.values():
+            c = self._coords[iid]
+            self._coords[iid] = tuple(v + (dy if i & 1 else dx) for i, v in enumerate(c))
 
+    @property
+    def live(self) -> int:
+        """이번 프레임에 보이는 아이템 수."""
+        return len(self._by_key)
 
-@dataclass
-class MarkerState:
-    idx: int
-    kind: str
-    cat: int
-    x: int
-    y: int
-    ts: float
+    @property
+    def allocated(self) -> int:
+        return len(self._kind)
 
 
 class VisualizerApp:
-    def __init__(self, q: "queue.Queue[str]", initial_size: Optional[ScreenSize], save_fp=None, save_path: Optional[str] = None):
+    def __init__(
+        self,
+        q: "queue.Queue[Tuple[str, str]]",
+        initial_size: Optional[ScreenSize],
+        save_fp=None,
+        save_path: Optional[str] = None,
+        devices: Optional[List[DeviceState]] = None,
+        clock: Optional[Callable[[], float]] = None,
+    ):
+        _require_tk()
         self.q = q
         self.root = tk.Tk()
         self.root.title("ATX 마커 클릭/스와이프 시각화")
 
-        self.screen = initial_size or ScreenSize(1080, 2400)
-        self.events: List[Event] = []
+        # (추가) 여러 기기 동시 표시: 시리얼별 상태, 첫 번째가 기본(재생/스냅샷 헤더용)
+        if not devices:
+            devices = [DeviceState("", initial_size, save_fp=save_fp, save_path=save_path)]
+        self.devices: Dict[str, DeviceState] = {d.serial: d for d in devices}
+        self.dev: DeviceState = devices[0]
+        # (추가) 표시 시계(TTL/정리/그리기 공통). clock 을 주면 라이브 모드에서 그 값을 쓴다(헤드리스/테스트용)
+        self.clock = clock
         self.max_events = 600
         self.keep_seconds = 12.0
 
-        # (추가) 수신 로그 저장
-        self.save_fp = save_fp
-        self.save_path = save_path
-        self._save_last_flush = time.time()
-        self._save_lines_since_flush = 0
+        # (추가) 입력 드레인 시간 예산: tick 1회에 이 시간(ms)만큼만 큐를 비우고 나머지는 다음 tick으로
+        self.tick_budget_ms = 15.0
+        self._ingest_lag = 0
+        # 저장/스냅샷은 UI 스레드와 링 드롭(리더 스레드) 양쪽에서 호출될 수 있음
+        self._io_lock = threading.Lock()
+        # (추가) 라이브 입력은 백그라운드 파싱 스레드를 거친다(저장 + 정규식은 Tk 스레드 밖에서)
+        self._parse_worker: Optional[ParseWorker] = None
+        self._merged_lines = 0
+        if isinstance(q, IngestRing):
+            q.on_drop = self._persist_dropped
+            self._parse_worker = ParseWorker(q, on_line=self._persist_serial_line)
+            self._parse_worker.start()
 
         # (추가) "현시점까지" 스냅샷 저장용 버퍼(원본 라인)
-        self._buf_lines: List[str] = []
-        self._buf_keep_max = 250_000  # 너무 길어질 때 메모리 보호(초과분은 앞에서 버림)
-        self._buf_dropped = 0
+        # (변경) 최근 라인만 메모리에 두고 나머지는 임시 폴더 세그먼트로 넘겨 전체를 보관
+        self.history = SnapshotHistory()
 
         # (추가) 실시간 마커 표시(ATX_STREAM MARKER)
-        self.markers: Dict[int, MarkerState] = {}
         self.show_markers = True
         # (요청) 마커는 표시 후 300ms 뒤 자동 삭제
         self.marker_ttl_sec = 0.300
@@ -337,6 +4405,34 @@ class VisualizerApp:
 
         self._need_redraw = True
         self._last_canvas_size = (0, 0)
+        # (추가) retained-mode 그리기: 정적 레이어(범례/폰 영역/타일) 아이템 + 이벤트/마커 아이템 풀
+        self._pool: Optional[CanvasItemPool] = None
+        self._legend_drawn = False
+        self._dev_items: Dict[str, Dict[str, int]] = {}
+        # (추가) 누적 히트맵 표시(폰 영역 뒤에 이미지 1장). serial -> (캐시 키, PhotoImage, 만든 시각)
+        self.heatmap_on = False
+        self._heat_photos: Dict[str, tuple] = {}
+        # (추가) --profile: tick 단계별 시간 + 화면 오버레이 + 종료 시 CSV, F9 로 N초 cProfile
+        self.profiler: Optional[TickProfiler] = None
+        self.profile_out = ""
+        self.profile_seconds = 10.0
+        self._overlay_items: Optional[Dict[str, int]] = None
+        self._cprof = None
+        self._cprof_until = 0.0
+        # (추가) --metrics-port: tick 에서 1초마다 모아 MetricsServer 에 넘김
+        self.metrics: Optional[MetricsServer] = None
+        self._metrics_t = 0.0
+        self._redraws = 0
+        self._redraw_ns = 0
+        self._redraw_last_ns = 0
+        self._redraw_items = 0
+        # (추가) 마커 idx별 실행 타이밍(설정 delayMs 대비 실제 간격). 표 창은 열려 있을 때만 1초마다 갱신.
+        self.timing = MarkerTiming()
+        # (추가) --db-live: 수신 라인을 세션 카탈로그(SQLite)에도 적재
+        self.catalog: Optional[CatalogWriter] = None
+        self._timing_win = None
+        self._timing_tree = None
+        self._timing_shown = (-1, 0.0)
 
         self.top = tk.Frame(self.root)
         self.top.pack(side=tk.TOP, fill=tk.X)
@@ -365,22 +4461,8 @@ class VisualizerApp:
         self.btn_restart.pack(side=tk.RIGHT, padx=6, pady=6)
 
         self.speed_var = tk.StringVar(value="1x")
-        # (변경) 배속은 "느리게" 의미. 1~10x(1씩)
-        self.speed_menu = tk.OptionMenu(
-            self.top,
-            self.speed_var,
-            "1x",
-            "2x",
-            "3x",
-            "4x",
-            "5x",
-            "6x",
-            "7x",
-            "8x",
-            "9x",
-            "10x",
-            command=self.on_speed_change,
-        )
+        # (변경) "Nx" 는 N배 느리게(1~10x), "ffNx" 는 N배 빠르게(2~100x), "max" 는 최대 속도
+        self.speed_menu = tk.OptionMenu(self.top, self.speed_var, *REPLAY_SPEEDS, command=self.on_speed_change)
         self.speed_menu.pack(side=tk.RIGHT, padx=6, pady=6)
 
         # 줌(배율) UI
@@ -401,6 +4483,43 @@ class VisualizerApp:
         self.btn_fit = tk.Button(self.top, text="FIT", command=self.reset_view)
         self.btn_fit.pack(side=tk.RIGHT, padx=6, pady=6)
 
+        # (추가) 누적 히트맵 on/off + 저장(PNG/NPY)
+        self.btn_heat_save = tk.Button(self.top, text="히트맵저장", command=self.save_heatmap_dialog)
+        self.btn_heat_save.pack(side=tk.RIGHT, padx=6, pady=6)
+        self.btn_heat = tk.Button(self.top, text="히트맵", command=self.toggle_heatmap)
+        self.btn_heat.pack(side=tk.RIGHT, padx=6, pady=6)
+
+        # (추가) 마커 타이밍 표
+        self.btn_timing = tk.Button(self.top, text="타이밍", command=self.open_timing_panel)
+        self.btn_timing.pack(side=tk.RIGHT, padx=6, pady=6)
+
+        # (추가) 필터 바: 범례 클릭(카테고리) / idx 목록·구간 / 종류 / 캔버스 영역(Shift+드래그 또는 `영역`)
+        self.filter = EventFilter()
+        self.fbar = tk.Frame(self.root)
+        self.fbar.pack(side=tk.TOP, fill=tk.X)
+        tk.Label(self.fbar, text="필터 idx").pack(side=tk.LEFT, padx=(8, 2), pady=2)
+        self.filter_idx_entry = tk.Entry(self.fbar, width=18)
+        self.filter_idx_entry.pack(side=tk.LEFT, padx=2, pady=2)
+        self.filter_idx_entry.bind("<Return>", lambda _e: self.apply_filter_bar())
+        self.filter_kind_var = tk.StringVar(value="전체")
+        self.filter_kind_menu = tk.OptionMenu(
+            self.fbar, self.filter_kind_var, "전체", *FILTER_KINDS, command=lambda _v: self.apply_filter_bar()
+        )
+        self.filter_kind_menu.pack(side=tk.LEFT, padx=2, pady=2)
+        tk.Button(self.fbar, text="적용", command=self.apply_filter_bar).pack(side=tk.LEFT, padx=2, pady=2)
+        self.btn_region = tk.Button(self.fbar, text="영역", command=self.toggle_region_mode)
+        self.btn_region.pack(side=tk.LEFT, padx=2, pady=2)
+        tk.Button(self.fbar, text="필터해제", command=self.clear_filter).pack(side=tk.LEFT, padx=2, pady=2)
+        tk.Button(self.fbar, text="◀", command=lambda: self.jump_filter_match(-1)).pack(side=tk.LEFT, padx=(8, 0), pady=2)
+        tk.Button(self.fbar, text="▶", command=lambda: self.jump_filter_match(1)).pack(side=tk.LEFT, padx=(0, 4), pady=2)
+        self.filter_lbl = tk.Label(self.fbar, text="", anchor="w")
+        self.filter_lbl.pack(side=tk.LEFT, padx=6, pady=2)
+        self._region_mode = False
+        self._filter_lbl_t = 0.0
+        self._filter_jump: Optional[Tuple[int, float]] = None
+        self._region_drag: Optional[Tuple[float, float]] = None
+        self._region_rubber: Optional[int] = None
+
         self.canvas = tk.Canvas(self.root, bg="#0b1220", highlightthickness=0)
         self.canvas.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
 
@@ -430,6 +4549,14 @@ class VisualizerApp:
         except Exception:
             pass
         self.replay_seek.pack(side=tk.RIGHT, fill=tk.X, expand=True, padx=8, pady=6)
+        # (추가) 재생 타임라인 개요(슬라이더 위 누적 막대). 재생 파일을 열면 표시, 클릭하면 그 구간의 스파이크로 이동
+        self.overview_canvas = tk.Canvas(self.root, height=34, bg="#0b1220", highlightthickness=0)
+        self.overview_canvas.bind("<ButtonRelease-1>", self.on_overview_click)
+        self.overview_canvas.bind("<Configure>", lambda _e: self._refresh_overview())
+        self._overview_shown = False
+        self._overview_key = None
+        self._overview_img = None
+        self._overview_items: Optional[Tuple[int, int]] = None
 
         self.root.bind("<Configure>", self.on_resize)
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
@@ -442,48 +4569,256 @@ class VisualizerApp:
         self.canvas.bind("<ButtonPress-1>", self.on_pan_down)
         self.canvas.bind("<B1-Motion>", self.on_pan_move)
         self.canvas.bind("<ButtonRelease-1>", self.on_pan_up)
+        # (추가) 호버: 가장 가까운 마커/이벤트의 메타데이터 툴팁
+        self._hover_xy: Optional[Tuple[float, float]] = None
+        self._tip_items: Optional[Tuple[int, int]] = None
+        self._tip_key = None
+        self.canvas.bind("<Motion>", self.on_hover)
+        self.canvas.bind("<Leave>", self.on_hover_leave)
 
         # 재생 상태
         self.replay_path: Optional[str] = None
-        self.replay_lines: List[Tuple[float, str]] = []
+        self.replay_lines: Sequence[Tuple[float, str]] = []
+        self._replay_index: Optional[ReplayIndex] = None
         self.replay_pos: int = 0
         self.replay_running: bool = False
-        # (변경) 배속은 "느리게" 의미로 사용: 2x = 2배 느리게(시간을 2배로 늘림)
-        self.replay_slow: float = 1.0
+        # (변경) 재생 배율 = 실제 1초에 진행할 로그 초(2x 느리게 = 0.5, ff20x = 20, max = inf)
+        self.replay_rate: float = 1.0
+        # (추가) 긴 공백 압축 기준(초). 크게 하면 실제 로그 간격대로 재생하고 그보다 긴 공백만 건너뛴다
+        self.replay_max_gap: float = REPLAY_MAX_GAP_SEC
+        # (추가) 이번 프레임에서 이벤트를 묶어 그리는지(빨리감기) + 직전 공급 시각
+        self._coalesce = False
+        self._last_feed_real = 0.0
         self.replay_start_real: float = 0.0
         self.replay_start_sim: float = 0.0
         self.replay_total_sim: float = 0.0
+        self._replay_total_final = True
         # seek/rebuild 상태(슬라이더로 시간 점프 시)
         self._rebuild_active = False
         self._rebuild_target_pos = 0
         self._rebuild_pos = 0
         self._rebuild_target_sec = 0.0
         self._rebuild_resume_after = False
+        self._rebuild_skip_until = 0
+        self._rebuild_heat = False
+
+    # 기본 기기 상태(단일 기기일 때의 기존 속성 이름 유지)
+    @property
+    def screen(self) -> ScreenSize:
+        return self.dev.screen
+
+    @screen.setter
+    def screen(self, v: ScreenSize):
+        self.dev.screen = v
+
+    @property
+    def events(self) -> List[Event]:
+        return self.dev.events
+
+    @property
+    def markers(self) -> Dict[int, MarkerState]:
+        return self.dev.markers
+
+    @property
+    def save_fp(self):
+        return self.dev.save_fp
+
+    @property
+    def save_path(self) -> Optional[str]:
+        return self.dev.save_path
+
+    def _dev_for(self, serial: str) -> DeviceState:
+        d = self.devices.get(serial)
+        if d is None:
+            d = DeviceState(serial, ScreenSize(self.dev.screen.w, self.dev.screen.h))
+            self.devices[serial] = d
+            if self.heatmap_on:
+                self._ensure_heat(d)
+            self._need_redraw = True
+        return d
 
     def clear(self):
-        self.events.clear()
+        for d in self.devices.values():
+            d.events.clear()
+            d.agg.clear()
+            self._reindex_spatial(d)
+            if d.heat is not None:
+                d.heat.clear()
         self._need_redraw = True
 
-    def clear_markers(self):
-        self.markers.clear()
+    def toggle_heatmap(self):
+        if np is None:
+            print("[WARN] 히트맵에는 numpy 가 필요합니다(pip install numpy)", file=sys.stderr)
+            return
+        self.heatmap_on = not self.heatmap_on
+        if self.heatmap_on:
+            for d in self.devices.values():
+                self._ensure_heat(d)
+        try:
+            self.btn_heat.config(relief=tk.SUNKEN if self.heatmap_on else tk.RAISED)
+        except Exception:
+            pass
         self._need_redraw = True
 
-    def _prune_markers(self):
-        if not self.markers:
+    def _ensure_heat(self, d: DeviceState):
+        """
+        히트맵 격자를 처음 켤 때 만든다. 라이브는 필터용 점 목록에 상한(HEATMAP_LIVE_POINTS)을 둔다.
+        재생 중이면 인덱스로 지금 위치까지 채우고, 인덱싱이 아직이면 지금부터 누적한다.
+        """
+        if d.heat is not None or np is None:
+            return
+        d.heat = HeatmapGrid(max_points=None if self.replay_path else HEATMAP_LIVE_POINTS)
+        if self.replay_path and d is self.dev and self._replay_index is not None:
+            pos = self._rebuild_target_pos if self._rebuild_active else self.replay_pos
+            if not self._replay_index.heat_until(d.heat, pos) and self._rebuild_active:
+                self._rebuild_heat = True
+
+    def save_heatmap_dialog(self):
+        dev = self.dev
+        if np is None:
+            print("[WARN] 히트맵에는 numpy 가 필요합니다(pip install numpy)", file=sys.stderr)
+            return
+        if dev.heat is None:
+            print("[WARN] 히트맵이 아직 없습니다. 먼저 히트맵을 켜 주세요.", file=sys.stderr)
             return
-        ttl = float(self.marker_ttl_sec)
-        now = time.time()
         try:
-            dead = [k for (k, v) in self.markers.items() if (now - v.ts) > ttl]
-            for k in dead:
-                try:
-                    del self.markers[k]
-                except Exception:
-                    pass
-            if dead:
-                self._need_redraw = True
+            path = filedialog.asksaveasfilename(
+                title="히트맵 저장",
+                defaultextension=".png",
+                filetypes=[("PNG image", "*.png"), ("NumPy grid", "*.npy")],
+            )
+        except Exception:
+            path = ""
+        if not path:
+            return
+        try:
+            export_heatmap(dev.heat, path, dev.screen)
+        except Exception as e:
+            print(f"[WARN] 히트맵 저장 실패: path={path} err={e}", file=sys.stderr)
+
+    # 표에 보이는 열(전체 열은 CSV 저장)
+    TIMING_VIEW = [
+        ("serial", "기기", 90),
+        ("idx", "idx", 44),
+        ("cat", "cat", 36),
+        ("n", "실행", 56),
+        ("delay_ms", "delay", 56),
+        ("jitter_pct", "jit%", 44),
+        ("interval_p50", "간격p50", 70),
+        ("interval_p95", "간격p95", 70),
+        ("drift_p50", "drift p50", 70),
+        ("drift_p95", "drift p95", 70),
+        ("drift_p99", "drift p99", 70),
+        ("late_pct", "지연%", 56),
+        ("press_p50", "press", 56),
+        ("hold_p50", "hold", 56),
+        ("dur_p50", "dur", 56),
+    ]
+
+    def open_timing_panel(self):
+        if self._timing_win is not None:
+            try:
+                self._timing_win.lift()
+                return
+            except Exception:
+                self._timing_win = None
+        win = tk.Toplevel(self.root)
+        win.title("마커 타이밍 (간격 ms, drift = 실제 간격 - delayMs)")
+        win.geometry("1020x420")
+        bar = tk.Frame(win)
+        bar.pack(side=tk.TOP, fill=tk.X)
+        tk.Button(bar, text="CSV 저장", command=self.save_timing_dialog).pack(side=tk.RIGHT, padx=6, pady=4)
+        tk.Button(bar, text="초기화", command=self.reset_timing).pack(side=tk.RIGHT, padx=6, pady=4)
+        cols = [c for (c, _t, _w) in self.TIMING_VIEW]
+        tree = ttk.Treeview(win, columns=cols, show="headings")
+        for c, title, w in self.TIMING_VIEW:
+            tree.heading(c, text=title)
+            tree.column(c, width=w, anchor="e")
+        sb = tk.Scrollbar(win, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=sb.set)
+        sb.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        win.protocol("WM_DELETE_WINDOW", self._close_timing_panel)
+        self._timing_win = win
+        self._timing_tree = tree
+        self._timing_shown = (-1, 0.0)
+        self._refresh_timing_panel()
+
+    def _close_timing_panel(self):
+        try:
+            if self._timing_win is not None:
+                self._timing_win.destroy()
+        except Exception:
+            pass
+        self._timing_win = None
+        self._timing_tree = None
+
+    def _refresh_timing_panel(self):
+        tree = self._timing_tree
+        if tree is None:
+            return
+        now = time.perf_counter()
+        ver, t_last = self._timing_shown
+        if ver == self.timing.version or (now - t_last) < 1.0:
+            return
+        self._timing_shown = (self.timing.version, now)
+        tree.delete(*tree.get_children())
+        for r in self.timing.rows():
+            tree.insert("", tk.END, values=["" if r.get(c) is None else r.get(c) for (c, _t, _w) in self.TIMING_VIEW])
+
+    def reset_timing(self):
+        self.timing.reset()
+        self._timing_shown = (-1, 0.0)
+
+    def save_timing_dialog(self):
+        try:
+            path = filedialog.asksaveasfilename(
+                title="마커 타이밍 CSV 저장", defaultextension=".csv", filetypes=[("CSV", "*.csv")]
+            )
         except Exception:
+            path = ""
+        if not path:
             return
+        try:
+            write_timing_csv(self.timing.rows(), path)
+        except Exception as e:
+            print(f"[WARN] 타이밍 CSV 저장 실패: path={path} err={e}", file=sys.stderr)
+
+    def clear_markers(self):
+        for d in self.devices.values():
+            d.markers.clear()
+        self._need_redraw = True
+
+    def _now(self) -> float:
+        """
+        표시 시계: 라이브=벽시계(time.time), 재생=재생 시뮬 시간(로그 기준 상대초).
+        이벤트/마커 ts, TTL 정리, 그리기 나이 계산이 모두 이 값을 기준으로 한다.
+        """
+        if self.replay_path and self.replay_lines:
+            if self._rebuild_active:
+                return float(self._rebuild_target_sec)
+            return self._replay_sim_time(time.perf_counter())
+        if self.clock is not None:
+            return float(self.clock())
+        return time.time()
+
+    def _prune_markers(self):
+        ttl = float(self.marker_ttl_sec)
+        now = self._now()
+        for d in self.devices.values():
+            if not d.markers:
+                continue
+            try:
+                dead = [k for (k, v) in d.markers.items() if (now - v.ts) > ttl]
+                for k in dead:
+                    try:
+                        del d.markers[k]
+                    except Exception:
+                        pass
+                if dead:
+                    self._need_redraw = True
+            except Exception:
+                continue
 
     def on_resize(self, _ev=None):
         self._need_redraw = True
@@ -498,9 +4833,23 @@ class VisualizerApp:
         self._need_redraw = True
 
     def on_pan_down(self, ev):
+        # (추가) 영역 모드 또는 Shift+드래그 = 필터 영역 지정
+        if self._region_mode or (int(getattr(ev, "state", 0) or 0) & 0x0001):
+            self._region_drag = (float(ev.x), float(ev.y))
+            if self._region_rubber is None:
+                self._region_rubber = self.canvas.create_rectangle(
+                    0, 0, 0, 0, outline="#f8fafc", dash=(4, 2), width=1, state="hidden"
+                )
+            self.canvas.coords(self._region_rubber, ev.x, ev.y, ev.x, ev.y)
+            self.canvas.itemconfigure(self._region_rubber, state="normal")
+            return
         self._pan_down = (float(ev.x), float(ev.y))
 
     def on_pan_move(self, ev):
+        if self._region_drag is not None:
+            x0, y0 = self._region_drag
+            self.canvas.coords(self._region_rubber, x0, y0, ev.x, ev.y)
+            return
         if not self._pan_down:
             return
         x0, y0 = self._pan_down
@@ -509,41 +4858,312 @@ class VisualizerApp:
         self._pan_dx += dx
         self._pan_dy += dy
         self._pan_down = (float(ev.x), float(ev.y))
-        self._need_redraw = True
+        if self._need_redraw or self._pool is None:
+            return
+        # 다른 변경이 없으면 화면 좌표 아이템(폰 영역/이벤트/마커)을 한 번에 평행이동
+        self.canvas.move("world", dx, dy)
+        self._pool.moved(dx, dy)
 
-    def on_pan_up(self, _ev):
+    def on_pan_up(self, ev):
         self._pan_down = None
+        if self._region_drag is None:
+            return
+        x0, y0 = self._region_drag
+        x1, y1 = float(ev.x), float(ev.y)
+        self._region_drag = None
+        self.canvas.itemconfigure(self._region_rubber, state="hidden")
+        self.toggle_region_mode(False)
+        region = None
+        if abs(x1 - x0) >= 4 and abs(y1 - y0) >= 4:
+            # 드래그를 시작한 타일(기기)의 변환으로 캔버스 좌표 → 기기 좌표
+            for d, tx, ty, tw, th in self._tiles():
+                if tx <= x0 < tx + tw and ty <= y0 < ty + th:
+                    s, ox, oy, _ = self._calc_transform(d, (tx, ty, tw, th))
+                    ax, bx = sorted(((x0 - ox) / s, (x1 - ox) / s))
+                    ay, by = sorted(((y0 - oy) / s, (y1 - oy) / s))
+                    region = (max(0, int(ax)), max(0, int(ay)), max(0, int(bx)), max(0, int(by)))
+                    break
+        self.filter.update(region=region)
+        self._on_filter_changed()
+
+    def toggle_region_mode(self, on: Optional[bool] = None):
+        self._region_mode = (not self._region_mode) if on is None else bool(on)
+        try:
+            self.btn_region.config(relief=tk.SUNKEN if self._region_mode else tk.RAISED)
+        except Exception:
+            pass
+
+    def apply_filter_bar(self):
+        """필터 바 입력(idx 목록/구간, 종류)을 반영. 카테고리는 범례 클릭, 영역은 캔버스 드래그로 바꾼다."""
+        try:
+            idx = parse_idx_ranges(self.filter_idx_entry.get())
+        except ValueError:
+            self.filter_lbl.config(text="idx 형식 오류(예: 3,5,10-12)")
+            return
+        kind = self.filter_kind_var.get()
+        self.filter.update(idx=idx, kinds=None if kind not in FILTER_KINDS else (kind,))
+        self._on_filter_changed()
+
+    def clear_filter(self):
+        self.filter.clear()
+        try:
+            self.filter_idx_entry.delete(0, tk.END)
+            self.filter_kind_var.set("전체")
+        except Exception:
+            pass
+        self._on_filter_changed()
+
+    def toggle_filter_cat(self, cat: int):
+        self.filter.toggle_cat(cat)
+        self._on_filter_changed()
+
+    def _on_filter_changed(self):
+        # 저장소는 그대로 두고 다시 그리기만 한다(재생 rebuild 없음)
+        self._refresh_legend()
+        self._update_filter_label()
+        self._need_redraw = True
+
+    def _update_filter_label(self):
+        flt = self.filter
+        txt = flt.describe()
+        idx = self._replay_index
+        if flt.active and idx is not None and np is not None:
+            n = len(idx.matches(flt))
+            txt += f"   일치 {n}건" + ("" if idx.done else "+ (인덱싱 중)")
+        try:
+            self.filter_lbl.config(text=txt)
+        except Exception:
+            pass
+
+    def jump_filter_match(self, direction: int):
+        """재생 중/일시정지 상태에서 필터에 맞는 이전(-1)/다음(+1) 이벤트 위치로 이동(이벤트 인덱스 사용)."""
+        idx = self._replay_index
+        if idx is None or np is None or not self.replay_lines:
+            return
+        pos = idx.matches(self.filter)
+        times = self._replay_times()
+        # replay_pos 는 다음에 처리할 라인이므로 지금 보이는 라인은 replay_pos - 1.
+        # 직전 점프 이후 그대로면 점프한 라인 기준(같은 시각 라인이 뒤에 더 처리됐을 수 있음)
+        cur = self.replay_pos - 1
+        last = self._filter_jump
+        if last is not None and self._now() == last[1]:
+            cur = last[0]
+        if direction > 0:
+            k = int(np.searchsorted(pos, cur, side="right"))
+            if k >= len(pos):
+                return
+        else:
+            k = int(np.searchsorted(pos, cur, side="left")) - 1
+            if k < 0:
+                return
+        p = int(pos[k])
+        self._filter_jump = (p, float(times[p]))
+        self.seek_to_time(float(times[p]))
+        self._update_filter_label()
+
+    def _refresh_legend(self):
+        # 숨긴 카테고리는 범례를 흐리게
+        if not self._legend_drawn:
+            return
+        cats = self.filter.cats
+        for i in range(1, 8):
+            on = cats is None or i in cats
+            col = cat_color(i) if on else "#475569"
+            try:
+                self.canvas.itemconfigure(f"legend_o{i}", outline=col)
+                self.canvas.itemconfigure(f"legend_n{i}", fill=col)
+                self.canvas.itemconfigure(f"legend_t{i}", fill="#e5e7eb" if on else "#475569")
+            except Exception:
+                pass
+
+    def on_hover(self, ev):
+        self._hover_xy = (float(ev.x), float(ev.y))
+        if self._pan_down is not None or self._region_drag is not None:
+            return
+        self._update_hover()
+
+    def on_hover_leave(self, _ev=None):
+        self._hover_xy = None
+        self._update_hover()
+
+    def _hit_test(self, cx: float, cy: float):
+        """캔버스 좌표 → (기기, 가장 가까운 보이는 항목). 항목은 MarkerState / Event / ("agg", key, 값)."""
+        for d, tx, ty, tw, th in self._tiles():
+            if not (tx <= cx < tx + tw and ty <= cy < ty + th):
+                continue
+            s, ox, oy, _ = self._calc_transform(d, (tx, ty, tw, th))
+            x = (cx - ox) / s
+            y = (cy - oy) / s
+            r = HOVER_RADIUS_PX / s
+            now = self._now()
+            flt = self.filter
+            filtering = flt.active
+            mttl = float(self.marker_ttl_sec)
+            short = float(self.event_ttl_short_sec)
+            keep = float(self.keep_seconds)
+            short_cats = self.event_ttl_short_cats
+
+            # 그려지는 것만 맞힌다(TTL/필터/마커 표시). 같은 idx 의 이전 마커는 교체됐으므로 제외
+            def alive(item) -> bool:
+                if isinstance(item, MarkerState):
+                    if not self.show_markers or d.markers.get(item.idx) is not item or now - item.ts > mttl:
+                        return False
+                    return not filtering or flt.match(item.cat, item.idx, "marker", item.x, item.y)
+                if now - item.ts > (short if item.cat in short_cats else keep):
+                    return False
+                return not filtering or flt.match(item.cat, item.idx, item.kind, item.p0[0], item.p0[1])
+
+            best = d.spatial.nearest(x, y, r, alive)
+            if d.agg:
+                bd = r * r
+                if best is not None:
+                    bx, by = (best.x, best.y) if isinstance(best, MarkerState) else best.p0
+                    bd = (bx - x) ** 2 + (by - y) ** 2
+                for key, a in d.agg.items():
+                    ax, ay = a[1] / a[0], a[2] / a[0]
+                    d2 = (ax - x) ** 2 + (ay - y) ** 2
+                    if d2 < bd and (
+                        not filtering or flt.match(key[0], key[2], "swipe" if key[1] else "tap", int(ax), int(ay))
+                    ):
+                        bd = d2
+                        best = ("agg", key, a)
+            return d, best
+        return None, None
+
+    def _hover_text(self, dev: DeviceState, item) -> str:
+        now = self._now()
+        head = f"[{dev.title}] " if len(self.devices) > 1 else ""
+        if isinstance(item, tuple):
+            _, key, a = item
+            n = int(a[0])
+            kind = "swipe" if key[1] else "tap"
+            return f"{head}{kind} x{n} (묶음)  {cat_name(key[0])}  idx={key[2]}\n평균 위치 ({a[1] / n:.0f}, {a[2] / n:.0f})"
+        if isinstance(item, MarkerState):
+            lines = [
+                f"{head}MARKER idx={item.idx}  {cat_name(item.cat)}  kind={item.kind}",
+                f"({item.x}, {item.y})  {max(0.0, now - item.ts):.2f}s 전",
+            ]
+            skip = {"idx", "cat", "kind", "xPx", "yPx"}
+        else:
+            pos = f"({item.p0[0]}, {item.p0[1]})"
+            if item.p1 is not None:
+                pos += f" → ({item.p1[0]}, {item.p1[1]})"
+            lines = [
+                f"{head}{item.kind} idx={item.idx}  {cat_name(item.cat)}",
+                f"{pos}  {max(0.0, now - item.ts):.2f}s 전",
+            ]
+            skip = {"idx", "cat"}
+        meta = item.meta
+        if meta:
+            verb = meta.split(" ", 1)[0]
+            if "=" not in verb and verb != "MARKER":
+                lines[0] += f"  [{verb}]"
+            lines.extend(f"{k}={v}" for k, v in meta_items(meta) if k not in skip)
+        return "\n".join(lines)
+
+    def _update_hover(self):
+        xy = self._hover_xy
+        dev, item = self._hit_test(*xy) if xy is not None else (None, None)
+        if item is None:
+            if self._tip_items is not None and self._tip_key is not None:
+                for iid in self._tip_items:
+                    self.canvas.itemconfigure(iid, state="hidden")
+            self._tip_key = None
+            return
+        if self._tip_items is None:
+            bg = self.canvas.create_rectangle(0, 0, 0, 0, fill="#111827", outline="#64748b", state="hidden")
+            tx = self.canvas.create_text(
+                0, 0, text="", fill="#e5e7eb", anchor="nw", font=("Segoe UI", 9), justify="left", state="hidden"
+            )
+            self._tip_items = (bg, tx)
+        bg, tx = self._tip_items
+        key = (id(item), round(self._now(), 1), xy)
+        if key == self._tip_key:
+            return
+        self._tip_key = key
+        text = self._hover_text(dev, item)
+        # 포인터 오른쪽 아래(캔버스 밖으로 나가면 반대쪽)
+        lines = text.split("\n")
+        w = 7 * max(len(ln) for ln in lines) + 12
+        h = 15 * len(lines) + 8
+        cw, ch = self._last_canvas_size
+        x = xy[0] + 14 if xy[0] + 14 + w <= cw else max(0.0, xy[0] - 14 - w)
+        y = xy[1] + 14 if xy[1] + 14 + h <= ch else max(0.0, xy[1] - 14 - h)
+        self.canvas.itemconfigure(tx, text=text, state="normal")
+        self.canvas.coords(tx, x + 6, y + 4)
+        bb = self.canvas.bbox(tx)
+        if bb:
+            self.canvas.coords(bg, bb[0] - 6, bb[1] - 4, bb[2] + 6, bb[3] + 4)
+        else:
+            self.canvas.coords(bg, x, y, x + w, y + h)
+        self.canvas.itemconfigure(bg, state="normal")
+        self.canvas.tag_raise(bg)
+        self.canvas.tag_raise(tx)
 
-    def _calc_transform(self) -> Tuple[float, float, float, float]:
+    def _tiles(self) -> List[Tuple[DeviceState, float, float, float, float]]:
+        """기기 수에 맞춰 캔버스를 격자로 나눈 (기기, x, y, w, h) 목록. 1대면 캔버스 전체."""
         cw = max(1, int(self.canvas.winfo_width()))
         ch = max(1, int(self.canvas.winfo_height()))
+        devs = list(self.devices.values())
+        n = max(1, len(devs))
+        cols = 1
+        while cols * cols < n:
+            cols += 1
+        rows = (n + cols - 1) // cols
+        tw = cw / cols
+        th = ch / rows
+        return [(d, (i % cols) * tw, (i // cols) * th, tw, th) for i, d in enumerate(devs)]
+
+    def _calc_transform(self, dev: Optional[DeviceState] = None, tile=None) -> Tuple[float, float, float, float]:
+        dev = dev or self.dev
+        if tile is None:
+            tx, ty = 0.0, 0.0
+            cw = max(1, int(self.canvas.winfo_width()))
+            ch = max(1, int(self.canvas.winfo_height()))
+        else:
+            tx, ty, cw, ch = tile
+        scr = dev.screen
         margin = 18
         aw = max(1, cw - margin * 2)
         ah = max(1, ch - margin * 2)
-        s_fit = min(aw / self.screen.w, ah / self.screen.h)
+        s_fit = min(aw / scr.w, ah / scr.h)
         zoom = float(self.zoom_var.get() if self.zoom_var else 1.0)
         s = s_fit * zoom
-        ox = (cw - self.screen.w * s) / 2.0 + self._pan_dx
-        oy = (ch - self.screen.h * s) / 2.0 + self._pan_dy
+        ox = tx + (cw - scr.w * s) / 2.0 + self._pan_dx
+        oy = ty + (ch - scr.h * s) / 2.0 + self._pan_dy
         return s, ox, oy, float(margin)
 
     def _to_canvas(self, x: int, y: int) -> Tuple[float, float]:
         s, ox, oy, _ = self._calc_transform()
         return ox + x * s, oy + y * s
 
-    def _prune(self):
-        now = time.time()
+    def _prune(self, dev: Optional[DeviceState] = None):
+        dev = dev or self.dev
+        now = self._now()
         # (요청) 스와이프/단독/색상/이미지 이벤트는 300ms TTL, 그 외는 keep_seconds 유지
         keep_default = float(self.keep_seconds)
         keep_short = float(self.event_ttl_short_sec)
         short_cats = self.event_ttl_short_cats
-        self.events = [
+        dev.events = [
             e
-            for e in self.events
+            for e in dev.events
             if (now - e.ts) <= (keep_short if (getattr(e, "cat", 1) in short_cats) else keep_default)
         ]
-        if len(self.events) > self.max_events:
-            self.events = self.events[-self.max_events :]
+        if len(dev.events) > self.max_events:
+            dev.events = dev.events[-self.max_events :]
+        # 공간 인덱스는 삭제 없이 쌓이므로 죽은 항목이 산 항목보다 많아지면 다시 만든다(분할 상환 O(1))
+        if dev.spatial.n > 2 * (len(dev.events) + len(dev.markers)) + 256:
+            self._reindex_spatial(dev)
+
+    def _reindex_spatial(self, dev: DeviceState):
+        sp = dev.spatial
+        sp.clear()
+        for ms in dev.markers.values():
+            sp.insert(ms.x, ms.y, ms)
+        for e in dev.events:
+            sp.insert(e.p0[0], e.p0[1], e)
+            if e.p1 is not None:
+                sp.insert(e.p1[0], e.p1[1], e)
 
     def _update_label(self):
         o = "가로" if self.screen.is_landscape else "세로"
@@ -557,9 +5177,21 @@ class VisualizerApp:
             except Exception:
                 sim = 0.0
             total = len(self.replay_lines) if self.replay_lines else 0
-            replay_txt = f"   replay={Path(self.replay_path).name} {st} slow={self.speed_var.get()} pos={self.replay_pos}/{total} t={sim:.1f}s"
+            loading = "" if getattr(self.replay_lines, "done", True) else "+ (인덱싱 중)"
+            replay_txt = f"   replay={Path(self.replay_path).name} {st} speed={self.speed_var.get()} pos={self.replay_pos}/{total}{loading} t={sim:.1f}s"
+        dev_txt = ""
+        if len(self.devices) > 1:
+            # (추가) 기기별 해상도/이벤트 수/수신 속도
+            dev_txt = "\n" + "   ".join(
+                f"[{d.title}] {d.screen.w}x{d.screen.h} ev={len(d.events)} {d.rate:.0f}l/s" for d in self.devices.values()
+            )
+        # (추가) 입력 링 드롭/밀림(lag=아직 처리 못 한 라인 수)
+        drop = int(getattr(self.q, "dropped", 0) or 0)
+        if self._parse_worker is not None:
+            drop += self._parse_worker.dropped_lines
+        ingest_txt = f"   drop={drop} lag={self._ingest_lag}" if (drop or self._ingest_lag) else ""
         self.lbl.config(
-            text=f"screen={self.screen.w}x{self.screen.h} ({o})   events={len(self.events)}   keep={self.keep_seconds:.0f}s{save_txt}{replay_txt}"
+            text=f"screen={self.screen.w}x{self.screen.h} ({o})   events={len(self.events)}   keep={self.keep_seconds:.0f}s{ingest_txt}{save_txt}{replay_txt}{dev_txt}"
         )
 
         # 하단 재생 진행 표시
@@ -574,7 +5206,7 @@ class VisualizerApp:
                     s = int(max(0.0, sec))
                     return f"{s//60:02d}:{s%60:02d}"
 
-                self.replay_progress_lbl.config(text=f"재생 {fmt(cur)} / {fmt(total)}   (slow {self.speed_var.get()})")
+                self.replay_progress_lbl.config(text=f"재생 {fmt(cur)} / {fmt(total)}   ({self.speed_var.get()})")
 
                 try:
                     self._seek_suppress = True
@@ -583,6 +5215,7 @@ class VisualizerApp:
                         self.replay_seek_var.set(cur)
                 finally:
                     self._seek_suppress = False
+                self._refresh_overview(cur)
             else:
                 self.replay_progress_lbl.config(text="")
                 try:
@@ -594,6 +5227,40 @@ class VisualizerApp:
         except Exception:
             pass
 
+    def _refresh_overview(self, cur: Optional[float] = None):
+        # 개요 이미지는 (개요, 크기)가 바뀔 때만 다시 만들고 평소에는 커서 선만 옮긴다(파일 길이와 무관한 비용)
+        idx = self._replay_index
+        ov = idx.overview if idx is not None else None
+        if ov is None or not self._overview_shown:
+            return
+        oc = self.overview_canvas
+        w = max(1, int(oc.winfo_width()))
+        h = max(2, int(oc.winfo_height()))
+        key = (id(ov), w, h)
+        if key != self._overview_key:
+            rgb = ov.to_rgb(w, h)
+            self._overview_img = tk.PhotoImage(data=b"P6 %d %d 255\n" % (w, h) + rgb.tobytes(), format="PPM")
+            if self._overview_items is None:
+                img = oc.create_image(0, 0, image=self._overview_img, anchor="nw")
+                cursor = oc.create_line(0, 0, 0, h, fill="#f8fafc", width=1)
+                self._overview_items = (img, cursor)
+            else:
+                oc.itemconfigure(self._overview_items[0], image=self._overview_img, state="normal")
+            self._overview_key = key
+        if cur is None:
+            cur = self._now()
+        x = (max(0.0, min(ov.total, cur)) / ov.total * w) if ov.total > 0 else 0.0
+        oc.coords(self._overview_items[1], x, 0, x, h)
+
+    def on_overview_click(self, ev):
+        idx = self._replay_index
+        ov = idx.overview if idx is not None else None
+        if ov is None:
+            return
+        w = max(1, int(self.overview_canvas.winfo_width()))
+        x = float(ev.x)
+        self.seek_to_time(ov.bin_start(ov.peak_bin(x / w, (x + 1) / w)))
+
     def on_seek_press(self, _ev=None):
         if not (self.replay_path and self.replay_lines):
             return
@@ -632,6 +5299,8 @@ class VisualizerApp:
     def seek_to_time(self, target_sec: float):
         if not (self.replay_path and self.replay_lines):
             return
+        if not self._replay_total_final:
+            self._update_replay_total()
         total = float(self.replay_total_sim)
         t = max(0.0, min(total, float(target_sec)))
         # 재생 중이었다면, 점프 후 계속 재생
@@ -648,63 +5317,201 @@ class VisualizerApp:
         self._rebuild_active = True
         self._rebuild_target_sec = float(target_sec)
         self._rebuild_resume_after = bool(resume_after)
-        times = [t for (t, _line) in self.replay_lines]
+        times = self._replay_times()
         self._rebuild_target_pos = bisect.bisect_right(times, self._rebuild_target_sec)
         self._rebuild_pos = 0
         # 상태 초기화
         self.events.clear()
+        self.dev.agg.clear()
         self.markers.clear()
+        self.dev.spatial.clear()
+        self.timing.reset()
         self._need_redraw = True
+        # (추가) 누적 히트맵은 인덱스의 좌표 목록으로 목표 위치까지 한 번에 다시 만든다.
+        # 인덱싱이 아직 거기까지 못 갔으면 비우고 rebuild 중 처리되는 라인으로만 채운다.
+        heat = self.dev.heat
+        self._rebuild_heat = False
+        if heat is not None:
+            idx0 = self._replay_index
+            if idx0 is None or not idx0.heat_until(heat, self._rebuild_target_pos):
+                heat.clear()
+                self._rebuild_heat = True
+        # (추가) 가까운 체크포인트가 있으면 그 상태부터 복원하고 꼬리만 다시 처리
+        idx = self._replay_index
+        cp = idx.nearest(self._rebuild_target_pos) if idx is not None else None
+        if cp is not None:
+            self._restore_checkpoint(cp)
+            self._rebuild_pos = cp.pos
+        # (추가) 목표 시각보다 TTL 창 이상 오래된 라인은 화면 크기만 반영하고 이벤트/마커는 만들지 않는다
+        window = max(float(self.keep_seconds), float(self.event_ttl_short_sec), float(self.marker_ttl_sec))
+        self._rebuild_skip_until = bisect.bisect_left(times, self._rebuild_target_sec - window)
+
+    def _restore_checkpoint(self, cp: ReplayCheckpoint):
+        # 재생 시계가 로그 기준 상대초이므로 기록된 시각을 그대로 쓴다
+        dev = self.dev
+        dev.screen = cp.screen
+        for t, rec in cp.markers:
+            self._apply_record(rec, dev, ts=t)
+        for t, rec in cp.events:
+            self._apply_record(rec, dev, ts=t)
+
+    def _replay_times(self) -> Sequence[float]:
+        # 로드 시 만들어 둔 상대초 배열(캐시). .atxrec 는 파일 인덱스를 그대로 쓴다
+        if self._replay_index is not None:
+            return self._replay_index.times
+        times = getattr(self.replay_lines, "times", None)
+        if times is not None:
+            return times
+        return [t for (t, _line) in self.replay_lines]
+
+    def _process_replay_pos(self, pos: int, size_only: bool = False):
+        # 재생 라인 1개 처리(저장된 파싱 결과가 있으면 정규식 없이 바로 반영). ts 는 라인의 로그 시각.
+        src = self.replay_lines
+        rec_fn = getattr(src, "record", None)
+        line = None
+        if rec_fn is not None:
+            rec = rec_fn(pos)
+            t = src.times[pos]
+        else:
+            # 큐에 넣지 않고, 동일 분류기를 직접 사용
+            t, line = src[pos]
+            rec = classify_line(line)
+        if rec is None:
+            return
+        if size_only:
+            sz = rec.size
+            if sz and (sz.w != self.dev.screen.w or sz.h != self.dev.screen.h):
+                self.dev.screen = sz
+                self._need_redraw = True
+            return
+        self._apply_record(rec, self.dev, ts=float(t))
+        # 타이밍은 실제로 재생된 구간만(seek 중 건너뛴 구간은 다시 세지 않음)
+        if rec.idx and not self._rebuild_active:
+            self.timing.feed(line if line is not None else src[pos][1], rec)
+
+    def _persist_line(self, line: str, dev: DeviceState, rec: Optional[ParsedLine] = None, parsed: bool = False):
+        with self._io_lock:
+            self._save_line(line, dev)
+            if dev.rec_writer is not None:
+                try:
+                    dev.rec_writer.write(line, rec if parsed else classify_line(line))
+                except Exception as e:
+                    dev.rec_writer.errors += 1
+                    if dev.rec_writer.errors == 1:
+                        print(f"[WARN] .atxrec 기록 실패(이후 실패는 개수만 셉니다): path={dev.rec_writer.path} err={e}", file=sys.stderr)
+            # 여러 기기면 스냅샷에서 구분되도록 시리얼을 붙여 둔다
+            self._buffer_line(f"[{dev.serial}] {line}" if len(self.devices) > 1 else line)
+            if self.catalog is not None:
+                self.catalog.add(dev.serial, line, rec if parsed else None)
+
+    def _persist_dropped(self, item: tuple):
+        # (리더 스레드) 링에서 밀려난 라인: 표시는 건너뛰고 저장만
+        serial, line = item[0], item[1]
+        if len(item) > 2:
+            self._persist_line(line, self.devices.get(serial) or self.dev, item[2], parsed=True)
+        else:
+            self._persist_line(line, self.devices.get(serial) or self.dev)
+
+    def _persist_serial_line(self, serial: str, line: str, rec: Optional[ParsedLine] = None):
+        # (파싱 스레드) 기기 생성은 UI 스레드에서만 하므로 모르는 시리얼은 기본 기기 파일로 저장하지 않는다
+        dev = self.devices.get(serial)
+        if dev is None:
+            with self._io_lock:
+                self._buffer_line(f"[{serial}] {line}")
+            return
+        self._persist_line(line, dev, rec, parsed=True)
 
-    def _process_line_impl(self, line: str, do_io: bool):
-        if do_io:
-            self._save_line(line)
-            self._buffer_line(line)
-
-        # ATX_STREAM MARKER 파싱 → 마커 원 표시
-        if RE_ATX_STREAM_MARKER.search(line):
-            try:
-                kv = {m.group(1): m.group(2) for m in RE_ATX_KV.finditer(line)}
-                idx = int(kv.get("idx", "0"))
-                kind = kv.get("kind", "")
-                cat = int(kv.get("cat", "0"))
-                x = int(kv.get("xPx", "-1"))
-                y = int(kv.get("yPx", "-1"))
-                if idx != 0 and x >= 0 and y >= 0:
-                    if cat <= 0:
-                        cat = classify_cat(line)
-                    self.markers[idx] = MarkerState(idx=idx, kind=kind, cat=cat, x=x, y=y, ts=time.time())
-                    self._need_redraw = True
-            except Exception:
-                pass
+    def _process_line_impl(self, line: str, do_io: bool, dev: Optional[DeviceState] = None):
+        dev = dev or self.dev
+        if do_io:
+            self._persist_line(line, dev)
+
+        # 단일 패스 분류(마커/화면크기/탭·스와이프)
+        rec = classify_line(line)
+        if rec is None:
+            return
+        self._apply_record(rec, dev)
+        if rec.idx:
+            self.timing.feed(line, rec, dev.serial)
+
+    def _apply_record(self, rec: ParsedLine, dev: DeviceState, ts: Optional[float] = None):
+        if ts is None:
+            ts = self._now()
+        if rec.kind == "marker":
+            x, y = rec.p0 or (0, 0)
+            ms = MarkerState(idx=rec.idx, kind=rec.mkind, cat=rec.cat, x=x, y=y, ts=ts, meta=rec.meta)
+            dev.markers[rec.idx] = ms
+            dev.spatial.insert(x, y, ms)
+            self._need_redraw = True
+            return
 
-        sz = parse_size_from_line(line)
-        if sz and (sz.w != self.screen.w or sz.h != self.screen.h):
-            self.screen = sz
+        sz = rec.size
+        if sz and (sz.w != dev.screen.w or sz.h != dev.screen.h):
+            dev.screen = sz
             self._need_redraw = True
 
-        ev = parse_event_from_line(line)
-        if ev:
-            self.events.append(ev)
-            self._prune()
+        if rec.kind != "size":
+            if self._coalesce and rec.cat in self.event_ttl_short_cats and not self._rebuild_active:
+                # (추가) 빨리감기: 한 프레임 안에 사라질 이벤트는 격자칸별로 묶어 개수만 센다
+                self._coalesce_record(rec, dev)
+                return
+            ev = Event(
+                ts=ts,
+                kind=rec.kind,
+                p0=rec.p0 or (0, 0),
+                p1=rec.p1,
+                color=cat_color(rec.cat),
+                label=rec.kind,
+                cat=rec.cat,
+                idx=rec.idx,
+                meta=rec.meta,
+            )
+            dev.events.append(ev)
+            dev.spatial.insert(ev.p0[0], ev.p0[1], ev)
+            if ev.p1 is not None:
+                dev.spatial.insert(ev.p1[0], ev.p1[1], ev)
+            if dev.heat is not None and (self._rebuild_heat or not self._rebuild_active):
+                dev.heat.add_rec(rec, _heat_orient(dev.screen.w, dev.screen.h))
+            # 정리는 tick 끝에서 한 번(라인마다 전체 리스트를 다시 만들지 않음). 메모리 상한만 여기서.
+            if len(dev.events) > self.max_events * 2:
+                self._prune(dev)
             self._need_redraw = True
 
-    def _save_line(self, line: str):
-        fp = self.save_fp
+    def _coalesce_record(self, rec: ParsedLine, dev: DeviceState):
+        c = REPLAY_COALESCE_CELL_PX
+        x, y = rec.p0 or (0, 0)
+        if rec.kind == "swipe" and rec.p1 is not None:
+            x2, y2 = rec.p1
+            key: tuple = (rec.cat, 1, rec.idx, x // c, y // c, x2 // c, y2 // c)
+        else:
+            x2 = y2 = 0
+            key = (rec.cat, 0, rec.idx, x // c, y // c)
+        a = dev.agg.get(key)
+        if a is None:
+            dev.agg[key] = [1, x, y, x2, y2]
+        else:
+            a[0] += 1
+            a[1] += x
+            a[2] += y
+            a[3] += x2
+            a[4] += y2
+        if dev.heat is not None:
+            dev.heat.add_rec(rec, _heat_orient(dev.screen.w, dev.screen.h))
+        self._need_redraw = True
+
+    def _save_line(self, line: str, dev: Optional[DeviceState] = None):
+        dev = dev or self.dev
+        fp = dev.save_fp
         if not fp:
             return
         try:
-            fp.write(line + "\n")
-            self._save_lines_since_flush += 1
-            now = time.time()
-            # 너무 자주 flush하지 않게 디바운스(종료/크래시 대비 최소한의 안전)
-            if self._save_lines_since_flush >= 200 or (now - self._save_last_flush) >= 0.5:
-                try:
-                    fp.flush()
-                except Exception:
-                    pass
-                self._save_last_flush = now
-                self._save_lines_since_flush = 0
+            # 기록 스레드로 넘기기만 한다(묶음 기록/압축/flush 는 LogWriter 가)
+            fp.write(line)
+            if dev.rec_writer is not None:
+                now = time.time()
+                if now - dev.rec_last_flush >= 0.5:
+                    dev.rec_writer.flush()
+                    dev.rec_last_flush = now
         except Exception:
             # 저장 중 예외가 나면 UI는 계속 동작
             return
@@ -712,12 +5519,7 @@ class VisualizerApp:
     def _buffer_line(self, line: str):
         # 스냅샷 저장용으로 "원본 라인"을 누적
         try:
-            self._buf_lines.append(line)
-            if len(self._buf_lines) > self._buf_keep_max:
-                over = len(self._buf_lines) - self._buf_keep_max
-                if over > 0:
-                    del self._buf_lines[0:over]
-                    self._buf_dropped += over
+            self.history.append(line)
         except Exception:
             return
 
@@ -750,59 +5552,32 @@ class VisualizerApp:
                     p.parent.mkdir(parents=True, exist_ok=True)
                 except Exception:
                     pass
-            with open(str(p), "w", encoding="utf-8", errors="ignore") as f:
-                f.write(f"# snapshot_saved_at={time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"# screen={self.screen.w}x{self.screen.h}\n")
-                f.write(f"# zoom={self.zoom_var.get() if self.zoom_var else 1.0}\n")
-                f.write(f"# mode={'replay' if self.replay_path else 'live'}\n")
-                if self.replay_path:
-                    f.write(f"# replay_file={self.replay_path}\n")
-                    f.write(f"# speed={self.speed_var.get()}\n")
-                    f.write(f"# replay_pos={self.replay_pos}/{len(self.replay_lines)}\n")
-                if self.save_path:
-                    f.write(f"# auto_save_path={self.save_path}\n")
-                if self._buf_dropped > 0:
-                    f.write(f"# NOTE: buffer_dropped_lines={self._buf_dropped} (kept_last={self._buf_keep_max})\n")
-                f.write("\n")
-                for ln in self._buf_lines:
-                    f.write(ln + "\n")
+            hdr = [
+                f"# snapshot_saved_at={time.strftime('%Y-%m-%d %H:%M:%S')}",
+                f"# screen={self.screen.w}x{self.screen.h}",
+                f"# zoom={self.zoom_var.get() if self.zoom_var else 1.0}",
+                f"# mode={'replay' if self.replay_path else 'live'}",
+            ]
+            if self.replay_path:
+                hdr.append(f"# replay_file={self.replay_path}")
+                hdr.append(f"# speed={self.speed_var.get()}")
+                hdr.append(f"# replay_pos={self.replay_pos}/{len(self.replay_lines)}")
+            if self.save_path:
+                hdr.append(f"# auto_save_path={self.save_path}")
+            if len(self.devices) > 1:
+                hdr.append(f"# devices={','.join(d.title for d in self.devices.values())} (lines prefixed with [serial])")
+            if self.history.dropped > 0:
+                hdr.append(f"# NOTE: buffer_dropped_lines={self.history.dropped} (history spill to disk failed)")
+            # 세그먼트 파일을 그대로 이어 붙이므로 바이너리로 쓴다
+            with open(str(p), "wb") as f:
+                f.write(("\n".join(hdr) + "\n\n").encode("utf-8", errors="ignore"))
+                self.history.save_to(f)
         except Exception:
             # UI는 계속 동작
             return
 
-    def redraw(self):
-        self.canvas.delete("all")
-        cw = max(1, int(self.canvas.winfo_width()))
-        ch = max(1, int(self.canvas.winfo_height()))
-        self._last_canvas_size = (cw, ch)
-
-        s, ox, oy, _ = self._calc_transform()
-        x0, y0 = ox, oy
-        x1, y1 = ox + self.screen.w * s, oy + self.screen.h * s
-
-        # 폰 영역
-        self.canvas.create_rectangle(x0, y0, x1, y1, outline="#334155", width=2)
-
-        # 실시간 마커 표시(원)
-        if self.show_markers and self.markers:
-            try:
-                now2 = time.time()
-                for ms in list(self.markers.values()):
-                    # (요청) 300ms TTL
-                    if (now2 - ms.ts) > float(self.marker_ttl_sec):
-                        continue
-                    cx, cy = self._to_canvas(ms.x, ms.y)
-                    col = cat_color(ms.cat)
-                    r = 8
-                    self.canvas.create_oval(cx - r, cy - r, cx + r, cy + r, outline=col, width=2)
-                    # 카테고리 번호를 원 안에
-                    self.canvas.create_text(cx, cy, text=str(ms.cat), fill=col, font=("Segoe UI", 9, "bold"))
-                    # idx는 옆에 작게
-                    self.canvas.create_text(cx + r + 4, cy, text=str(ms.idx), fill="#cbd5e1", anchor="w", font=("Segoe UI", 9))
-            except Exception:
-                pass
-
-        # 범례(요청: 1~7 번호 원 + 이름)
+    def _draw_legend(self):
+        # 범례(요청: 1~7 번호 원 + 이름). 내용이 바뀌지 않으므로 한 번만 만든다(정적 레이어).
         try:
             lx = 12
             ly = 12
@@ -812,65 +5587,236 @@ class VisualizerApp:
                 cy = ly + (i - 1) * gap_y
                 cx = lx + r
                 col = cat_color(i)
+                tag = f"legend_c{i}"
                 # 원
-                self.canvas.create_oval(cx - r, cy - r, cx + r, cy + r, outline=col, width=2, fill="")
+                self.canvas.create_oval(
+                    cx - r, cy - r, cx + r, cy + r, outline=col, width=2, fill="", tags=("legend", tag, f"legend_o{i}")
+                )
                 # 숫자
-                self.canvas.create_text(cx, cy, text=str(i), fill=col, font=("Segoe UI", 10, "bold"))
+                self.canvas.create_text(
+                    cx, cy, text=str(i), fill=col, font=("Segoe UI", 10, "bold"), tags=("legend", tag, f"legend_n{i}")
+                )
                 # 라벨
-                self.canvas.create_text(cx + r + 6, cy, text=cat_name(i), fill="#e5e7eb", anchor="w", font=("Segoe UI", 10))
+                self.canvas.create_text(
+                    cx + r + 6,
+                    cy,
+                    text=cat_name(i),
+                    fill="#e5e7eb",
+                    anchor="w",
+                    font=("Segoe UI", 10),
+                    tags=("legend", tag, f"legend_t{i}"),
+                )
+                # (추가) 클릭하면 그 카테고리 표시/숨김(필터)
+                self.canvas.tag_bind(tag, "<ButtonRelease-1>", lambda _e, c=i: self.toggle_filter_cat(c))
         except Exception:
             pass
+        self._legend_drawn = True
+        self._refresh_legend()
+
+    def _dev_static(self, dev: DeviceState) -> Dict[str, int]:
+        # 기기별 정적 아이템(타일 경계/이름, 폰 영역). 위치만 coords 로 갱신한다.
+        items = self._dev_items.get(dev.serial)
+        if items is None:
+            items = {
+                "tile": self.canvas.create_rectangle(0, 0, 0, 0, outline="#1e293b", width=1, state="hidden"),
+                "title": self.canvas.create_text(
+                    0, 0, text="", fill="#94a3b8", anchor="ne", font=("Segoe UI", 9), state="hidden"
+                ),
+                "phone": self.canvas.create_rectangle(0, 0, 0, 0, outline="#334155", width=2, tags=("world",)),
+                # (추가) 필터 영역(기기 좌표 사각형)
+                "region": self.canvas.create_rectangle(
+                    0, 0, 0, 0, outline="#f8fafc", dash=(4, 2), width=1, state="hidden", tags=("world",)
+                ),
+            }
+            # 나중에 생긴 기기도 이벤트/마커 아래에 깔리게
+            for iid in items.values():
+                self.canvas.tag_lower(iid)
+            self._dev_items[dev.serial] = items
+        return items
+
+    def _draw_heat(self, dev: DeviceState, st: Dict[str, int], x0: float, y0: float, pw: float, ph: float):
+        # 누적 히트맵: 폰 영역 크기로 맞춘 이미지 1장(격자가 바뀌었을 때만 0.3초 간격으로 다시 만든다)
+        iid = st.get("heat")
+        if not self.heatmap_on or dev.heat is None:
+            if iid is not None:
+                self.canvas.itemconfigure(iid, state="hidden")
+            return
+        pw_i = max(1, min(4096, int(pw)))
+        ph_i = max(1, min(4096, int(ph)))
+        flt = self.filter if self.filter.active else None
+        key = (dev.heat.version, pw_i, ph_i, dev.screen.w, dev.screen.h, flt.version if flt else -1)
+        cached = self._heat_photos.get(dev.serial)
+        now = time.perf_counter()
+        stale = cached is None or cached[0][1:] != key[1:] or (cached[0][0] != key[0] and now - cached[2] >= 0.3)
+        if stale:
+            rgb = dev.heat.to_rgb_scaled(dev.screen.w, dev.screen.h, pw_i, ph_i, flt=flt)
+            ppm = b"P6 %d %d 255\n" % (pw_i, ph_i) + rgb.tobytes()
+            photo = tk.PhotoImage(data=ppm, format="PPM")
+            cached = (key, photo, now)
+            self._heat_photos[dev.serial] = cached
+        if iid is None:
+            iid = self.canvas.create_image(x0, y0, image=cached[1], anchor="nw", tags=("world",))
+            self.canvas.tag_lower(iid)
+            st["heat"] = iid
+        else:
+            self.canvas.coords(iid, x0, y0)
+            self.canvas.itemconfigure(iid, image=cached[1], state="normal")
+        if cached[0][0] != key[0]:
+            # 아직 반영 안 된 변경이 있으면 다음 tick 에 다시
+            self._need_redraw = True
 
-        # 이벤트
-        now = time.time()
-        for e in self.events:
-            age = now - e.ts
-            ttl = float(self.event_ttl_short_sec) if (getattr(e, "cat", 1) in self.event_ttl_short_cats) else float(self.keep_seconds)
-            ttl = max(0.05, ttl)
-            alpha = max(0.15, 1.0 - (age / ttl))
-            width = 2 if e.kind == "swipe" else 1
-            r = 6
-            cx, cy = self._to_canvas(*e.p0)
-            col = e.color
-
-            if e.kind == "tap":
-                rr = r + int(6 * (1.0 - alpha))
-                self.canvas.create_oval(cx - rr, cy - rr, cx + rr, cy + rr, outline=col, width=2)
-                self.canvas.create_oval(cx - 2, cy - 2, cx + 2, cy + 2, fill=col, outline=col)
+    def redraw(self):
+        t_redraw = time.perf_counter_ns()
+        cw = max(1, int(self.canvas.winfo_width()))
+        ch = max(1, int(self.canvas.winfo_height()))
+        self._last_canvas_size = (cw, ch)
+        if self._pool is None:
+            self._pool = CanvasItemPool(self.canvas)
+        if not self._legend_drawn:
+            self._draw_legend()
+        pool = self._pool
+        pool.begin()
+
+        # (추가) 기기별 타일(1대면 캔버스 전체). 타일마다 변환은 한 번만 계산한다.
+        tiles = self._tiles()
+        multi = len(tiles) > 1
+        flt = self.filter
+        filtering = flt.active
+        xforms = [(d, self._calc_transform(d, (tx, ty, tw, th)), (tx, ty, tw, th)) for (d, tx, ty, tw, th) in tiles]
+
+        for dev, (s, ox, oy, _), (tx, ty, tw, th) in xforms:
+            x0, y0 = ox, oy
+            x1, y1 = ox + dev.screen.w * s, oy + dev.screen.h * s
+            st = self._dev_static(dev)
+            if multi:
+                # 타일 경계 + 기기 이름/수신 속도
+                self.canvas.coords(st["tile"], tx, ty, tx + tw, ty + th)
+                self.canvas.coords(st["title"], tx + tw - 8, ty + 8)
+                self.canvas.itemconfigure(st["tile"], state="normal")
+                self.canvas.itemconfigure(
+                    st["title"], state="normal", text=f"{dev.title}  {dev.screen.w}x{dev.screen.h}  {dev.rate:.0f} l/s"
+                )
             else:
-                if e.p1 is None:
-                    continue
-                ex, ey = self._to_canvas(*e.p1)
-                self.canvas.create_line(cx, cy, ex, ey, fill=col, width=width + 1, arrow=tk.LAST)
-                self.canvas.create_oval(cx - 3, cy - 3, cx + 3, cy + 3, fill=col, outline=col)
+                self.canvas.itemconfigure(st["tile"], state="hidden")
+                self.canvas.itemconfigure(st["title"], state="hidden")
+
+            # 폰 영역
+            self.canvas.coords(st["phone"], x0, y0, x1, y1)
+            self._draw_heat(dev, st, x0, y0, x1 - x0, y1 - y0)
+            rg = flt.region
+            if rg is not None:
+                self.canvas.coords(st["region"], ox + rg[0] * s, oy + rg[1] * s, ox + rg[2] * s, oy + rg[3] * s)
+                self.canvas.itemconfigure(st["region"], state="normal")
+                self.canvas.tag_raise(st["region"])
+            else:
+                self.canvas.itemconfigure(st["region"], state="hidden")
+
+            # 실시간 마커 표시(원)
+            if self.show_markers and dev.markers:
+                try:
+                    now2 = self._now()
+                    for ms in list(dev.markers.values()):
+                        # (요청) 300ms TTL
+                        if (now2 - ms.ts) > float(self.marker_ttl_sec):
+                            continue
+                        if filtering and not flt.match(ms.cat, ms.idx, "marker", ms.x, ms.y):
+                            continue
+                        cx, cy = ox + ms.x * s, oy + ms.y * s
+                        col = cat_color(ms.cat)
+                        r = 8
+                        k = id(ms)
+                        pool.oval((k, 0), cx - r, cy - r, cx + r, cy + r, outline=col, width=2, fill="")
+                        # 카테고리 번호를 원 안에
+                        pool.text((k, 1), cx, cy, text=str(ms.cat), fill=col, font=("Segoe UI", 9, "bold"), anchor="center")
+                        # idx는 옆에 작게
+                        pool.text((k, 2), cx + r + 4, cy, text=str(ms.idx), fill="#cbd5e1", anchor="w", font=("Segoe UI", 9))
+                except Exception:
+                    pass
+
+        # 빠진 기기(재생 로드 등으로 상태가 비워진 경우)의 정적 아이템 정리
+        if len(self._dev_items) > len(self.devices):
+            for serial in [k for k in self._dev_items if k not in self.devices]:
+                for iid in self._dev_items.pop(serial).values():
+                    self.canvas.delete(iid)
 
+        # 이벤트
+        now = self._now()
+        for dev, (s, ox, oy, _), _tile in xforms:
+            for e in dev.events:
+                if filtering and not flt.match(e.cat, e.idx, e.kind, e.p0[0], e.p0[1]):
+                    continue
+                age = now - e.ts
+                ttl = float(self.event_ttl_short_sec) if (getattr(e, "cat", 1) in self.event_ttl_short_cats) else float(self.keep_seconds)
+                ttl = max(0.05, ttl)
+                alpha = max(0.15, 1.0 - (age / ttl))
+                width = 2 if e.kind == "swipe" else 1
+                r = 6
+                cx, cy = ox + e.p0[0] * s, oy + e.p0[1] * s
+                col = e.color
+                k = id(e)
+
+                if e.kind == "tap":
+                    rr = r + int(6 * (1.0 - alpha))
+                    pool.oval((k, 0), cx - rr, cy - rr, cx + rr, cy + rr, outline=col, width=2, fill="")
+                    pool.oval((k, 1), cx - 2, cy - 2, cx + 2, cy + 2, outline=col, width=1, fill=col)
+                else:
+                    if e.p1 is None:
+                        continue
+                    ex, ey = ox + e.p1[0] * s, oy + e.p1[1] * s
+                    pool.line((k, 0), cx, cy, ex, ey, fill=col, width=width + 1, arrow=tk.LAST)
+                    pool.oval((k, 1), cx - 3, cy - 3, cx + 3, cy + 3, outline=col, width=1, fill=col)
+
+            # (추가) 빨리감기 묶음: 격자칸마다 평균 위치에 도형 1개 + 개수(크기는 log2(개수)로 커짐)
+            for key, (cnt, sx, sy, sx2, sy2) in dev.agg.items():
+                kind = "swipe" if key[1] else "tap"
+                if filtering and not flt.match(key[0], key[2], kind, int(sx / cnt), int(sy / cnt)):
+                    continue
+                col = cat_color(key[0])
+                k = int(cnt).bit_length()
+                cx, cy = ox + sx / cnt * s, oy + sy / cnt * s
+                ak = ("agg", dev.serial, key)
+                if key[1]:
+                    ex, ey = ox + sx2 / cnt * s, oy + sy2 / cnt * s
+                    pool.line(ak + (0,), cx, cy, ex, ey, fill=col, width=min(8, 1 + k), arrow=tk.LAST)
+                    pool.oval(ak + (1,), cx - 3, cy - 3, cx + 3, cy + 3, outline=col, width=1, fill=col)
+                    tx, ty = (cx + ex) / 2, (cy + ey) / 2
+                else:
+                    rr = 6 + 2 * min(10, k)
+                    pool.oval(ak + (0,), cx - rr, cy - rr, cx + rr, cy + rr, outline=col, width=2, fill="")
+                    tx, ty = cx, cy
+                if cnt > 1:
+                    pool.text(ak + (2,), tx, ty, text=str(int(cnt)), fill=col, font=("Segoe UI", 8, "bold"), anchor="center")
+
+        pool.end()
+        # 툴팁이 떠 있으면 같은 포인터 위치로 다시 맞힌다(항목이 사라지거나 바뀐 경우)
+        if self._tip_key is not None:
+            self._update_hover()
         self._update_label()
         self._need_redraw = False
+        # metrics: 그리기 횟수/소요/보이는 아이템 수(범례 21개 + 기기별 정적 아이템 + 풀)
+        dt = time.perf_counter_ns() - t_redraw
+        self._redraws += 1
+        self._redraw_ns += dt
+        self._redraw_last_ns = dt
+        self._redraw_items = 21 + sum(len(v) for v in self._dev_items.values()) + pool.live
 
     def on_speed_change(self, _v=None):
-        m = re.match(r"^\s*([0-9]+(?:\.[0-9]+)?)x\s*$", self.speed_var.get().strip())
-        sp = 1.0
-        if m:
-            try:
-                sp = float(m.group(1))
-            except Exception:
-                sp = 1.0
-        # (요청) 1~10x 느리게
-        sp = max(1.0, min(10.0, sp))
+        # "Nx" 1~10배 느리게 / "ffNx" 1~100배 빠르게 / "max"
+        rate = parse_replay_speed(self.speed_var.get())
         # 런타임 변경 시에도 자연스럽게 이어지도록 기준을 재설정
         if self.replay_path and self.replay_lines:
             now = time.perf_counter()
             sim_now = self._replay_sim_time(now)
             self.replay_start_real = now
             self.replay_start_sim = sim_now
-        self.replay_slow = sp
+        self.replay_rate = rate
         self._need_redraw = True
 
     def _replay_sim_time(self, now_real: float) -> float:
-        if not self.replay_running:
+        # max 는 벽시계와 무관하게 _feed_replay 가 처리한 위치까지만 진행한다
+        if not self.replay_running or self.replay_rate == math.inf:
             return self.replay_start_sim
-        # 느리게: 실제 시간 / slow_factor 만큼만 시뮬 시간 진행
-        return self.replay_start_sim + (now_real - self.replay_start_real) / max(1e-6, self.replay_slow)
+        return self.replay_start_sim + (now_real - self.replay_start_real) * self.replay_rate
 
     def toggle_replay(self):
         if not self.replay_path or not self.replay_lines:
@@ -894,6 +5840,14 @@ class VisualizerApp:
         self.replay_pos = 0
         self.replay_start_sim = 0.0
         self.replay_start_real = time.perf_counter()
+        # 재생 시계가 0으로 돌아가므로 이전 상태는 비운다
+        self.events.clear()
+        self.dev.agg.clear()
+        self.markers.clear()
+        self.dev.spatial.clear()
+        if self.dev.heat is not None:
+            self.dev.heat.clear()
+        self.timing.reset()
         self.replay_running = True
         self.btn_replay.config(text="일시정지")
         self._need_redraw = True
@@ -902,7 +5856,12 @@ class VisualizerApp:
         try:
             path = filedialog.askopenfilename(
                 title="저장된 로그 파일 선택",
-                filetypes=[("Text log", "*.txt"), ("All files", "*.*")],
+                filetypes=[
+                    ("Text log", "*.txt"),
+                    ("Compressed log", "*.gz *.zst"),
+                    ("ATX recording", "*.atxrec"),
+                    ("All files", "*.*"),
+                ],
             )
         except Exception:
             path = ""
@@ -911,39 +5870,119 @@ class VisualizerApp:
         self.load_replay(path)
 
     def load_replay(self, path: str):
-        lines = load_replay_lines(path)
+        old = self.replay_lines
+        if isinstance(old, (AtxRecReplay, LazyLogReplay)):
+            old.close()
+        lines: Sequence[Tuple[float, str]]
+        if path.lower().endswith(".atxrec"):
+            try:
+                lines = AtxRecReplay(path, self.replay_max_gap)
+            except Exception as e:
+                print(f"[WARN] .atxrec 를 열 수 없습니다: path={path} err={e}", file=sys.stderr)
+                lines = []
+        else:
+            # (추가) 텍스트/압축 로그는 지연 로딩: 앞부분 인덱싱이 끝나면 바로 재생 시작
+            try:
+                lines = LazyLogReplay(path, self.replay_max_gap)
+                lines.wait_ready(0.5)
+            except Exception as e:
+                print(f"[WARN] 로그를 열 수 없습니다: path={path} err={e}", file=sys.stderr)
+                lines = []
         self.replay_path = path
         self.replay_lines = lines
+        # 재생은 로그 기준 시계를 쓰므로 라이브(벽시계)로 찍힌 상태는 비운다
+        for d in self.devices.values():
+            d.events.clear()
+            d.agg.clear()
+            d.markers.clear()
+            d.spatial.clear()
+            if d.heat is not None:
+                d.heat.clear()
+                # 재생은 로그 길이가 정해져 있으므로 점 목록 상한을 두지 않는다
+                d.heat.max_points = None
+        self.timing.reset()
+        # (추가) 상대초 배열 캐시 + seek 체크포인트(백그라운드)
+        if self._replay_index is not None:
+            self._replay_index.stop()
+        self._replay_index = ReplayIndex(
+            lines, ScreenSize(self.dev.screen.w, self.dev.screen.h), self.keep_seconds, self.marker_ttl_sec, self.max_events
+        )
+        self._replay_index.start()
+        self._update_filter_label()
+        # 타임라인 개요: 인덱싱이 끝나면 그려진다(그 전까지는 빈 띠)
+        if not self._overview_shown:
+            self.overview_canvas.pack(side=tk.BOTTOM, fill=tk.X)
+            self._overview_shown = True
+        self._overview_key = None
+        if self._overview_items is not None:
+            self.overview_canvas.itemconfigure(self._overview_items[0], state="hidden")
         self.replay_pos = 0
         self.replay_start_sim = 0.0
         self.replay_start_real = time.perf_counter()
-        self.replay_total_sim = float(lines[-1][0]) if lines else 0.0
+        self._update_replay_total()
+        self._replay_total_final = False
         # 자동 재생 시작
-        self.replay_running = True if lines else False
+        self.replay_running = True if (lines or not getattr(lines, "done", True)) else False
         self.btn_replay.config(text="일시정지" if self.replay_running else "재생")
         self._need_redraw = True
 
+    def _update_replay_total(self):
+        # 전체 재생 길이(지연 로딩 중에는 지금까지 인덱싱된 마지막 라인 기준으로 늘어남)
+        src = self.replay_lines
+        n = len(src) if src else 0
+        if n <= 0:
+            self.replay_total_sim = 0.0
+            return
+        times = getattr(src, "times", None)
+        self.replay_total_sim = float(times[n - 1]) if times is not None else float(src[n - 1][0])
+
     def _feed_replay(self):
         if not self.replay_running or not self.replay_lines:
             return
         now = time.perf_counter()
-        sim = self._replay_sim_time(now)
-        # sim 시점까지의 라인을 한 번에 처리
-        while self.replay_pos < len(self.replay_lines) and self.replay_lines[self.replay_pos][0] <= sim:
-            _t, line = self.replay_lines[self.replay_pos]
+        rate = self.replay_rate
+        fast = rate == math.inf
+        sim = math.inf if fast else self._replay_sim_time(now)
+        # (추가) 이번 프레임이 덮는 로그 시간이 짧은 TTL 보다 길면, 그 사이 이벤트는 어차피 한 프레임도
+        # 못 보고 사라지므로 개별 도형 대신 격자칸별 묶음으로 그린다(프레임마다 새로 시작).
+        frame_real = min(0.25, max(0.001, now - self._last_feed_real))
+        self._last_feed_real = now
+        coalesce = fast or frame_real * rate >= float(self.event_ttl_short_sec)
+        if coalesce or self._coalesce:
+            for d in self.devices.values():
+                if d.agg:
+                    d.agg.clear()
+                    self._need_redraw = True
+        self._coalesce = coalesce
+        # sim 시점까지의 라인을 처리하되 tick 시간 예산을 넘기지 않는다(빨리감기/최대 속도의 CPU 상한)
+        deadline = now + max(1.0, float(self.tick_budget_ms)) / 1000.0
+        times = self._replay_times()
+        n = len(self.replay_lines)
+        while self.replay_pos < n and times[self.replay_pos] <= sim:
+            pos = self.replay_pos
             self.replay_pos += 1
-            # 큐에 넣지 않고, 동일 처리 파이프를 직접 사용
-            self._process_line_impl(line, do_io=False)
-        if self.replay_pos >= len(self.replay_lines):
+            self._process_replay_pos(pos)
+            if not (pos & 255) and time.perf_counter() >= deadline:
+                break
+        if fast or (self.replay_pos < n and times[self.replay_pos] <= sim):
+            # 예산 안에 못 따라간 만큼은 건너뛰지 않고 늦춘다: 처리한 곳을 현재 재생 시각으로 삼는다
+            if self.replay_pos > 0:
+                self.replay_start_sim = float(times[self.replay_pos - 1])
+            self.replay_start_real = time.perf_counter()
+        if self.replay_pos >= len(self.replay_lines) and getattr(self.replay_lines, "done", True):
             # 끝나면 자동 pause
             self.replay_running = False
             self.btn_replay.config(text="재생")
             self._need_redraw = True
 
-    def _process_line(self, line: str):
-        self._process_line_impl(line, do_io=True)
+    def _process_line(self, line: str, dev: Optional[DeviceState] = None):
+        self._process_line_impl(line, do_io=True, dev=dev)
 
     def tick(self):
+        pf = self.profiler
+        if pf is not None:
+            pf.begin()
+            merged0 = self._merged_lines
         # (seek) rebuild 처리(슬라이더로 시간 이동)
         if self._rebuild_active and self.replay_lines:
             try:
@@ -951,9 +5990,9 @@ class VisualizerApp:
                 chunk = 4000
                 end = min(self._rebuild_target_pos, self._rebuild_pos + chunk)
                 while self._rebuild_pos < end:
-                    _t, line = self.replay_lines[self._rebuild_pos]
+                    pos = self._rebuild_pos
                     self._rebuild_pos += 1
-                    self._process_line_impl(line, do_io=False)
+                    self._process_replay_pos(pos, size_only=pos < self._rebuild_skip_until)
                 if self._rebuild_pos >= self._rebuild_target_pos:
                     # 완료: 재생 기준 재설정
                     self.replay_pos = self._rebuild_target_pos
@@ -970,47 +6009,281 @@ class VisualizerApp:
             except Exception:
                 # rebuild 실패 시 중단
                 self._rebuild_active = False
+        if pf is not None:
+            pf.mark(0)
 
         # (재생) 먼저 재생 라인 공급
+        if self.replay_lines and not self._replay_total_final:
+            self._update_replay_total()
+            self._replay_total_final = bool(getattr(self.replay_lines, "done", True))
         self._feed_replay()
+        if pf is not None:
+            pf.mark(1)
 
         # (요청) 마커 TTL 정리(300ms)
         self._prune_markers()
-
-        # 입력 처리
-        while True:
+        if pf is not None:
+            pf.mark(2)
+
+        # 입력 처리(기기 시리얼이 붙은 라인). 시간 예산 안에서만 비워 redraw 주기를 지킨다.
+        deadline = time.perf_counter() + max(1.0, float(self.tick_budget_ms)) / 1000.0
+        pw = self._parse_worker
+        if pw is not None:
+            # 파싱 스레드가 만든 묶음만 합친다
+            while time.perf_counter() < deadline:
+                try:
+                    counts, items = pw.out.get_nowait()
+                except queue.Empty:
+                    break
+                for serial, n in counts.items():
+                    self._dev_for(serial).lines_total += n
+                    self._merged_lines += n
+                for serial, line, rec in items:
+                    self._apply_record(rec, self._dev_for(serial))
+                    if rec.idx:
+                        self.timing.feed(line, rec, serial)
+            # lag = 원본 링에 남은 라인 + 파싱은 끝났지만 아직 합치지 않은 라인
+            self._ingest_lag = int(self.q.qsize()) + max(0, pw.lines - pw.dropped_lines - self._merged_lines)
+        else:
+            while True:
+                try:
+                    serial, line = self.q.get_nowait()[:2]
+                except queue.Empty:
+                    break
+
+                dev = self._dev_for(serial)
+                dev.lines_total += 1
+                self._process_line_impl(line, do_io=True, dev=dev)
+                if time.perf_counter() >= deadline:
+                    break
             try:
-                line = self.q.get_nowait()
-            except queue.Empty:
-                break
-
-            self._process_line(line)
+                self._ingest_lag = int(self.q.qsize())
+            except Exception:
+                self._ingest_lag = 0
+        if pf is not None:
+            pf.mark(3)
+
+        # 이벤트 TTL/개수 정리(tick당 1회)
+        for d in self.devices.values():
+            if d.events:
+                n0 = len(d.events)
+                self._prune(d)
+                if len(d.events) != n0:
+                    self._need_redraw = True
+        if pf is not None:
+            pf.mark(4)
+
+        # 기기별 수신 속도(1초 단위)
+        now_w = time.time()
+        for d in self.devices.values():
+            d.update_rate(now_w)
+        # (추가) 재생 인덱스가 끝나 개요가 생기면 한 번 그린다
+        ri = self._replay_index
+        if ri is not None and ri.overview is not None and self._overview_key is None:
+            self._refresh_overview()
+        # (추가) 필터 일치 건수는 1초마다 갱신(인덱싱이 끝나 행 수가 그대로면 캐시 사용)
+        if self.filter.active and self._replay_index is not None and (now_w - self._filter_lbl_t) >= 1.0:
+            self._filter_lbl_t = now_w
+            self._update_filter_label()
+        if self._timing_tree is not None:
+            self._refresh_timing_panel()
+        if self.metrics is not None and (now_w - self._metrics_t) >= 1.0:
+            self._metrics_t = now_w
+            try:
+                self.metrics.update(self._metrics_families())
+            except Exception as e:
+                print(f"[WARN] metrics 갱신 실패: {e}", file=sys.stderr)
 
         # 캔버스 크기 변화
         cw = max(1, int(self.canvas.winfo_width()))
         ch = max(1, int(self.canvas.winfo_height()))
         if (cw, ch) != self._last_canvas_size:
             self._need_redraw = True
+        if pf is not None:
+            pf.mark(5)
 
         if self._need_redraw:
             self.redraw()
+        if pf is not None:
+            pf.mark(6)
+            pf.end(self._merged_lines - merged0)
+            if pf.n % 5 == 0:
+                self._draw_profile_overlay()
+        if self._cprof is not None and time.perf_counter() >= self._cprof_until:
+            self._stop_cprofile()
 
         self.root.after(30, self.tick)
 
-    def on_close(self):
-        # 파일 flush/close 후 종료
+    def _draw_profile_overlay(self):
+        # 우하단 작은 frame-time 그래프(최근 150 tick 합계, 점선=30ms tick 주기) + 요약
+        pf = self.profiler
+        if pf is None:
+            return
+        cw = max(1, int(self.canvas.winfo_width()))
+        ch = max(1, int(self.canvas.winfo_height()))
+        gw, gh = 240, 70
+        x0, y0 = cw - gw - 10, ch - gh - 10
+        it = self._overlay_items
+        if it is None:
+            it = {
+                "bg": self.canvas.create_rectangle(0, 0, 0, 0, fill="#111827", outline="#334155", tags=("overlay",)),
+                "budget": self.canvas.create_line(0, 0, 0, 0, fill="#64748b", dash=(2, 2), tags=("overlay",)),
+                "graph": self.canvas.create_line(0, 0, 0, 0, fill="#22c55e", width=1, tags=("overlay",)),
+                "text": self.canvas.create_text(
+                    0, 0, text="", fill="#e5e7eb", anchor="nw", font=("Consolas", 8), tags=("overlay",)
+                ),
+            }
+            self._overlay_items = it
+        totals = pf.recent("total", 150)
+        scale_ms = 60.0
+        self.canvas.coords(it["bg"], x0, y0, x0 + gw, y0 + gh)
+        yb = y0 + gh - min(1.0, 30.0 / scale_ms) * (gh - 16)
+        self.canvas.coords(it["budget"], x0, yb, x0 + gw, yb)
+        pts: List[float] = []
+        if len(totals) >= 2:
+            step = gw / 149.0
+            for i, v in enumerate(totals):
+                pts.append(x0 + i * step)
+                pts.append(y0 + gh - min(1.0, v / 1e6 / scale_ms) * (gh - 16))
+            self.canvas.coords(it["graph"], *pts)
+        srt = sorted(totals)
+        if srt:
+            p50 = srt[len(srt) // 2] / 1e6
+            p95 = srt[min(len(srt) - 1, int(len(srt) * 0.95))] / 1e6
+            k = (pf.n - 1) % pf.size
+            worst = max(TickProfiler.PHASES, key=lambda c: pf.cols[c][k])
+            gap = pf.cols["gap"][k] / 1e6
+            cp = "  [cProfile]" if self._cprof is not None else ""
+            self.canvas.itemconfigure(
+                it["text"], text=f"tick p50 {p50:.1f} p95 {p95:.1f} max {srt[-1] / 1e6:.1f}ms  gap {gap:.0f}ms\n최근 최장: {worst}{cp}"
+            )
+        self.canvas.coords(it["text"], x0 + 4, y0 + 2)
+        self.canvas.tag_raise("overlay")
+
+    def toggle_cprofile(self, _ev=None):
+        # F9: UI 스레드 cProfile 을 profile_seconds 동안 기록(다시 누르면 즉시 종료)
+        if self._cprof is not None:
+            self._stop_cprofile()
+            return
+        import cProfile
+
+        self._cprof = cProfile.Profile()
+        self._cprof_until = time.perf_counter() + float(self.profile_seconds)
+        self._cprof.enable()
+        print(f"[profile] cProfile 시작({self.profile_seconds:g}s)", file=sys.stderr)
+
+    def _stop_cprofile(self):
+        prof = self._cprof
+        self._cprof = None
+        if prof is None:
+            return
+        prof.disable()
+        import pstats
+
+        base = Path(self.profile_out).with_suffix("") if self.profile_out else Path(__file__).resolve().parent / "logs" / "atx_profile"
+        path = f"{base}_{time.strftime('%Y%m%d_%H%M%S')}.prof"
         try:
-            if self.save_fp:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            prof.dump_stats(path)
+            print(f"[profile] cProfile 저장: {path}", file=sys.stderr)
+        except Exception as e:
+            print(f"[WARN] cProfile 저장 실패: path={path} err={e}", file=sys.stderr)
+        pstats.Stats(prof, stream=sys.stderr).sort_stats("cumulative").print_stats(25)
+
+    def _metrics_families(self):
+        devs = list(self.devices.values())
+
+        def per_dev(fn):
+            return [({"serial": d.title}, fn(d)) for d in devs]
+
+        pw = self._parse_worker
+        q_dropped = int(getattr(self.q, "dropped", 0) or 0)
+        fams = [
+            ("atx_lines", "counter", "Lines ingested per source", per_dev(lambda d: d.lines_total)),
+            ("atx_lines_per_second", "gauge", "Ingest rate per source (1s window)", per_dev(lambda d: d.rate)),
+            ("atx_ingest_queue_depth", "gauge", "Raw lines waiting in the ingest ring", [({}, self.q.qsize())]),
+            ("atx_ingest_lag_lines", "gauge", "Lines received but not yet drawn", [({}, self._ingest_lag)]),
+            (
+                "atx_ingest_dropped_lines",
+                "counter",
+                "Lines skipped for display when rings overflowed (still saved)",
+                [({"stage": "raw"}, q_dropped), ({"stage": "parsed"}, pw.dropped_lines if pw is not None else 0)],
+            ),
+            ("atx_events_live", "gauge", "Events currently displayed", per_dev(lambda d: len(d.events))),
+            ("atx_markers_live", "gauge", "Markers currently displayed", per_dev(lambda d: len(d.markers))),
+            ("atx_redraws", "counter", "Canvas redraws", [({}, self._redraws)]),
+            ("atx_redraw_seconds", "counter", "Time spent in redraw", [({}, self._redraw_ns / 1e9)]),
+            ("atx_redraw_last_seconds", "gauge", "Duration of the last redraw", [({}, self._redraw_last_ns / 1e9)]),
+            ("atx_canvas_items", "gauge", "Visible canvas items after the last redraw", [({}, self._redraw_items)]),
+            ("atx_save_bytes", "counter", "Bytes written to the save log", per_dev(lambda d: d.save_fp.bytes if d.save_fp else 0)),
+            ("atx_save_flushes", "counter", "Save log flushes", per_dev(lambda d: d.save_fp.flushes if d.save_fp else 0)),
+            (
+                "atx_save_flush_seconds",
+                "counter",
+                "Time spent flushing the save log",
+                per_dev(lambda d: d.save_fp.flush_ns / 1e9 if d.save_fp else 0),
+            ),
+            (
+                "atx_save_flush_last_seconds",
+                "gauge",
+                "Duration of the last save log flush",
+                per_dev(lambda d: d.save_fp.flush_last_ns / 1e9 if d.save_fp else 0),
+            ),
+            ("atx_save_pending_lines", "gauge", "Lines waiting for the save log writer", per_dev(lambda d: d.save_fp.pending if d.save_fp else 0)),
+            ("atx_save_rotations", "counter", "Save log file rotations", per_dev(lambda d: d.save_fp.rotations if d.save_fp else 0)),
+            ("atx_snapshot_buffer_dropped_lines", "counter", "Lines dropped from the snapshot buffer", [({}, self.history.dropped)]),
+            ("atx_snapshot_history_lines", "counter", "Lines kept for snapshot saving", [({}, self.history.lines)]),
+            ("atx_snapshot_history_disk_bytes", "gauge", "Snapshot history bytes spilled to disk", [({}, self.history.disk_bytes)]),
+        ]
+        if pw is not None:
+            fams.append(("atx_parse_lines", "counter", "Lines classified by the parse thread", [({}, pw.lines)]))
+            fams.append(("atx_parse_seconds", "counter", "Time spent in classify_line", [({}, pw.parse_ns / 1e9)]))
+            fams.append(("atx_persist_seconds", "counter", "Time spent persisting lines in the parse thread", [({}, pw.persist_ns / 1e9)]))
+            fams.append(
+                (
+                    "atx_parse_seconds_per_line",
+                    "gauge",
+                    "Average classify_line time per line",
+                    [({}, pw.parse_ns / 1e9 / pw.lines if pw.lines else 0.0)],
+                )
+            )
+        return fams
+
+    def on_close(self):
+        if self.metrics is not None:
+            self.metrics.stop()
+        if self._cprof is not None:
+            self._stop_cprofile()
+        if self.profiler is not None and self.profile_out:
+            try:
+                Path(self.profile_out).parent.mkdir(parents=True, exist_ok=True)
+                n = self.profiler.write_csv(self.profile_out)
+                print(f"[profile] tick {n}개 저장: {self.profile_out}", file=sys.stderr)
+            except Exception as e:
+                print(f"[WARN] profile CSV 저장 실패: path={self.profile_out} err={e}", file=sys.stderr)
+        # 파싱 스레드를 먼저 멈추고, 남은 원본 라인은 저장만 해 둔다
+        pw = self._parse_worker
+        if pw is not None:
+            pw.stop()
+            pw.join(timeout=1.0)
+            for item in self.q.get_many(self.q.maxlen, timeout=0.0):
+                self._persist_serial_line(item[0], item[1], item[2] if len(item) > 2 else classify_line(item[1]))
+        if self.catalog is not None:
+            self.catalog.close()
+        # 파일 flush/close 후 종료(기기별 저장 파일 모두)
+        for d in self.devices.values():
+            if d.rec_writer is not None:
                 try:
-                    self.save_fp.flush()
+                    d.rec_writer.close()
                 except Exception:
                     pass
+            # LogWriter.close: 남은 라인 기록 + 압축 마무리까지 기다린다
+            if d.save_fp:
                 try:
-                    self.save_fp.close()
+                    d.save_fp.close()
                 except Exception:
                     pass
-        except Exception:
-            pass
+        self.history.close()
         self.root.destroy()
 
     def run(self):
@@ -1018,12 +6291,193 @@ class VisualizerApp:
         self.root.mainloop()
 
 
-def reader_from_stdin(q: "queue.Queue[str]"):
+class CompareView:
+    """
+    (--compare-view) 런 비교 창.
+    - 위: 요약 한 줄(사이클 길이 변화, 누락/추가 실행)
+    - 왼쪽 캔버스: 사이클 길이 추이(A/B 겹침) + idx별 좌우 막대(왼쪽 A, 오른쪽 B 의 실행 간격 p50)
+    - 오른쪽 표: idx별 비교(머리글 클릭 = 정렬). 캔버스 행/표 행 선택이 서로 따라간다.
+    """
+
+    ROW_H = 18
+    TREND_H = 70
+    CANVAS_W = 560
+    COLOR_A = "#60a5fa"
+    COLOR_B = "#f97316"
+    # 표에 보이는 열(전체 열은 --compare-out)
+    VIEW = [
+        ("idx", "idx", 44),
+        ("cat", "cat", 36),
+        ("n_a", "A 실행", 60),
+        ("n_b", "B 실행", 60),
+        ("missing", "누락", 48),
+        ("extra", "추가", 48),
+        ("first_diff_cycle", "첫 차이", 56),
+        ("interval_a", "간격A", 60),
+        ("interval_b", "간격B", 60),
+        ("interval_delta", "Δ간격", 56),
+        ("offset_delta_p50", "Δ위치p50", 70),
+        ("offset_delta_p95", "Δ위치p95", 70),
+        ("latency_delta", "Δ지연", 56),
+    ]
+
+    def __init__(self, res: dict, master=None):
+        _require_tk()
+        self.res = res
+        self.rows: List[dict] = list(res["rows"])
+        s = res["summary"]
+        self.root = tk.Toplevel(master) if master is not None else tk.Tk()
+        self.root.title(f"런 비교: A={Path(s['a']).name}  B={Path(s['b']).name}")
+        self.root.geometry("1280x720")
+        tk.Label(self.root, text=compare_summary_text(s), anchor="w").pack(side=tk.TOP, fill=tk.X, padx=6, pady=4)
+        body = tk.Frame(self.root)
+        body.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        left = tk.Frame(body)
+        left.pack(side=tk.LEFT, fill=tk.Y)
+        self.canvas = tk.Canvas(left, width=self.CANVAS_W, bg="#0b1220", highlightthickness=0)
+        csb = tk.Scrollbar(left, orient=tk.VERTICAL, command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=csb.set)
+        csb.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, fill=tk.Y, expand=True)
+        cols = [c for (c, _t, _w) in self.VIEW]
+        self.tree = ttk.Treeview(body, columns=cols, show="headings")
+        for c, title, w in self.VIEW:
+            self.tree.heading(c, text=title, command=lambda c=c: self.sort_by(c))
+            self.tree.column(c, width=w, anchor="e")
+        tsb = tk.Scrollbar(body, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=tsb.set)
+        tsb.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.canvas.bind("<Button-1>", self.on_canvas_click)
+        self.canvas.bind("<MouseWheel>", lambda e: self.canvas.yview_scroll(-1 if e.delta > 0 else 1, "units"))
+        self.tree.bind("<<TreeviewSelect>>", self.on_tree_select)
+        self._rows_top = 0
+        self._sort = ("idx", False)
+        self._sel_rect: Optional[int] = None
+        self.draw()
+        self.fill_tree()
+
+    def _trend(self, vals: List[float], x0: float, x1: float, y0: float, y1: float, vmax: float, color: str):
+        """사이클 길이 목록 → 폭에 맞춰 칸별 평균을 낸 꺾은선."""
+        n = len(vals)
+        if n < 2 or vmax <= 0:
+            return
+        w = max(2, int(x1 - x0))
+        v = np.asarray(vals, dtype=np.float64)
+        if n > w:
+            edges = (np.arange(w) * n) // w
+            v = np.add.reduceat(v, edges) / np.diff(np.append(edges, n))
+        xs = x0 + np.arange(v.size) * ((x1 - x0) / max(1, v.size - 1))
+        ys = y1 - np.minimum(v / vmax, 1.0) * (y1 - y0)
+        self.canvas.create_line(*np.column_stack((xs, ys)).ravel().tolist(), fill=color, width=1)
+
+    def draw(self):
+        cv = self.canvas
+        cv.delete("all")
+        self._sel_rect = None
+        s = self.res["summary"]
+        W, rh = self.CANVAS_W, self.ROW_H
+        cv.create_text(6, 10, text=f"A {Path(s['a']).name}", fill=self.COLOR_A, anchor="w", font=("Segoe UI", 9, "bold"))
+        cv.create_text(W - 6, 10, text=f"B {Path(s['b']).name}", fill=self.COLOR_B, anchor="e", font=("Segoe UI", 9, "bold"))
+        # 사이클 길이 추이(A/B 같은 축, 튀는 값은 p95*1.5 로 자름)
+        ty0, ty1 = 24, 24 + self.TREND_H
+        cv.create_rectangle(4, ty0, W - 4, ty1, outline="#334155")
+        both = list(self.res.get("cycles_a") or []) + list(self.res.get("cycles_b") or [])
+        if both:
+            vmax = float(np.percentile(both, 95)) * 1.5
+            for key, col in (("cycles_a", self.COLOR_A), ("cycles_b", self.COLOR_B)):
+                self._trend(self.res.get(key) or [], 6, W - 6, ty0 + 4, ty1 - 2, vmax, col)
+            cv.create_text(8, ty0 + 8, text=f"사이클 길이 ≤{vmax:.0f}ms", fill="#94a3b8", anchor="w", font=("Segoe UI", 8))
+        # idx별 좌우 막대: 가운데 idx, 왼쪽 A 간격, 오른쪽 B 간격(느려지면 빨강, 빨라지면 초록)
+        top = ty1 + 22
+        cx = W / 2
+        half = cx - 22 - 90
+        vals = [r[k] for r in self.rows for k in ("interval_a", "interval_b") if r[k] is not None]
+        vmax = max(vals) if vals else 1.0
+        cv.create_text(cx - 26, top - 9, text="간격 p50 (ms) ◀ A", fill="#94a3b8", anchor="e", font=("Segoe UI", 8))
+        cv.create_text(cx + 26, top - 9, text="B ▶", fill="#94a3b8", anchor="w", font=("Segoe UI", 8))
+        font = ("Consolas", 9)
+        for i, r in enumerate(self.rows):
+            y = top + i * rh
+            ym = y + rh / 2
+            ia, ib, d = r["interval_a"], r["interval_b"], r["interval_delta"]
+            cv.create_text(cx, ym, text=str(r["idx"]), fill=cat_color(r["cat"]) if r["cat"] else "#e5e7eb", font=font)
+            if ia is not None:
+                cv.create_rectangle(cx - 22 - half * ia / vmax, y + 3, cx - 22, y + rh - 3, fill=self.COLOR_A, width=0)
+                cv.create_text(cx - 26 - half * ia / vmax, ym, text=f"{ia:g}", fill="#cbd5e1", anchor="e", font=font)
+            if ib is not None:
+                col = self.COLOR_B
+                if d is not None and ia:
+                    col = "#ef4444" if d > ia * 0.02 else ("#22c55e" if d < -ia * 0.02 else col)
+                cv.create_rectangle(cx + 22, y + 3, cx + 22 + half * ib / vmax, y + rh - 3, fill=col, width=0)
+                txt = f"{ib:g}" if d is None else f"{ib:g} ({d:+g})"
+                cv.create_text(cx + 26 + half * ib / vmax, ym, text=txt, fill="#cbd5e1", anchor="w", font=font)
+            if r["missing"] or r["extra"]:
+                cv.create_text(W - 4, ym, text=f"-{r['missing']} +{r['extra']}", fill="#f87171", anchor="e", font=font)
+        self._rows_top = top
+        cv.configure(scrollregion=(0, 0, W, top + len(self.rows) * rh + 8))
+
+    def fill_tree(self):
+        tree = self.tree
+        tree.delete(*tree.get_children())
+        for r in self.rows:
+            tree.insert("", tk.END, iid=str(r["idx"]), values=["" if r.get(c) is None else r.get(c) for (c, _t, _w) in self.VIEW])
+
+    def sort_by(self, col: str):
+        """표 머리글 클릭: 그 열로 정렬(다시 누르면 반대로). 캔버스 행 순서도 같이 바꾼다."""
+        rev = not self._sort[1] if self._sort[0] == col else col != "idx"
+        self._sort = (col, rev)
+        filled = [r for r in self.rows if r.get(col) is not None]
+        empty = [r for r in self.rows if r.get(col) is None]
+        self.rows = sorted(filled, key=lambda r: (r[col], r["idx"]), reverse=rev) + empty
+        self.draw()
+        self.fill_tree()
+
+    def on_canvas_click(self, ev):
+        i = int((self.canvas.canvasy(ev.y) - self._rows_top) // self.ROW_H)
+        if 0 <= i < len(self.rows):
+            iid = str(self.rows[i]["idx"])
+            self.tree.selection_set(iid)
+            self.tree.see(iid)
+
+    def on_tree_select(self, _ev=None):
+        sel = self.tree.selection()
+        if not sel:
+            return
+        i = next((k for k, r in enumerate(self.rows) if str(r["idx"]) == sel[0]), None)
+        if i is None:
+            return
+        y = self._rows_top + i * self.ROW_H
+        if self._sel_rect is not None:
+            self.canvas.delete(self._sel_rect)
+        self._sel_rect = self.canvas.create_rectangle(2, y, self.CANVAS_W - 2, y + self.ROW_H, outline="#facc15")
+        total = self._rows_top + len(self.rows) * self.ROW_H + 8
+        self.canvas.yview_moveto(max(0.0, (y - 120) / total))
+
+    def run(self):
+        self.root.mainloop()
+
+
+def reader_from_stdin(q: "queue.Queue[Tuple[str, str]]"):
     for line in sys.stdin:
-        q.put(line.rstrip("\n"))
+        q.put(("", line.rstrip("\n")))
+
+
+def list_adb_devices() -> List[str]:
+    # `adb devices` 에서 state=device 인 시리얼만
+    try:
+        out = subprocess.check_output(["adb", "devices"], stderr=subprocess.STDOUT, text=True, encoding="utf-8", errors="ignore")
+    except Exception:
+        return []
+    serials: List[str] = []
+    for ln in out.splitlines()[1:]:
+        parts = ln.split()
+        if len(parts) >= 2 and parts[1] == "device":
+            serials.append(parts[0])
+    return serials
 
 
-def reader_from_adb(q: "queue.Queue[str]", serial: Optional[str], tags: List[str]):
+def reader_from_adb(q: "queue.Queue[Tuple[str, str]]", serial: Optional[str], tags: List[str]):
     # 기본: ScreenCaptureService/AutoClickAccessibilityService만 INFO 이상
     # 예) adb logcat -v time ScreenCaptureService:I AutoClickAccessibilityService:I *:S
     cmd = ["adb"]
@@ -1037,15 +6491,405 @@ def reader_from_adb(q: "queue.Queue[str]", serial: Optional[str], tags: List[str
 
     p = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, encoding="utf-8", errors="ignore")
     assert p.stdout is not None
+    key = serial or ""
     for line in p.stdout:
-        q.put(line.rstrip("\n"))
+        q.put((key, line.rstrip("\n")))
+
+
+# ---------------------------------------------------------------------------
+# 네트워크 수집기(--serve / --connect): adb 가 꽂힌 PC 에서 파싱해 다른 PC 의 뷰어로 보낸다
+# ---------------------------------------------------------------------------
+
+NET_MAGIC = b"ATXN"
+# 프레임 헤더: magic, 종류, 압축, 시리얼 길이, 레코드 수, 본문 길이 (뒤에 시리얼 bytes + 본문)
+NET_HEAD = struct.Struct("<4sBBHII")
+NET_HELLO = 1  # 본문 = JSON(기기 시리얼/화면 크기), 접속 직후 1번
+NET_RECORDS = 2  # 본문 = pack_record 레코드를 이어 붙인 것(압축 가능)
+NET_CODECS = {"none": 0, "zlib": 1, "zst": 2}
+NET_DEFAULT_PORT = 28460
+NET_BATCH_MS = 50.0  # 이 시간 동안 모은 라인을 기기별 프레임 1개로
+NET_BATCH_MAX = 2000  # 또는 이만큼 모이면 바로
+NET_CLIENT_MAX_FRAMES = 256  # 구독자별 보낼 프레임 대기열(넘치면 오래된 프레임부터 버림)
+NET_COMPRESS_MIN = 512  # 이보다 작은 본문은 압축하지 않음
+NET_RECONNECT_SEC = 2.0
+
+
+def parse_host_port(text: str, default_host: str = "127.0.0.1") -> Tuple[str, int]:
+    """"host:port" / ":port" / "port" → (host, port). 포트가 없으면 NET_DEFAULT_PORT."""
+    s = (text or "").strip()
+    host, sep, port = s.rpartition(":")
+    if not sep:
+        host, port = ("", s) if s.isdigit() else (s, "")
+    host = host.strip("[]") or default_host
+    try:
+        return host, int(port) if port else NET_DEFAULT_PORT
+    except ValueError:
+        raise ValueError(f"host:port 형식이 잘못되었습니다: {text}")
+
+
+def encode_frame(ftype: int, serial: str, payload: bytes, count: int = 0, codec: str = "none") -> bytes:
+    """프레임 1개. codec 압축 결과가 원본보다 작을 때만 압축본을 싣는다(압축 여부는 헤더에 기록)."""
+    import zlib
+
+    code = 0
+    if codec != "none" and len(payload) >= NET_COMPRESS_MIN:
+        if codec == "zst":
+            packed = zstandard.ZstdCompressor(level=1).compress(payload)
+        else:
+            packed = zlib.compress(payload, 1)
+        if len(packed) < len(payload):
+            payload, code = packed, NET_CODECS[codec]
+    sb = serial.encode("utf-8", errors="ignore")
+    return NET_HEAD.pack(NET_MAGIC, ftype, code, len(sb), count, len(payload)) + sb + payload
+
+
+def _recv_exact(sock, n: int) -> Optional[bytes]:
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(min(n - len(buf), 1 << 20))
+        if not chunk:
+            return None
+        buf += chunk
+    return bytes(buf)
+
+
+def read_frame(sock) -> Optional[Tuple[int, str, int, bytes]]:
+    """프레임 1개 → (종류, 시리얼, 레코드 수, 풀린 본문). 연결이 끊기면 None."""
+    import zlib
+
+    head = _recv_exact(sock, NET_HEAD.size)
+    if head is None:
+        return None
+    magic, ftype, code, slen, count, plen = NET_HEAD.unpack(head)
+    if magic != NET_MAGIC:
+        raise ValueError("ATX 수집기 스트림이 아닙니다")
+    rest = _recv_exact(sock, slen + plen)
+    if rest is None:
+        return None
+    serial = rest[:slen].decode("utf-8", errors="ignore")
+    payload = rest[slen:]
+    if code == NET_CODECS["zlib"]:
+        payload = zlib.decompress(payload)
+    elif code == NET_CODECS["zst"]:
+        if zstandard is None:
+            raise RuntimeError("수집기가 zst 로 압축합니다. zstandard 를 설치하거나 수집기를 --serve-compress zlib 로 실행하세요")
+        payload = zstandard.ZstdDecompressor().decompress(payload, max_output_size=max(1 << 20, plen * 64))
+    return ftype, serial, count, payload
+
+
+class _NetClient:
+    """구독자 1명: 보낼 프레임 대기열 + 전송 스레드(느린 구독자가 다른 구독자/수집을 막지 않게)."""
+
+    def __init__(self, sock, addr, on_close):
+        self.sock = sock
+        self.addr = addr
+        self.on_close = on_close
+        self.sent_bytes = 0
+        self.dropped = 0
+        self._dq: "collections.deque[bytes]" = collections.deque()
+        self._cv = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"atx-net-{addr[1]}", daemon=True)
+        self._thread.start()
+
+    def push(self, frame: bytes):
+        with self._cv:
+            if len(self._dq) >= NET_CLIENT_MAX_FRAMES:
+                self._dq.popleft()
+                self.dropped += 1
+            self._dq.append(frame)
+            self._cv.notify()
+
+    def close(self):
+        with self._cv:
+            self._closed = True
+            self._cv.notify()
+        try:
+            self.sock.close()
+        except Exception:
+            pass
+
+    def _run(self):
+        try:
+            while True:
+                with self._cv:
+                    while not self._dq and not self._closed:
+                        self._cv.wait()
+                    if self._closed:
+                        return
+                    frames = list(self._dq)
+                    self._dq.clear()
+                data = b"".join(frames)
+                self.sock.sendall(data)
+                self.sent_bytes += len(data)
+        except OSError:
+            pass
+        finally:
+            self.close()
+            self.on_close(self)
+
+
+class EventServer:
+    """
+    (--serve) 수집기: 입력 링의 라인을 파싱해(classify_line) pack_record 레코드로 묶어 TCP 구독자 전체에 보낸다.
+    - NET_BATCH_MS 동안(또는 NET_BATCH_MAX 줄) 모은 라인을 기기별 프레임 1개로, 본문은 선택적으로 zlib/zst 압축
+    - 프레임은 한 번만 만들고 구독자마다 대기열에 넣는다. 구독자는 몇 명이든 접속/해제 가능
+    - 접속 직후 hello(JSON: 시리얼/화면 크기) 1개. 이후 화면 크기 변화는 레코드(size)로 전달된다
+    - 파싱/레코드 변환에 실패한 라인은 원본 라인 레코드로 보내고 errors 로 센다. 펌프 스레드는 죽지 않는다
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        src: IngestRing,
+        sizes: Optional[Dict[str, Optional[ScreenSize]]] = None,
+        compress: str = "zlib",
+        batch_ms: float = NET_BATCH_MS,
+        batch_max: int = NET_BATCH_MAX,
+    ):
+        self.host = host
+        self.port = int(port)
+        self.src = src
+        self.sizes: Dict[str, Optional[ScreenSize]] = dict(sizes or {})
+        self.compress = compress
+        self.batch_ms = float(batch_ms)
+        self.batch_max = max(1, int(batch_max))
+        self.lines = 0
+        self.frames = 0
+        self.raw_bytes = 0
+        self.frame_bytes = 0
+        self.closed_dropped = 0
+        self.errors = 0
+        self.clients: List[_NetClient] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sock = None
+
+    def start(self):
+        import socket
+
+        self._sock = socket.socket(socket.AF_INET6 if ":" in self.host else socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((self.host, self.port))
+        self._sock.listen(16)
+        self.port = self._sock.getsockname()[1]
+        threading.Thread(target=self._accept_loop, name="atx-net-accept", daemon=True).start()
+        threading.Thread(target=self._pump_loop, name="atx-net-pump", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        try:
+            self._sock.close()
+        except Exception:
+            pass
+        with self._lock:
+            clients, self.clients = self.clients, []
+        for c in clients:
+            c.close()
+
+    def hello(self) -> bytes:
+        info = {
+            "v": 1,
+            "serials": list(self.sizes),
+            "sizes": {s: [sz.w, sz.h] for s, sz in self.sizes.items() if sz is not None},
+            "batch_ms": self.batch_ms,
+            "compress": self.compress,
+        }
+        return encode_frame(NET_HELLO, "", json.dumps(info, ensure_ascii=False).encode("utf-8"))
+
+    def _accept_loop(self):
+        import socket
+
+        while not self._stop.is_set():
+            try:
+                conn, addr = self._sock.accept()
+            except OSError:
+                return
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            c = _NetClient(conn, addr, self._drop_client)
+            c.push(self.hello())
+            with self._lock:
+                self.clients.append(c)
+            print(f"[serve] 구독자 접속: {addr[0]}:{addr[1]} (현재 {len(self.clients)}명)", file=sys.stderr)
+
+    def _drop_client(self, c: _NetClient):
+        with self._lock:
+            if c not in self.clients:
+                return
+            self.clients.remove(c)
+            self.closed_dropped += c.dropped
+        print(f"[serve] 구독자 해제: {c.addr[0]}:{c.addr[1]} (현재 {len(self.clients)}명)", file=sys.stderr)
+
+    def _pump_loop(self):
+        wait = self.batch_ms / 1000.0
+        while not self._stop.is_set():
+            try:
+                items = self.src.get_many(self.batch_max, timeout=wait)
+                if not items:
+                    continue
+                deadline = time.perf_counter() + wait
+                while len(items) < self.batch_max and time.perf_counter() < deadline:
+                    more = self.src.get_many(self.batch_max - len(items), timeout=max(0.0, deadline - time.perf_counter()))
+                    if not more:
+                        break
+                    items.extend(more)
+                self.publish(items)
+            except Exception as e:
+                self._error(e)
+
+    def _error(self, e: Exception):
+        self.errors += 1
+        if self.errors == 1:
+            print(f"[serve] 라인 처리 오류(이후 오류는 개수만 셉니다): err={e!r}", file=sys.stderr)
+
+    def _pack_line(self, line: str) -> bytes:
+        t = _parse_logcat_time_seconds(line)
+        try:
+            return pack_record(t, line, classify_line(line))
+        except Exception as e:
+            self._error(e)
+            return pack_record(t, line, None)
+
+    def publish(self, items: List[Tuple[str, str]]):
+        """라인 묶음 → 기기별 프레임 → 구독자 전체 대기열."""
+        by_serial: Dict[str, List[bytes]] = {}
+        for serial, line in items:
+            try:
+                by_serial.setdefault(serial, []).append(self._pack_line(line))
+            except Exception as e:
+                self._error(e)
+        self.lines += len(items)
+        frames = []
+        for serial, recs in by_serial.items():
+            payload = b"".join(recs)
+            self.raw_bytes += len(payload)
+            frames.append(encode_frame(NET_RECORDS, serial, payload, len(recs), self.compress))
+        data = b"".join(frames)
+        self.frames += len(frames)
+        self.frame_bytes += len(data)
+        with self._lock:
+            clients = list(self.clients)
+        for c in clients:
+            c.push(data)
+
+    def stats_text(self) -> str:
+        with self._lock:
+            clients = list(self.clients)
+        ratio = self.frame_bytes / self.raw_bytes if self.raw_bytes else 1.0
+        dropped = self.closed_dropped + sum(c.dropped for c in clients)
+        return (
+            f"lines={self.lines} frames={self.frames} out={self.frame_bytes / 1e6:.1f}MB(압축 {ratio:.2f}) "
+            f"구독자={len(clients)} 버린프레임={dropped} 대기={self.src.qsize()} 입력드롭={self.src.dropped} "
+            f"오류={self.errors}"
+        )
+
+
+def connect_event_stream(host: str, port: int, timeout: float = 5.0):
+    """수집기에 접속해 hello 까지 읽는다 → (socket, hello dict)."""
+    import socket
+
+    sock = socket.create_connection((host, port), timeout=timeout)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    fr = read_frame(sock)
+    if fr is None or fr[0] != NET_HELLO:
+        sock.close()
+        raise ConnectionError(f"수집기 hello 를 받지 못했습니다: {host}:{port}")
+    sock.settimeout(None)
+    return sock, json.loads(fr[3].decode("utf-8"))
+
+
+def net_hello_sizes(hello: dict) -> Dict[str, Optional[ScreenSize]]:
+    """hello 의 기기별 화면 크기(모르면 None). 기기 정보가 없으면 시리얼 "" 1대."""
+    sizes = hello.get("sizes") or {}
+    out: Dict[str, Optional[ScreenSize]] = {}
+    for s in hello.get("serials") or [""]:
+        wh = sizes.get(s)
+        out[s] = ScreenSize(int(wh[0]), int(wh[1])) if wh else None
+    return out
+
+
+def reader_from_net(q: "queue.Queue[Tuple[str, str]]", host: str, port: int, sock=None):
+    """
+    (--connect) 수집기 프레임을 풀어 (serial, line, ParsedLine|None) 로 넣는다(뷰어는 다시 파싱하지 않음).
+    연결이 끊기면 NET_RECONNECT_SEC 마다 다시 접속한다(실패 메시지는 끊긴 직후 1번만).
+    """
+    warned = False
+    while True:
+        try:
+            if sock is None:
+                sock, _hello = connect_event_stream(host, port)
+                print(f"[connect] 다시 연결됨: {host}:{port}", file=sys.stderr)
+            warned = False
+            while True:
+                fr = read_frame(sock)
+                if fr is None:
+                    break
+                ftype, serial, _count, payload = fr
+                if ftype != NET_RECORDS:
+                    continue
+                off, end = 0, len(payload)
+                while off < end:
+                    _t, line, rec, off = unpack_record(payload, off)
+                    q.put((serial, line, rec))
+            print(f"[connect] 수집기 연결 끊김: {host}:{port}", file=sys.stderr)
+        except (OSError, ValueError, RuntimeError) as e:
+            if not warned:
+                print(f"[connect] 수집기 오류: {host}:{port} err={e} ({NET_RECONNECT_SEC:g}초마다 다시 접속)", file=sys.stderr)
+        warned = True
+        try:
+            if sock is not None:
+                sock.close()
+        except Exception:
+            pass
+        sock = None
+        time.sleep(NET_RECONNECT_SEC)
+
+
+def reader_from_log(q: "queue.Queue[Tuple[str, str]]", path: str, rate: float = 1.0, max_gap: float = REPLAY_MAX_GAP_SEC, done=None):
+    """
+    (--serve --replay) 저장 로그를 logcat 시각대로(긴 공백은 max_gap 으로) 흘려보내는 입력(수집기 시험용).
+    rate = parse_replay_speed 배율(inf 면 쉬지 않음). `[serial] ` 접두어가 있으면 그 기기로 보낸다.
+    """
+    t_prev: Optional[float] = None
+    due = time.perf_counter()
+    maxlen = max(1, int(getattr(q, "maxlen", 0) or 1 << 30) - 1)
+    with _open_log_text(path) as f:
+        for ln in f:
+            ln = ln.rstrip("\n")
+            if not ln or ln.startswith("#"):
+                continue
+            serial = ""
+            if ln.startswith("["):
+                j = ln.find("] ")
+                if j > 0:
+                    serial, ln = ln[1:j], ln[j + 2 :]
+            # 파일 입력은 기다릴 수 있으므로 링이 차면 버리지 않고 멈춘다(최대 속도에서도 누락 없음)
+            while q.qsize() >= maxlen:
+                time.sleep(0.005)
+            t = _parse_logcat_time_seconds(ln)
+            if t is not None and not math.isinf(rate):
+                if t_prev is not None:
+                    due += min(max(0.0, t - t_prev), max_gap) / rate
+                    dt = due - time.perf_counter()
+                    if dt > 0.002:
+                        time.sleep(dt)
+                t_prev = t
+            q.put((serial, ln))
+    if done is not None:
+        done.set()
 
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--stdin", action="store_true", help="stdin에서 로그를 읽습니다(파이프 입력).")
     ap.add_argument("--adb", action="store_true", help="adb logcat을 직접 실행해서 로그를 읽습니다.")
-    ap.add_argument("--serial", default=None, help="adb 디바이스 시리얼(여러 대 연결 시).")
+    ap.add_argument(
+        "--serial",
+        action="append",
+        default=None,
+        help="adb 디바이스 시리얼(여러 대 연결 시). 여러 번 지정하거나 쉼표로 구분하면 기기별로 나눠서 동시에 표시. all=연결된 전체",
+    )
     ap.add_argument(
         "--save-log",
         default="auto",
@@ -1062,6 +6906,14 @@ def main():
         action="store_true",
         help="로그 저장을 끕니다(기본은 auto로 저장).",
     )
+    ap.add_argument(
+        "--save-compress",
+        choices=["none", "gz", "zst"],
+        default=None,
+        help="저장 로그 압축(기본: 경로가 .gz/.zst 로 끝나면 그 형식, 아니면 none). zst 는 zstandard 필요",
+    )
+    ap.add_argument("--save-rotate-mb", type=float, default=0.0, help="저장 파일이 이 크기(MB, 압축 후)를 넘으면 _partNNN 다음 파일로(0=끔).")
+    ap.add_argument("--save-rotate-min", type=float, default=0.0, help="저장 파일을 이 시간(분)마다 _partNNN 다음 파일로(0=끔).")
     ap.add_argument(
         "--replay",
         default="",
@@ -1070,32 +6922,205 @@ def main():
     ap.add_argument(
         "--speed",
         default="1x",
-        help="재생 속도(느리게 배속). 1x~10x (예: 2x=2배 느리게, 기본 1x)",
+        help="재생 속도. 1x~10x = N배 느리게, ff2x~ff100x = N배 빠르게, max = 최대 속도 (기본 1x)",
+    )
+    ap.add_argument(
+        "--replay-max-gap",
+        type=float,
+        default=REPLAY_MAX_GAP_SEC,
+        metavar="SEC",
+        help=f"재생 시 이보다 긴 로그 공백은 SEC 로 압축합니다(기본 {REPLAY_MAX_GAP_SEC}). "
+        "크게 주면(예: 5) 실제 로그 간격대로 재생하고 그보다 긴 공백만 건너뜁니다.",
     )
     ap.add_argument(
         "--tags",
         default="ScreenCaptureService:I AutoClickAccessibilityService:I *:S",
         help="adb logcat 태그 필터(공백으로 구분). 예: \"ScreenCaptureService:I *:S\"",
     )
+    ap.add_argument(
+        "--analyze",
+        nargs="+",
+        default=None,
+        metavar="LOG",
+        help="(헤드리스) 저장된 로그를 집계해 카테고리/idx/분별 개수를 JSON/CSV로 출력합니다. UI를 띄우지 않습니다.",
+    )
+    ap.add_argument("--analyze-out", default="", help="--analyze 결과 파일 경로(.json/.csv). 비우면 stdout.")
+    ap.add_argument("--analyze-format", default="", choices=["", "json", "csv"], help="--analyze 출력 형식(기본: 확장자 기준, json).")
+    ap.add_argument("--workers", type=int, default=0, help="--analyze/--export-video 프로세스 수(기본: CPU 코어 수).")
+    ap.add_argument(
+        "--save-rec",
+        action="store_true",
+        help="텍스트 로그 옆에 파싱 결과가 들어간 .atxrec 기록도 같이 저장합니다(재생 시 즉시 로드).",
+    )
+    ap.add_argument(
+        "--convert-rec",
+        nargs="+",
+        default=None,
+        metavar="LOG",
+        help="저장된 텍스트 로그를 .atxrec 로 변환합니다(같은 폴더, 확장자만 .atxrec). UI를 띄우지 않습니다.",
+    )
+    ap.add_argument(
+        "--queue-max",
+        type=int,
+        default=20_000,
+        help="입력 링 버퍼 크기(라인). 넘치면 오래된 라인은 표시만 건너뜁니다(저장은 유지). 기본 20000",
+    )
+    ap.add_argument("--tick-budget-ms", type=float, default=15.0, help="tick 1회에 입력을 처리하는 최대 시간(ms). 기본 15")
+    ap.add_argument(
+        "--timing",
+        nargs="+",
+        default=None,
+        metavar="LOG",
+        help="(헤드리스) 저장 로그의 마커 idx별 실행 간격/drift/press·hold·dur 분포를 CSV로 출력합니다.",
+    )
+    ap.add_argument("--timing-out", default="", help="--timing 결과 CSV 경로. 비우면 stdout.")
+    ap.add_argument(
+        "--metrics-port",
+        type=int,
+        default=0,
+        help="지정하면 127.0.0.1:<port>/metrics 로 수신/파싱/그리기/저장 상태를 OpenMetrics 텍스트로 제공합니다.",
+    )
+    ap.add_argument(
+        "--profile",
+        action="store_true",
+        help="tick 단계별 시간 측정: 화면 우하단 그래프 + 종료 시 CSV, F9 로 cProfile N초 기록.",
+    )
+    ap.add_argument("--profile-out", default="auto", help="--profile CSV 경로(기본 auto: tools/logs/atx_profile_<시각>.csv).")
+    ap.add_argument("--profile-seconds", type=float, default=10.0, help="F9 cProfile 기록 시간(초, 기본 10).")
+    ap.add_argument("--heatmap", action="store_true", help="누적 히트맵을 켠 상태로 시작합니다(numpy 필요).")
+    ap.add_argument(
+        "--heatmap-out",
+        default="",
+        help="(헤드리스) --replay/--analyze 로그의 누적 히트맵을 저장하고 종료합니다(.png 또는 .npy).",
+    )
+    ap.add_argument(
+        "--export-video",
+        default="",
+        help="(헤드리스) --replay 로그를 영상으로 내보내고 종료합니다. .gif/.webp=애니메이션, 그 외=PNG 연속 저장 폴더(Pillow 필요).",
+    )
+    ap.add_argument("--export-fps", type=float, default=10.0, help="--export-video 초당 프레임 수(기본 10).")
+    ap.add_argument("--export-size", default="540x960", help="--export-video 프레임 크기 WxH(기본 540x960).")
+    ap.add_argument("--export-speed", type=float, default=1.0, help="--export-video 로그 시간 배속(2=2배 빠르게, 기본 1).")
+    ap.add_argument("--heatmap-cell", type=int, default=HEATMAP_CELL, help="--heatmap-out 격자 1칸 크기(기기 픽셀). 기본 8")
+    g = ap.add_argument_group("세션 카탈로그(SQLite)")
+    g.add_argument("--db", default=CATALOG_DEFAULT, help="카탈로그 DB 경로(기본 tools/logs/atx_catalog.sqlite).")
+    g.add_argument("--ingest", nargs="+", default=None, metavar="LOG", help="(헤드리스) 저장 로그를 카탈로그에 적재합니다(바뀌지 않은 파일은 건너뜀).")
+    g.add_argument("--ingest-force", action="store_true", help="--ingest 때 이미 적재된 파일도 다시 적재.")
+    g.add_argument("--db-live", action="store_true", help="실시간 수신 이벤트도 카탈로그에 같이 적재합니다.")
+    g.add_argument("--query", action="store_true", help="(헤드리스) 카탈로그 조회: 세션별 일치 개수(--q-events 면 이벤트 목록).")
+    g.add_argument("--q-serial", default="", help="기기 시리얼(쉼표 구분).")
+    g.add_argument("--q-from", default="", help="시작 시각(예: 2026-02-16 12:00).")
+    g.add_argument("--q-to", default="", help="끝 시각(예: 2026-02-16 18:30:00).")
+    g.add_argument("--q-cat", default="", help="카테고리(예: 1,3 또는 5-7).")
+    g.add_argument("--q-idx", default="", help="마커 idx(예: 12 또는 10-20,31).")
+    g.add_argument("--q-kind", default="", help="tap,swipe,marker(실행),marker_phase(그 외 phase) 중 쉼표 구분.")
+    g.add_argument("--q-min", type=int, default=0, help="일치 개수가 이 값 이상인 세션만.")
+    g.add_argument("--q-events", action="store_true", help="세션 집계 대신 일치 이벤트 목록을 출력.")
+    g.add_argument("--q-limit", type=int, default=1000, help="--q-events 최대 행 수(기본 1000).")
+    g.add_argument("--query-out", default="", help="조회 결과 파일(.json/.csv). 비우면 stdout(탭 구분).")
+    g = ap.add_argument_group("런 비교")
+    g.add_argument(
+        "--compare",
+        nargs=2,
+        default=None,
+        metavar=("A", "B"),
+        help="(헤드리스) 저장 로그 2개(.txt/.gz/.zst/.atxrec)의 마커 실행을 idx 순서(사이클)로 맞춰 비교합니다. "
+        "idx별 간격/위치 변화, 누락/추가 실행, 사이클 길이 변화. 여러 기기 스냅샷은 --serial 로 기기 지정",
+    )
+    g.add_argument("--compare-out", default="", help="--compare 결과 파일(.json=요약 포함 전체, .csv=idx별 표). 비우면 stdout(탭 구분).")
+    g.add_argument("--compare-head", type=int, default=0, help="사이클 기준 마커 idx(기본 0=A 에서 처음 실행된 순번 마커).")
+    g.add_argument("--compare-view", action="store_true", help="--compare 결과를 창(좌우 비교 캔버스 + 표)으로 엽니다.")
+    g = ap.add_argument_group("네트워크 수집기")
+    g.add_argument(
+        "--serve",
+        default="",
+        metavar="HOST:PORT",
+        help=f"(헤드리스) 수집기: adb logcat(또는 --stdin, --replay 로그)을 파싱해 TCP 로 보냅니다. 예: 0.0.0.0:{NET_DEFAULT_PORT}, :{NET_DEFAULT_PORT}",
+    )
+    g.add_argument("--serve-compress", choices=["none", "zlib", "zst"], default="zlib", help="수집기 프레임 압축(기본 zlib, zst 는 양쪽 모두 zstandard 필요).")
+    g.add_argument("--serve-batch-ms", type=float, default=NET_BATCH_MS, help=f"수집기 프레임 묶음 간격(ms, 기본 {NET_BATCH_MS:g}).")
+    g.add_argument("--serve-wait-clients", type=int, default=0, metavar="N", help="구독자 N명이 접속할 때까지 입력을 시작하지 않습니다(시험용, 기본 0).")
+    g.add_argument("--connect", default="", metavar="HOST:PORT", help="수집기(--serve)에 접속해 표시합니다(--stdin/--adb 대신, 이 PC 에는 adb 불필요).")
     args = ap.parse_args()
 
-    q: "queue.Queue[str]" = queue.Queue()
-
-    initial = try_get_device_size(args.serial)
-
-    if not args.stdin and not args.adb:
+    if args.compare:
+        _compare_cli(args)
+        return
+    if args.serve:
+        _serve_cli(args)
+        return
+    if args.analyze:
+        res = analyze_logs(args.analyze, workers=args.workers)
+        write_analysis(res, args.analyze_out, args.analyze_format)
+        if args.heatmap_out:
+            _export_heatmap_cli(args.analyze, args)
+        return
+    if args.timing:
+        write_timing_csv(analyze_timing(args.timing).rows(), args.timing_out)
+        return
+    if args.ingest:
+        print(json.dumps(ingest_logs(args.ingest, args.db, force=args.ingest_force), ensure_ascii=False))
+        return
+    if args.query:
+        _query_cli(args)
+        return
+    if args.export_video:
+        if not (isinstance(args.replay, str) and args.replay.strip()):
+            raise SystemExit("--export-video 는 --replay 로 입력 로그를 지정해야 합니다.")
+        m = re.match(r"^\s*(\d+)\s*[xX]\s*(\d+)\s*$", args.export_size or "")
+        if not m:
+            raise SystemExit(f"--export-size 형식이 잘못되었습니다(예: 540x960): {args.export_size}")
+        t0 = time.perf_counter()
+        out = export_replay_video(
+            args.replay.strip(),
+            args.export_video,
+            fps=args.export_fps,
+            size=(int(m.group(1)), int(m.group(2))),
+            speed=args.export_speed,
+            workers=args.workers,
+        )
+        print(f"export: {args.replay.strip()} -> {out} ({time.perf_counter() - t0:.1f}s)", file=sys.stderr)
+        return
+    if args.heatmap_out:
+        if not (isinstance(args.replay, str) and args.replay.strip()):
+            raise SystemExit("--heatmap-out 은 --replay 또는 --analyze 로 입력 로그를 지정해야 합니다.")
+        _export_heatmap_cli([args.replay.strip()], args)
+        return
+    if args.convert_rec:
+        for src in args.convert_rec:
+            for path in sorted(glob.glob(src)) if any(ch in src for ch in "*?[") else [src]:
+                t0 = time.perf_counter()
+                dst = convert_log_to_atxrec(path)
+                print(f"{path} -> {dst} ({time.perf_counter() - t0:.2f}s)")
+        return
+
+    _require_tk()
+    q = IngestRing(maxlen=args.queue_max)
+    replay_mode = isinstance(args.replay, str) and bool(args.replay.strip())
+
+    # (추가) --connect: 기기 목록/화면 크기는 수집기 hello 에서 받는다(이 PC 에서는 adb 를 부르지 않음)
+    net = None
+    if args.connect.strip() and not replay_mode:
+        try:
+            host, port = parse_host_port(args.connect)
+            sock, hello = connect_event_stream(host, port)
+        except (OSError, ValueError) as e:
+            raise SystemExit(f"수집기에 접속할 수 없습니다: {args.connect} err={e}")
+        net = (host, port, sock, net_hello_sizes(hello))
+        print(f"connect: {host}:{port} 기기={','.join(s or '-' for s in net[3])}", file=sys.stderr)
+
+    if not args.stdin and not args.adb and net is None:
         # 기본은 adb 모드
         args.adb = True
 
-    # replay 모드면 입력 스레드를 돌리지 않는다(파일 재생만).
-    if not (isinstance(args.replay, str) and args.replay.strip()):
-        if args.stdin:
-            t = threading.Thread(target=reader_from_stdin, args=(q,), daemon=True)
-            t.start()
-        else:
-            tags = args.tags.split()
-            t = threading.Thread(target=reader_from_adb, args=(q, args.serial, tags), daemon=True)
-            t.start()
+    # (추가) 여러 기기: --serial A --serial B 또는 --serial A,B, --serial all(연결된 전체)
+    serials = _expand_serials(args.serial)
+    probe_serial: Optional[str] = serials[0] if serials else None
+    if net is not None:
+        serials = list(net[3])
+    elif args.stdin or not serials:
+        # stdin 은 기기 구분이 없으므로 1대로 취급(해상도 조회만 첫 시리얼 사용)
+        serials = [""]
 
     # 저장 옵션 결정
     save_opt = None
@@ -1108,48 +7133,272 @@ def main():
         else:
             save_opt = (args.save_log or "").strip() if isinstance(args.save_log, str) else "auto"
 
-    save_fp = None
-    save_path = None
-    if isinstance(save_opt, str) and save_opt.strip():
-        s = save_opt.strip()
-        if s.lower() == "auto":
-            logs_dir = Path(__file__).resolve().parent / "logs"
-            logs_dir.mkdir(parents=True, exist_ok=True)
-            stamp = time.strftime("%Y%m%d_%H%M%S")
-            save_path = str(logs_dir / f"atx_log_{stamp}.txt")
-        else:
-            save_path = s
-            p = Path(save_path)
-            if p.parent:
-                try:
-                    p.parent.mkdir(parents=True, exist_ok=True)
-                except Exception:
-                    pass
-        try:
-            save_fp = open(save_path, "a", encoding="utf-8", errors="ignore", buffering=1)
+    devices: List[DeviceState] = []
+    for serial in serials:
+        # 기기 수가 여러 대면 파일명에 시리얼을 붙여 기기별로 저장
+        tag = serial if len(serials) > 1 else ""
+        save_fp, save_path = _open_save_log(save_opt, args, serial or (probe_serial or ""), tag)
+        size = net[3].get(serial) if net is not None else try_get_device_size(serial or probe_serial)
+        dev = DeviceState(serial, size, save_fp=save_fp, save_path=save_path)
+        if args.save_rec and save_path and not replay_mode:
             try:
-                save_fp.write(f"# started_at={time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-                save_fp.write(f"# mode={'stdin' if args.stdin else 'adb'}\n")
-                if args.serial:
-                    save_fp.write(f"# serial={args.serial}\n")
-                save_fp.write(f"# tags={args.tags}\n")
-                save_fp.write("\n")
-            except Exception:
-                pass
-        except Exception as e:
-            print(f"[WARN] 로그 저장 파일을 열 수 없습니다: path={save_path} err={e}", file=sys.stderr)
-            save_fp = None
-            save_path = None
+                # atx_log_<stamp>_part001.txt.gz → atx_log_<stamp>.atxrec (.atxrec 는 세션당 1개)
+                rec_path = Path(re.sub(r"\.(gz|zst)$", "", save_path, flags=re.IGNORECASE))
+                rec_path = rec_path.with_name(re.sub(r"_part\d{3}$", "", rec_path.stem) + ".atxrec")
+                dev.rec_writer = AtxRecWriter(str(rec_path))
+            except Exception as e:
+                print(f"[WARN] .atxrec 파일을 열 수 없습니다: path={save_path} err={e}", file=sys.stderr)
+        devices.append(dev)
 
-    app = VisualizerApp(q=q, initial_size=initial, save_fp=save_fp, save_path=save_path)
+    # replay 모드면 입력 스레드를 돌리지 않는다(파일 재생만).
+    if not replay_mode:
+        if net is not None:
+            t = threading.Thread(target=reader_from_net, args=(q, net[0], net[1], net[2]), daemon=True)
+            t.start()
+        elif args.stdin:
+            t = threading.Thread(target=reader_from_stdin, args=(q,), daemon=True)
+            t.start()
+        else:
+            tags = args.tags.split()
+            for serial in serials:
+                t = threading.Thread(target=reader_from_adb, args=(q, serial or None, tags), daemon=True)
+                t.start()
+
+    install_flush_handlers()
+    app = VisualizerApp(q=q, initial_size=devices[0].screen, devices=devices)
+    if args.db_live and not replay_mode:
+        if sqlite3 is None:
+            print("[WARN] sqlite3 모듈이 없어 --db-live 를 끕니다", file=sys.stderr)
+        else:
+            app.catalog = CatalogWriter(
+                args.db, paths={d.serial: d.save_path for d in devices if d.save_path}, mode=_input_mode(args)
+            )
+    app.tick_budget_ms = float(args.tick_budget_ms)
+    app.replay_max_gap = max(0.001, float(args.replay_max_gap))
+    if args.heatmap:
+        app.toggle_heatmap()
+    if args.profile:
+        app.profiler = TickProfiler()
+        app.profile_seconds = float(args.profile_seconds)
+        out = (args.profile_out or "auto").strip()
+        if out.lower() == "auto":
+            out = str(Path(__file__).resolve().parent / "logs" / f"atx_profile_{time.strftime('%Y%m%d_%H%M%S')}.csv")
+        app.profile_out = out
+        app.root.bind("<F9>", app.toggle_cprofile)
+    if args.metrics_port:
+        try:
+            app.metrics = MetricsServer(args.metrics_port)
+            app.metrics.start()
+            print(f"metrics: http://127.0.0.1:{app.metrics.port}/metrics", file=sys.stderr)
+        except OSError as e:
+            print(f"[WARN] metrics 포트를 열 수 없습니다: port={args.metrics_port} err={e}", file=sys.stderr)
     # 시작 시 replay 옵션이 있으면 즉시 로드/재생
-    if isinstance(args.replay, str) and args.replay.strip():
+    if replay_mode:
         app.speed_var.set((args.speed or "1x").strip())
         app.on_speed_change()
         app.load_replay(args.replay.strip())
     app.run()
 
 
+def _expand_serials(values: Optional[List[str]]) -> List[str]:
+    """--serial 값들(여러 번/쉼표 구분, all=연결된 전체) → 중복 없는 시리얼 목록."""
+    serials: List[str] = []
+    for v in values or []:
+        for sv in str(v).split(","):
+            sv = sv.strip()
+            if sv.lower() == "all":
+                serials.extend(list_adb_devices())
+            elif sv:
+                serials.append(sv)
+    return list(dict.fromkeys(serials))
+
+
+def _input_mode(args) -> str:
+    if getattr(args, "connect", ""):
+        return "connect"
+    return "stdin" if args.stdin else "adb"
+
+
+def _raise_interrupt(*_a):
+    raise KeyboardInterrupt
+
+
+def _serve_cli(args):
+    try:
+        host, port = parse_host_port(args.serve, default_host="0.0.0.0")
+    except ValueError as e:
+        raise SystemExit(str(e))
+    compress = args.serve_compress
+    if compress == "zst" and zstandard is None:
+        print("[WARN] zstandard 패키지가 없어 zlib 으로 압축합니다(pip install zstandard)", file=sys.stderr)
+        compress = "zlib"
+    q = IngestRing(maxlen=args.queue_max)
+    done = threading.Event()
+    replay = (args.replay or "").strip() if isinstance(args.replay, str) else ""
+    readers: List[Tuple[Callable, tuple]] = []
+    if replay:
+        # 저장 로그를 실시간처럼 흘려보냄(--speed, --replay-max-gap). localhost 시험용
+        sizes: Dict[str, Optional[ScreenSize]] = {"": None}
+        readers.append((reader_from_log, (q, replay, parse_replay_speed(args.speed), max(0.001, float(args.replay_max_gap)), done)))
+    elif args.stdin:
+        sizes = {"": None}
+        readers.append((reader_from_stdin, (q,)))
+    else:
+        sizes = {}
+        for serial in _expand_serials(args.serial) or [""]:
+            sizes[serial] = try_get_device_size(serial or None)
+            readers.append((reader_from_adb, (q, serial or None, args.tags.split())))
+    srv = EventServer(host, port, q, sizes, compress=compress, batch_ms=args.serve_batch_ms)
+    try:
+        srv.start()
+    except OSError as e:
+        raise SystemExit(f"수집기 포트를 열 수 없습니다: {host}:{port} err={e}")
+    print(f"serve: {host}:{srv.port} 대기 중(Ctrl+C 종료), 압축={compress}, 묶음={srv.batch_ms:g}ms", file=sys.stderr)
+    # 서비스 관리자/kill 의 SIGTERM 도 Ctrl+C 처럼 정리 후 종료
+    signal.signal(signal.SIGTERM, _raise_interrupt)
+    last = time.time()
+    try:
+        while len(srv.clients) < args.serve_wait_clients:
+            time.sleep(0.05)
+        for fn, fargs in readers:
+            threading.Thread(target=fn, args=fargs, daemon=True).start()
+        while True:
+            time.sleep(0.5)
+            if done.is_set():
+                done.clear()
+                print(f"[serve] 로그 끝: {replay} ({srv.stats_text()})", file=sys.stderr)
+            if time.time() - last >= 10.0:
+                last = time.time()
+                print(f"[serve] {srv.stats_text()}", file=sys.stderr)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.stop()
+        print(f"serve: 종료 {srv.stats_text()}", file=sys.stderr)
+
+
+def _query_cli(args):
+    if not Path(args.db).is_file():
+        raise SystemExit(f"카탈로그 DB 가 없습니다(먼저 --ingest): {args.db}")
+    kinds = None
+    if args.q_kind.strip():
+        try:
+            kinds = [CATALOG_KINDS.index(k.strip()) for k in args.q_kind.split(",") if k.strip()]
+        except ValueError:
+            raise SystemExit(f"--q-kind 는 {','.join(CATALOG_KINDS)} 중에서: {args.q_kind}")
+    try:
+        t_from, t_to = _parse_when(args.q_from), _parse_when(args.q_to)
+        cats, idxs = _int_list(args.q_cat), _int_list(args.q_idx)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    cat = EventCatalog(args.db)
+    try:
+        t0 = time.perf_counter()
+        cols, rows = cat.query(
+            serial=[v.strip() for v in args.q_serial.split(",") if v.strip()] or None,
+            t_from=t_from,
+            t_to=t_to,
+            cats=cats,
+            idxs=idxs,
+            kinds=kinds,
+            min_count=args.q_min,
+            events=args.q_events,
+            limit=args.q_limit,
+        )
+        dt = time.perf_counter() - t0
+    finally:
+        cat.close()
+    write_query_result(cols, rows, args.query_out)
+    print(f"query: {len(rows)} rows ({dt * 1000:.1f}ms)", file=sys.stderr)
+
+
+def _compare_cli(args):
+    serials = [sv.strip() for v in args.serial or [] for sv in str(v).split(",") if sv.strip()]
+    serial = serials[0] if serials else ""
+    try:
+        res = compare_logs(args.compare[0], args.compare[1], head=args.compare_head, serial=serial, workers=args.workers)
+    except (FileNotFoundError, RuntimeError) as e:
+        raise SystemExit(f"비교 실패: {e}")
+    s = res["summary"]
+    print(f"compare: {compare_summary_text(s)}  ({s['elapsed_sec']:.2f}s)", file=sys.stderr)
+    if args.compare_out or not args.compare_view:
+        write_compare_result(res, args.compare_out)
+    if args.compare_view:
+        CompareView(res).run()
+
+
+def _export_heatmap_cli(paths: List[str], args):
+    if np is None:
+        raise SystemExit("히트맵에는 numpy 가 필요합니다(pip install numpy)")
+    t0 = time.perf_counter()
+    heat, screens = build_heatmap(paths, cell=args.heatmap_cell)
+    # 점이 많은 방향을 지정 경로에, 나머지 방향은 _portrait/_landscape 를 붙인 경로에 저장
+    counts = {o: int(heat.grids[o].sum()) if o in heat.grids else 0 for o in screens}
+    base, ext = os.path.splitext(args.heatmap_out)
+    for k, o in enumerate(sorted(screens, key=lambda o: -counts[o])):
+        screen = screens[o]
+        out_path = args.heatmap_out if k == 0 else f"{base}_{'landscape' if o else 'portrait'}{ext}"
+        out = export_heatmap(heat, out_path, screen)
+        print(f"heatmap: points={counts[o]} screen={screen.w}x{screen.h} -> {out}", file=sys.stderr)
+    print(f"heatmap: total={heat.total} ({time.perf_counter() - t0:.2f}s)", file=sys.stderr)
+
+
+def _open_save_log(save_opt: Optional[str], args, serial: str, tag: str):
+    """
+    수신 로그 저장 LogWriter 를 연다. tag 가 있으면 파일명 뒤에 _<tag> 를 붙인다. 실패/비활성 시 (None, None).
+    반환 경로는 실제로 쓰기 시작한 첫 파일(교체 시 _part001, 압축 시 .gz/.zst 포함).
+    """
+    if not (isinstance(save_opt, str) and save_opt.strip()):
+        return None, None
+    s = save_opt.strip()
+    safe_tag = re.sub(r"[^0-9A-Za-z._-]+", "_", tag) if tag else ""
+    compress = getattr(args, "save_compress", None)
+    if compress is None:
+        low = s.lower()
+        compress = "gz" if low.endswith(".gz") else ("zst" if low.endswith(".zst") else "")
+    elif compress == "none":
+        compress = ""
+    if compress == "zst" and zstandard is None:
+        print("[WARN] zstandard 패키지가 없어 gzip 으로 저장합니다(pip install zstandard)", file=sys.stderr)
+        compress = "gz"
+        if s.lower().endswith(".zst"):
+            s = s[:-4] + ".gz"
+    if s.lower() == "auto":
+        logs_dir = Path(__file__).resolve().parent / "logs"
+        logs_dir.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        save_path = str(logs_dir / (f"atx_log_{stamp}_{safe_tag}.txt" if safe_tag else f"atx_log_{stamp}.txt"))
+    else:
+        p = Path(s)
+        if safe_tag:
+            # atx.txt.gz → atx_<tag>.txt.gz
+            m = re.match(r"^(.*?)((?:\.txt)?(?:\.gz|\.zst)?)$", p.name, flags=re.IGNORECASE)
+            stem, suffix = (m.group(1), m.group(2)) if m and m.group(2) else (p.stem, p.suffix)
+            p = p.with_name(f"{stem}_{safe_tag}{suffix}")
+        save_path = str(p)
+        if p.parent:
+            try:
+                p.parent.mkdir(parents=True, exist_ok=True)
+            except Exception:
+                pass
+    header = [f"# started_at={time.strftime('%Y-%m-%d %H:%M:%S')}", f"# mode={_input_mode(args)}"]
+    if serial:
+        header.append(f"# serial={serial}")
+    header.append(f"# tags={args.tags}")
+    try:
+        save_fp = LogWriter(
+            save_path,
+            header=header,
+            compress=compress,
+            rotate_bytes=int(float(getattr(args, "save_rotate_mb", 0.0) or 0.0) * 1024 * 1024),
+            rotate_sec=float(getattr(args, "save_rotate_min", 0.0) or 0.0) * 60.0,
+        )
+        return save_fp, save_fp.path
+    except Exception as e:
+        print(f"[WARN] 로그 저장 파일을 열 수 없습니다: path={save_path} err={e}", file=sys.stderr)
+        return None, None
+
+
 if __name__ == "__main__":
     main()
 
@@ -0,0 +1,572 @@
+"""
+adb_marker_visualizer.py 벤치마크 + 합성 logcat 생성기.
+
+- 같은 입력 라인에 대해
+  (기존) RE_ATX_STREAM_MARKER + parse_size_from_line + parse_event_from_line 조합과
+  (신규) classify_line 단일 패스를 비교해 lines/sec 를 출력합니다.
+- 입력은 저장된 로그 파일(--log) 또는 내장 샘플 라인을 반복해서 사용합니다.
+- `--gen`: ScreenCaptureService 가 찍는 형태의 `adb logcat -v time` 로그를 만들어 파일로 저장합니다
+  (MARKER 메타, 7개 카테고리 ACT/OK, 화면 회전, 잡음 라인. 속도/비율 조절 가능).
+- `--suite`: 합성 로그로 파싱 처리량, load_replay_lines 시간/메모리, 재생 인덱스, seek(rebuild) 지연,
+  이벤트 수별 redraw 시간을 재서 JSON 으로 출력합니다(seek/redraw 는 Tk 화면이 있을 때만).
+  런 비교(--compare)는 고르게 느려진 런(같은 seed + lag / 시각 1.2배)이 누락/추가 0 인지도 확인하고,
+  아니면 종료 코드 1 로 끝납니다(NumPy 필요).
+
+실행:
+    python .\\tools\\bench_marker_visualizer.py
+    python .\\tools\\bench_marker_visualizer.py --log .\\tools\\logs\\atx_log_20260216_123000.txt
+    python .\\tools\\bench_marker_visualizer.py --gen .\\synthetic.txt --seconds 3600 --markers 60 --noise-rate 200
+    python .\\tools\\bench_marker_visualizer.py --suite --seconds 600 --json .\\bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import json
+import os
+import platform
+import queue
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import adb_marker_visualizer as amv  # noqa: E402
+
+
+def _sample_lines(n: int, seed: int = 1) -> List[str]:
+    # ScreenCaptureService/AutoClickAccessibilityService 가 찍는 형태를 흉내낸 라인 묶음
+    rnd = random.Random(seed)
+    head = "02-16 12:30:{:02d}.{:03d} I/ScreenCaptureService( 4242): "
+    out: List[str] = []
+    for i in range(n):
+        pre = head.format((i // 1000) % 60, i % 1000)
+        idx = rnd.randint(1, 40)
+        x = rnd.randint(0, 1079)
+        y = rnd.randint(0, 2399)
+        r = rnd.random()
+        if r < 0.30:
+            out.append(
+                pre + f"ATX_STREAM MARKER phase=try cat=1 kind=click idx={idx} xPx={x} yPx={y} "
+                "delayMs=300 jitterPct=50 pressMs=90 to=0 swipeMode=0 soloExec=false"
+            )
+        elif r < 0.55:
+            out.append(pre + f"ATX_STREAM ACT cat=1 kind=click idx={idx} tap({x},{y}) press=90ms")
+        elif r < 0.65:
+            out.append(pre + f"ATX_STREAM OK cat=6 kind=color_module idx={idx} tap({x},{y}) press=90ms")
+        elif r < 0.75:
+            out.append(
+                pre + f"ATX_STREAM ACT cat=3 kind=swipe idx={idx} from=({x},{y}) to=({y % 1080},{x}) dur=300ms hold=0ms"
+            )
+        elif r < 0.77:
+            out.append(pre + "Screen size changed 1080 x 2400 -> 2400 x 1080. Reconfiguring VD (setSurface+resize).")
+        else:
+            out.append(pre + f"frame processed in {rnd.randint(1, 40)}ms queue={rnd.randint(0, 5)}")
+    return out
+
+
+# 카테고리별 마커 kind(1.순번 2.독립 3.스와이프 4.단독 5.방향모듈 6.색상모듈 7.이미지모듈)
+CAT_KINDS = {1: "click", 2: "independent", 3: "swipe", 4: "solo_main", 5: "module", 6: "color_module", 7: "image_module"}
+
+NOISE_LINES = (
+    "I/ScreenCaptureService( 4242): frame processed in {a}ms queue={b}",
+    "D/ScreenCaptureService( 4242): imageReader acquire latest ok w=1080 h=2400 stride={a}",
+    "I/AutoClickAccessibilityService( 4242): loop tick idle={a}ms pending={b}",
+    "W/ScreenCaptureService( 4242): template match score below threshold score=0.{a} idx={b}",
+    "D/AutoClickAccessibilityService( 4242): gesture dispatched ok={b} cost={a}ms",
+)
+
+
+def _parse_mix(mix: str) -> Dict[int, float]:
+    # "1:6,3:2,6:1" → {1: 6.0, 3: 2.0, 6: 1.0}
+    out: Dict[int, float] = {}
+    for part in (mix or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        c, _, w = part.partition(":")
+        cat = int(c)
+        if not 1 <= cat <= 7:
+            raise ValueError(f"카테고리는 1~7: {part}")
+        out[cat] = float(w or 1)
+    return out or {1: 1.0}
+
+
+def _fmt_time(md: str, sec: float) -> str:
+    sec = sec % 86400.0
+    ms = int(round(sec * 1000.0))
+    hh, rem = divmod(ms, 3_600_000)
+    mm, rem = divmod(rem, 60_000)
+    ss, ms = divmod(rem, 1000)
+    return f"{md} {hh % 24:02d}:{mm:02d}:{ss:02d}.{ms:03d}"
+
+
+def generate_logcat(
+    seconds: float = 600.0,
+    markers: int = 40,
+    delay_ms: int = 300,
+    jitter_pct: int = 50,
+    noise_rate: float = 50.0,
+    mix: str = "1:6,2:2,3:2,4:1,5:1,6:1,7:1",
+    rotate_sec: float = 120.0,
+    lag_ms: float = 0.0,
+    seed: int = 1,
+    start: str = "02-16 12:00:00.000",
+    size: Tuple[int, int] = (1080, 2400),
+) -> Iterator[str]:
+    """
+    합성 `adb logcat -v time` 라인을 시간 순서대로 생성.
+    - 마커 idx 마다 카테고리(mix 비율)/좌표/주기(delayMs±jitterPct)를 정해 두고
+      실행마다 `ATX_STREAM MARKER phase=try ...` 메타 + 몇 ms 뒤 ACT(1~4) 또는 OK(5~7) 라인을 찍는다.
+    - lag_ms: 실행마다 평균 lag_ms 의 지연을 더해 "설정 주기보다 밀리는" 상황을 흉내(타이밍 분석 확인용)
+    - rotate_sec 마다 화면 회전(Screen size changed), 그 사이 noise_rate(초당 라인) 만큼 잡음 라인
+    """
+    rnd = random.Random(seed)
+    md, _, hms = start.partition(" ")
+    h, m, rest = hms.split(":")
+    t0 = int(h) * 3600 + int(m) * 60 + float(rest)
+    w, hgt = size
+    weights = _parse_mix(mix)
+    cats = list(weights)
+    cw = [weights[c] for c in cats]
+    # idx → (cat, 기기 좌표 비율, delayMs, pressMs)
+    spec: Dict[int, Tuple[int, float, float, int, int]] = {}
+    heap: List[Tuple[float, int, str, int]] = []
+    seq = 0
+    for idx in range(1, max(1, int(markers)) + 1):
+        cat = rnd.choices(cats, cw)[0]
+        d = max(10, int(delay_ms * rnd.uniform(0.5, 2.0)))
+        spec[idx] = (cat, rnd.random(), rnd.random(), d, rnd.choice((60, 90, 120)))
+        heap.append((rnd.uniform(0, d / 1000.0), seq, "fire", idx))
+        seq += 1
+    if noise_rate > 0:
+        heap.append((rnd.expovariate(noise_rate), seq, "noise", 0))
+        seq += 1
+    if rotate_sec > 0:
+        heap.append((rotate_sec, seq, "rotate", 0))
+        seq += 1
+    heapq.heapify(heap)
+    landscape = False
+    while heap:
+        t, _s, typ, idx = heapq.heappop(heap)
+        if t > seconds:
+            break
+        ts = _fmt_time(md, t0 + t)
+        cur_w, cur_h = (hgt, w) if landscape else (w, hgt)
+        if typ == "noise":
+            tpl = rnd.choice(NOISE_LINES)
+            yield f"{ts} " + tpl.format(a=rnd.randint(1, 99), b=rnd.randint(0, 40))
+            heapq.heappush(heap, (t + rnd.expovariate(noise_rate), seq, "noise", 0))
+            seq += 1
+            continue
+        if typ == "rotate":
+            nw, nh = cur_h, cur_w
+            yield f"{ts} I/ScreenCaptureService( 4242): Screen size changed {cur_w} x {cur_h} -> {nw} x {nh}. Reconfiguring VD (setSurface+resize)."
+            landscape = not landscape
+            heapq.heappush(heap, (t + rotate_sec, seq, "rotate", 0))
+            seq += 1
+            continue
+        cat, fx, fy, d, press = spec[idx]
+        kind = CAT_KINDS[cat]
+        x = int(fx * (cur_w - 1))
+        y = int(fy * (cur_h - 1))
+        if typ == "fire":
+            yield (
+                f"{ts} I/ScreenCaptureService( 4242): ATX_STREAM MARKER phase=try cat={cat} kind={kind} idx={idx} "
+                f"xPx={x} yPx={y} delayMs={d} jitterPct={jitter_pct} pressMs={press} to=0 "
+                f"swipeMode={1 if cat == 3 else 0} soloExec={'true' if cat == 4 else 'false'}"
+            )
+            heapq.heappush(heap, (t + rnd.uniform(0.003, 0.015), seq, "act", idx))
+            seq += 1
+            nxt = d * (1.0 + rnd.uniform(-jitter_pct, jitter_pct) / 100.0)
+            if lag_ms > 0:
+                nxt += rnd.expovariate(1.0 / lag_ms)
+            heapq.heappush(heap, (t + max(1.0, nxt) / 1000.0, seq, "fire", idx))
+            seq += 1
+            continue
+        # act: 1~4 는 ACT, 5~7(모듈)은 매칭됐을 때만 OK
+        if cat >= 5 and rnd.random() < 0.3:
+            continue
+        tag = "OK" if cat >= 5 else "ACT"
+        src = "ScreenCaptureService" if cat >= 5 else "AutoClickAccessibilityService"
+        if cat == 3:
+            x2 = int(rnd.random() * (cur_w - 1))
+            y2 = int(rnd.random() * (cur_h - 1))
+            dur = rnd.choice((200, 300, 450))
+            yield (
+                f"{ts} I/{src}( 4242): ATX_STREAM {tag} cat=3 kind=swipe idx={idx} from=({x},{y}) to=({x2},{y2}) "
+                f"dur={dur}ms hold={rnd.choice((0, 0, 50))}ms"
+            )
+        else:
+            yield f"{ts} I/{src}( 4242): ATX_STREAM {tag} cat={cat} kind={kind} idx={idx} tap({x},{y}) press={press}ms"
+
+
+def write_synthetic_log(path: str, **kw) -> int:
+    """generate_logcat 결과를 저장 로그 형식(헤더 주석 포함)으로 기록. 라인 수 반환."""
+    n = 0
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        # 헤더 시작 시각도 로그 첫 시각에 맞춘다(카탈로그가 연도를 여기서 추정)
+        start = kw.get("start", "02-16 12:00:00.000")
+        f.write(f"# started_at={time.strftime('%Y')}-{start[:14]}\n# mode=synthetic\n\n")
+        for ln in generate_logcat(**kw):
+            f.write(ln + "\n")
+            n += 1
+    return n
+
+
+def _legacy_process(line: str) -> None:
+    # 기존 _process_line_impl 이 라인마다 수행하던 정규식 순서 그대로
+    if amv.RE_ATX_STREAM_MARKER.search(line):
+        try:
+            kv = {m.group(1): m.group(2) for m in amv.RE_ATX_KV.finditer(line)}
+            idx = int(kv.get("idx", "0"))
+            cat = int(kv.get("cat", "0"))
+            x = int(kv.get("xPx", "-1"))
+            y = int(kv.get("yPx", "-1"))
+            if idx != 0 and x >= 0 and y >= 0 and cat <= 0:
+                amv.classify_cat(line)
+        except Exception:
+            pass
+    amv.parse_size_from_line(line)
+    amv.parse_event_from_line(line)
+
+
+def _time_it(fn: Callable[[str], object], lines: List[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        for ln in lines:
+            fn(ln)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench_parse(lines: List[str], repeat: int = 3) -> dict:
+    legacy = _time_it(_legacy_process, lines, repeat)
+    single = _time_it(amv.classify_line, lines, repeat)
+    n = len(lines)
+    return {
+        "lines": n,
+        "legacy_lines_per_sec": n / legacy if legacy > 0 else 0.0,
+        "classify_line_lines_per_sec": n / single if single > 0 else 0.0,
+        "speedup": legacy / single if single > 0 else 0.0,
+    }
+
+
+def bench_load_replay(path: str) -> dict:
+    """load_replay_lines(전체 읽기) vs LazyLogReplay(mmap 인덱스) 시간과 tracemalloc 최대 메모리."""
+    t0 = time.perf_counter()
+    lines = amv.load_replay_lines(path)
+    eager = time.perf_counter() - t0
+    n = len(lines)
+    del lines
+    tracemalloc.start()
+    lines = amv.load_replay_lines(path)
+    _cur, eager_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del lines
+
+    t0 = time.perf_counter()
+    lz = amv.LazyLogReplay(path)
+    lz.wait_ready(30.0)
+    first = time.perf_counter() - t0
+    lz.wait_done()
+    full = time.perf_counter() - t0
+    lz.close()
+    tracemalloc.start()
+    lz = amv.LazyLogReplay(path)
+    lz.wait_done()
+    _cur, lazy_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    lz.close()
+    return {
+        "lines": n,
+        "file_bytes": os.path.getsize(path),
+        "load_replay_lines_sec": round(eager, 4),
+        "load_replay_lines_peak_bytes": eager_peak,
+        "lazy_first_ready_sec": round(first, 4),
+        "lazy_full_index_sec": round(full, 4),
+        "lazy_peak_bytes": lazy_peak,
+    }
+
+
+def bench_replay_index(path: str) -> dict:
+    """ReplayIndex(백그라운드 체크포인트) 전체 구축 시간."""
+    src = amv.open_replay_source(path)
+    try:
+        t0 = time.perf_counter()
+        idx = amv.ReplayIndex(src, amv.ScreenSize(1080, 2400), 12.0, 0.3, 600)
+        idx.start()
+        idx._thread.join()
+        return {"lines": len(src), "build_sec": round(time.perf_counter() - t0, 4), "checkpoints": len(idx.checkpoints)}
+    finally:
+        src.close()
+
+
+def _stretch_log(src: str, dst: str, factor: float) -> None:
+    """저장 로그의 logcat 시각을 첫 시각 기준 factor 배로 늘려 dst 에 기록(고르게 느려진 런 흉내)."""
+    t0 = None
+    with open(src, "r", encoding="utf-8", errors="ignore") as f, open(dst, "w", encoding="utf-8", newline="\n") as out:
+        for ln in f:
+            t = amv._parse_logcat_time_seconds(ln) if ln[:1].isdigit() else None
+            if t is not None:
+                t0 = t if t0 is None else t0
+                ln = _fmt_time(ln[:5], t0 + (t - t0) * factor) + ln[18:]
+            out.write(ln)
+
+
+def _drop_executions(src: str, dst: str, frac: float = 0.0, pause: Tuple[float, float] = (0.0, 0.0), seed: int = 1) -> Dict[int, int]:
+    """
+    저장 로그에서 실행을 지운 런을 dst 에 기록 → 지운 실행 수(idx 별).
+    - frac: `MARKER phase=try` 라인을 이 비율만큼 무작위로 지움(ACT/OK 등 나머지 라인은 그대로)
+    - pause: (시작 비율, 초) 로그 길이의 시작 비율 지점부터 그 초 동안의 라인을 모두 지움(멈춤 흉내)
+    """
+    rnd = random.Random(seed)
+    removed: Dict[int, int] = {}
+    lo = hi = None
+    if pause[1] > 0:
+        with open(src, "r", encoding="utf-8", errors="ignore") as f:
+            ts = [t for t in (amv._parse_logcat_time_seconds(ln) for ln in f if ln[:1].isdigit()) if t is not None]
+        if ts:
+            lo = ts[0] + (ts[-1] - ts[0]) * pause[0]
+            hi = lo + pause[1]
+    with open(src, "r", encoding="utf-8", errors="ignore") as f, open(dst, "w", encoding="utf-8", newline="\n") as out:
+        for ln in f:
+            exe = "MARKER phase=try" in ln
+            drop = exe and frac > 0 and rnd.random() < frac
+            if lo is not None and not drop and ln[:1].isdigit():
+                t = amv._parse_logcat_time_seconds(ln)
+                drop = t is not None and lo <= t < hi
+            if not drop:
+                out.write(ln)
+            elif exe:
+                idx = int(ln.split(" idx=", 1)[1].split(None, 1)[0])
+                removed[idx] = removed.get(idx, 0) + 1
+    return removed
+
+
+def bench_compare(path: str, gen_kw: dict) -> dict:
+    """
+    compare_logs 시간 + 회귀 확인(두 런의 로그 범위가 같으므로 범위밖 tail 은 모두 0 이어야 한다).
+    - 같은 로그의 시각을 1.2배로 늘린 런: 실행 순서가 같으므로 누락/추가 0
+    - 실행 5% 를 지운 런, 가운데 30초를 지운 런(멈춤): idx 별 누락 = 지운 실행 수, 추가 0
+    - (gen_kw 가 있으면) 같은 seed 에 lag_ms=20 인 런: 타이머가 idx 마다 따로 밀려 실행 순서 자체가 달라지므로
+      누락/추가는 순서 차이 그대로 나오고 tail 만 확인한다.
+    """
+    if amv.np is None:
+        return {"skipped": "numpy 없음"}
+    out: dict = {}
+    tmp = tempfile.mkdtemp(prefix="atx_bench_cmp_")
+    try:
+        runs = {name: os.path.join(tmp, f"{name}.txt") for name in ("stretch_1.2x", "drop_5pct", "pause_30s")}
+        _stretch_log(path, runs["stretch_1.2x"], 1.2)
+        expect: Dict[str, Dict[int, int]] = {
+            "stretch_1.2x": {},
+            "drop_5pct": _drop_executions(path, runs["drop_5pct"], frac=0.05),
+            "pause_30s": _drop_executions(path, runs["pause_30s"], pause=(0.5, 30.0)),
+        }
+        if gen_kw:
+            runs["lag_20ms"] = os.path.join(tmp, "lag.txt")
+            write_synthetic_log(runs["lag_20ms"], **dict(gen_kw, lag_ms=20.0))
+        ok = True
+        for name, other in runs.items():
+            res = amv.compare_logs(path, other, workers=1)
+            s = res["summary"]
+            r = {k: s[k] for k in ("executions_a", "executions_b", "matched", "missing", "extra", "tail_a", "tail_b", "elapsed_sec")}
+            r["ok"] = s["tail_a"] == 0 and s["tail_b"] == 0
+            if name in expect:
+                r["removed"] = sum(expect[name].values())
+                r["ok"] = r["ok"] and all(
+                    row["missing"] == expect[name].get(row["idx"], 0) and row["extra"] == 0 for row in res["rows"]
+                )
+            ok = ok and r["ok"]
+            out[name] = r
+        out["ok"] = ok
+        return out
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _make_app():
+    # Tk 화면이 없으면(헤드리스 CI 등) seek/redraw 벤치는 건너뛴다
+    if amv.tk is None:
+        raise RuntimeError("tkinter 없음")
+    app = amv.VisualizerApp(queue.Queue(), amv.ScreenSize(1080, 2400))
+    app.root.geometry("900x1000")
+    app.root.update()
+    return app
+
+
+def bench_seek(path: str, fractions=(0.1, 0.5, 0.9)) -> dict:
+    """재생 로드 후 슬라이더 이동 → rebuild 완료까지 걸린 시간(체크포인트 구축 후)."""
+    try:
+        app = _make_app()
+    except Exception as e:
+        return {"skipped": f"Tk 화면 없음: {e}"}
+    try:
+        app.load_replay(path)
+        src = app.replay_lines
+        if isinstance(src, amv.LazyLogReplay):
+            src.wait_done()
+        app._replay_index._thread.join()
+        app.tick()
+        total = app.replay_total_sim
+        out = []
+        for fr in fractions:
+            t0 = time.perf_counter()
+            app.seek_to_time(total * fr)
+            ticks = 0
+            while app._rebuild_active:
+                app.tick()
+                ticks += 1
+            out.append({"fraction": fr, "target_sec": round(total * fr, 3), "ms": round((time.perf_counter() - t0) * 1000, 2), "ticks": ticks})
+        return {"total_sec": round(total, 3), "seeks": out}
+    finally:
+        app.on_close()
+
+
+def bench_redraw(counts=(100, 600, 2000, 5000), repeat: int = 20, seed: int = 1) -> dict:
+    """이벤트 수별 redraw 1회 평균 시간(ms)."""
+    try:
+        app = _make_app()
+    except Exception as e:
+        return {"skipped": f"Tk 화면 없음: {e}"}
+    rnd = random.Random(seed)
+    try:
+        app.keep_seconds = 3600.0
+        app.event_ttl_short_cats = set()
+        app.max_events = max(counts) * 2
+        out = []
+        for n in counts:
+            now = time.time()
+            ev = []
+            for i in range(n):
+                cat = rnd.randint(1, 7)
+                p0 = (rnd.randint(0, 1079), rnd.randint(0, 2399))
+                if cat == 3:
+                    p1 = (rnd.randint(0, 1079), rnd.randint(0, 2399))
+                    ev.append(amv.Event(ts=now, kind="swipe", p0=p0, p1=p1, color=amv.cat_color(cat), cat=cat))
+                else:
+                    ev.append(amv.Event(ts=now, kind="tap", p0=p0, color=amv.cat_color(cat), cat=cat))
+            app.dev.events = ev
+            app.redraw()
+            app.root.update_idletasks()
+            t0 = time.perf_counter()
+            for _ in range(repeat):
+                app.redraw()
+                app.root.update_idletasks()
+            out.append({"events": n, "ms": round((time.perf_counter() - t0) * 1000 / repeat, 3), "items": app._redraw_items})
+        return {"repeat": repeat, "results": out}
+    finally:
+        app.on_close()
+
+
+def run_suite(gen_kw: dict, repeat: int = 3, parse_lines: int = 200_000, log: str = "") -> dict:
+    """합성 로그(또는 --log)로 전체 벤치를 돌려 dict(JSON 출력용) 반환."""
+    tmp = None
+    if log:
+        path = log
+        gen_info: dict = {"log": log}
+    else:
+        tmp = tempfile.NamedTemporaryFile(prefix="atx_bench_", suffix=".txt", delete=False)
+        tmp.close()
+        path = tmp.name
+        t0 = time.perf_counter()
+        n = write_synthetic_log(path, **gen_kw)
+        gen_info = dict(gen_kw, lines=n, sec=round(time.perf_counter() - t0, 3))
+    try:
+        lines = [ln for ln in Path(path).read_text(encoding="utf-8", errors="ignore").splitlines() if ln and not ln.startswith("#")]
+        parse_in = (lines * (parse_lines // max(1, len(lines)) + 1))[:parse_lines] if lines else []
+        result = {
+            "env": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "numpy": getattr(amv.np, "__version__", None),
+                "pillow": getattr(sys.modules.get("PIL"), "__version__", None),
+            },
+            "generator": gen_info,
+            "parse": bench_parse(parse_in, repeat=repeat),
+            "load_replay": bench_load_replay(path),
+            "replay_index": bench_replay_index(path),
+            "seek": bench_seek(path),
+            "redraw": bench_redraw(),
+            "compare": bench_compare(path, {} if log else gen_kw),
+        }
+        return result
+    finally:
+        if tmp is not None:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--log", default="", help="벤치 입력으로 쓸 저장 로그 파일(없으면 내장 샘플).")
+    ap.add_argument("--lines", type=int, default=200_000, help="내장 샘플 라인 수(기본 200000).")
+    ap.add_argument("--repeat", type=int, default=3, help="반복 횟수(최솟값 사용).")
+    ap.add_argument("--gen", default="", metavar="OUT", help="합성 logcat 로그를 OUT 에 저장하고 종료.")
+    ap.add_argument("--suite", action="store_true", help="전체 벤치를 돌려 JSON 출력(--log 없으면 합성 로그 사용).")
+    ap.add_argument("--json", default="", help="--suite 결과 JSON 경로(비우면 stdout).")
+    g = ap.add_argument_group("합성 로그(--gen/--suite)")
+    g.add_argument("--seconds", type=float, default=600.0, help="로그 길이(초, 기본 600).")
+    g.add_argument("--markers", type=int, default=40, help="마커 idx 개수(기본 40).")
+    g.add_argument("--delay-ms", type=int, default=300, help="마커 기본 주기 delayMs(idx마다 0.5~2배, 기본 300).")
+    g.add_argument("--jitter-pct", type=int, default=50, help="주기 흔들림 jitterPct(기본 50).")
+    g.add_argument("--noise-rate", type=float, default=50.0, help="잡음 라인 초당 개수(기본 50).")
+    g.add_argument("--mix", default="1:6,2:2,3:2,4:1,5:1,6:1,7:1", help="카테고리 비율 cat:가중치,...")
+    g.add_argument("--rotate-sec", type=float, default=120.0, help="화면 회전 간격(초, 0=없음).")
+    g.add_argument("--lag-ms", type=float, default=0.0, help="실행마다 더할 평균 지연(ms, 밀림 재현).")
+    g.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    gen_kw = dict(
+        seconds=args.seconds,
+        markers=args.markers,
+        delay_ms=args.delay_ms,
+        jitter_pct=args.jitter_pct,
+        noise_rate=args.noise_rate,
+        mix=args.mix,
+        rotate_sec=args.rotate_sec,
+        lag_ms=args.lag_ms,
+        seed=args.seed,
+    )
+    if args.gen:
+        t0 = time.perf_counter()
+        n = write_synthetic_log(args.gen, **gen_kw)
+        print(f"{args.gen}: {n} lines ({time.perf_counter() - t0:.2f}s)")
+        return
+    if args.suite:
+        res = run_suite(gen_kw, repeat=args.repeat, parse_lines=args.lines, log=args.log)
+        text = json.dumps(res, ensure_ascii=False, indent=2)
+        if args.json:
+            Path(args.json).write_text(text + "\n", encoding="utf-8")
+        else:
+            print(text)
+        if res["compare"].get("ok") is False:
+            print("[FAIL] 고르게 느려진 런인데 누락/추가가 나왔습니다(compare)", file=sys.stderr)
+            sys.exit(1)
+        return
+
+    if args.log:
+        lines = [ln for ln in Path(args.log).read_text(encoding="utf-8", errors="ignore").splitlines() if ln and not ln.startswith("#")]
+    else:
+        lines = _sample_lines(args.lines)
+
+    r = bench_parse(lines, repeat=args.repeat)
+    print(f"lines={r['lines']}")
+    print(f"legacy        : {r['legacy_lines_per_sec']:>12,.0f} lines/sec")
+    print(f"classify_line : {r['classify_line_lines_per_sec']:>12,.0f} lines/sec")
+    print(f"speedup       : {r['speedup']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()